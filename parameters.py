@@ -56,6 +56,12 @@ A continuación, se te entregará la pregunta, la respuesta humana y la pregunta
 COLUMN_QUESTION = "question"
 COLUMN_HUMAN_ANSWER = "human_response"
 
+# Test CSV: unique id of each question and how many answers to sample for it;
+# answers CSVs: the replica (0..replicas-1) of each sampled answer
+COLUMN_QUESTION_ID = "question_id"
+COLUMN_REPLICAS = "replicas"
+COLUMN_REPLICA = "replica"
+
 # ------------------------------------------------------------------
 # 5) Local File Paths & Directories
 # ------------------------------------------------------------------
@@ -75,6 +81,10 @@ PATH_ASSISTANTS_IDS_TXT = f"data/assistants_ids/{ASSISTANT_NAME}_assistants_ids.
 # Separate ID file for the fine-tuned assistant
 PATH_ASSISTANT_ID_FINE_TUNED_TXT = f"data/assistants_ids/{ASSISTANT_NAME}_fine_tuned_assistant_id.txt"
 
+# Registry of the created assistants and the hash of their configuration, so an
+# unchanged assistant is reused (and a changed one updated in place) instead of created again
+PATH_ASSISTANT_REGISTRY = f"data/assistants_ids/{ASSISTANT_NAME}_assistant_registry.json"
+
 # Prompts for the static evaluator assistant
 PATH_INSTRUCTIONS_EVALUATOR_TXT = f"evaluator_prompt/static/{ASSISTANT_NAME}_static_evaluator_prompt.txt"
 
@@ -88,6 +98,9 @@ PATH_EVALUATOR_ID_TXT = f"data/assistants_ids/{ASSISTANT_NAME}_static_evaluator_
 # The CSV containing test questions & human answers (generated from examples)
 PATH_TEST_EXAMPLES_CSV = f"data/test/{ASSISTANT_NAME}_base_test_examples.csv"
 
+# Answers sampled per test question (to estimate the mean and variance of its grade)
+TEST_REPLICAS = 4
+
 # STEP 4) The CSV with the base assistant's answers (only answers, no grades)
 PATH_BASE_ANSWERS_CSV = f"data/test/{ASSISTANT_NAME}_base_assistant_answers.csv"
 
@@ -103,6 +116,9 @@ PATH_FINE_TUNED_GRADES_CSV = f"data/test/{ASSISTANT_NAME}_fine_tuned_assistant_g
 # The CSV that unifies everything in step 13
 PATH_UNIFIED_RESULTS_CSV = f"data/results/{ASSISTANT_NAME}_unified_results.csv"
 
+# STEP 14) Mean and variance of the grades of each test question, over its replicas
+PATH_QUESTION_STATS_CSV = f"data/results/{ASSISTANT_NAME}_question_stats.csv"
+
 # ------------------------------------------------------------------
 # 7) Fine-Tuning Data for the Worst Questions
 # ------------------------------------------------------------------
@@ -113,3 +129,169 @@ PATH_WORST_QUESTIONS_TXT = f"data/worst_questions/{ASSISTANT_NAME}_worst_questio
 # The JSONL file used for fine-tuning (uploaded to OpenAI)
 PATH_WORST_QUESTIONS_JSONL = f"data/worst_questions/{ASSISTANT_NAME}_worst_questions.jsonl"
 
+
+# ------------------------------------------------------------------
+# 8) Execution / Concurrency
+# ------------------------------------------------------------------
+
+# How the test answers are collected: "sync" (one request at a time), "async"
+# or "batch" (Batch API, chat completions with each assistant's configuration)
+ANSWERS_EXECUTION_MODE = "async"
+
+# Maximum number of API requests in flight at the same time in the concurrent modes
+MAX_CONCURRENT_REQUESTS = 16
+
+# HTTP connection pool shared by every OpenAI client of the pipeline (see OpenAIClientFactory)
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 60    # seconds an idle connection is kept open
+HTTP_TIMEOUT = 600            # seconds per request
+
+# Adaptive rate limiter shared by the clients of the pipeline (see AdaptiveRateLimiter).
+# The limits are read from the x-ratelimit-* headers of every response.
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_SAFETY_MARGIN = 0.9  # fraction of the account limits the pipeline may use
+RATE_LIMIT_DEFAULT_PAUSE = 2.0  # first backoff (seconds) after a 429 without retry-after
+RATE_LIMIT_MAX_RETRIES = 6      # retries of a request that gets a 429 / 5xx / connection error
+
+# How the async runner waits for runs: "poll" (adaptive backoff on pending runs only)
+# or "stream" (completion pushed by the API through runs.stream)
+RUN_COMPLETION_MODE = "poll"
+
+# Threads used to collect the test answers:
+#   "per_assistant": one thread per (assistant, question), created together with its run
+#                    by threads.create_and_run, so every run starts at once on a clean thread
+#   "shared":        one thread per question, with the runs of all assistants on it
+#                    (the API allows a single active run per thread, and every run sees
+#                    the previous assistants' replies)
+THREAD_MODE = "per_assistant"
+
+# How the sync/async runners ask the TEST_REPLICAS replicas of a question:
+#   "chat": the assistant's configuration is retrieved once and all the replicas are sampled
+#           by a single chat completion request with "n" (the prompt is sent once)
+#   "runs": one Assistants run per replica (the Assistants API has no "n", and a thread
+#           holds a single active run, so the replicas cannot share a thread)
+REPLICA_SAMPLING = "chat"
+
+# How the answers are graded: "serial" (one row at a time), "concurrent" (worker pool)
+# or "batch" (Batch API, with the "chat" or "logprobs" grading backend; "assistants" and
+# "multi_row" become "chat")
+GRADING_EXECUTION_MODE = "concurrent"
+
+# Upper bound on grading requests started per minute (None = no bound)
+GRADING_REQUESTS_PER_MINUTE = 500
+
+# Grading backend: "assistants" (thread + message + run per row, through the evaluator
+# assistant), "chat" (one chat.completions call per row, 1 token restricted to "1".."5")
+# or "logprobs" (same call, graded with the expected score over the probabilities of
+# "1".."5": a continuous grade plus a confidence column, stable without re-grading)
+# or "multi_row" (GRADING_ROWS_PER_REQUEST rows per chat.completions call, answered as a
+# JSON-schema array of grades: the evaluator instructions are sent once per group).
+# The backends grade on different scales (discrete vs expected score), so keep the same
+# backend for runs whose grades are compared in the results store.
+GRADING_BACKEND = "assistants"
+
+# "multi_row" backend: rows graded per request, and the context window of the evaluator
+# model (a group is cut short when its estimated prompt + answer would not fit)
+GRADING_ROWS_PER_REQUEST = 10
+EVALUATOR_CONTEXT_TOKENS = 128_000
+
+# Folder for the Batch API input files (and the ids of the batches in progress)
+PATH_BATCH_DIR = f"data/batch/{ASSISTANT_NAME}"
+
+# Seconds between status checks of a batch job
+BATCH_POLL_INTERVAL = 60
+
+# ------------------------------------------------------------------
+# 9) Caches
+# ------------------------------------------------------------------
+
+# Persistent cache of evaluator grades (shared by every assistant; keys include
+# the evaluator prompt and model, so entries never mix between evaluators)
+GRADE_CACHE_ENABLED = True
+PATH_GRADE_CACHE_DB = "data/cache/grade_cache.sqlite3"
+GRADE_CACHE_MAX_ENTRIES = 100_000
+
+# Provider-side prompt caching of the chat requests (grading and batch answers): the
+# static prefix (evaluator prompt / assistant instructions) always goes first as the
+# system message, and the requests that share it carry the same prompt_cache_key so
+# they are routed to the same cache. Hits show up as "cached" tokens in the API metrics.
+PROMPT_CACHE_KEY_ENABLED = True
+
+# Local copy of the Airtable table with the assistants' ids and Google Docs: the table
+# is listed once (all pages) and the copy is used for AIRTABLE_CACHE_TTL_SECONDS, by
+# every assistant and process, instead of one Airtable request per assistant
+PATH_AIRTABLE_CACHE = "data/cache/airtable_records.json"
+AIRTABLE_CACHE_TTL_SECONDS = 15 * 60
+
+# ------------------------------------------------------------------
+# 10) Multi-assistant orchestration (main.py)
+# ------------------------------------------------------------------
+
+# How many assistants run at the same time (one process each)
+MAX_PARALLEL_ASSISTANTS = 2
+
+# API budget shared by all the assistants running at the same time: each process
+# gets GLOBAL_MAX_CONCURRENT_REQUESTS // MAX_PARALLEL_ASSISTANTS requests in flight
+# (and an equal share of GRADING_REQUESTS_PER_MINUTE)
+GLOBAL_MAX_CONCURRENT_REQUESTS = 32
+
+# One log file per assistant, plus run_timings.csv
+PATH_LOGS_DIR = "data/logs"
+
+# Before starting the assistants, their Google Docs are imported together with one
+# shared Docs service, this many at the same time (docs whose revision did not change
+# since the last import are not downloaded again)
+GOOGLE_DOCS_MAX_WORKERS = 8
+
+# ------------------------------------------------------------------
+# 11) Checkpoints / Resume
+# ------------------------------------------------------------------
+
+# Manifest with the completed steps of AssistantImprover.run and the hashes of their
+# files; steps that are still up to date are skipped in the next run
+PATH_PIPELINE_MANIFEST = f"data/pipeline/{ASSISTANT_NAME}_pipeline_manifest.json"
+
+# Incremental re-evaluation: the Google Doc is imported on every run and only the steps
+# affected by a change run again (an unchanged Doc stops after the import). The test
+# questions are the examples in the base assistant's instructions, so editing one re-asks
+# every question; identical answers get their grades from the grade cache.
+INCREMENTAL_REEVALUATION = True
+
+# ------------------------------------------------------------------
+# 12) Metrics
+# ------------------------------------------------------------------
+
+# Latency, retries and tokens of every API call of AssistantImprover.run, per step,
+# in the Prometheus textfile format (e.g. for node_exporter's textfile collector)
+PATH_API_METRICS_PROM = f"data/metrics/{ASSISTANT_NAME}_api_metrics.prom"
+
+# ------------------------------------------------------------------
+# 13) Results store
+# ------------------------------------------------------------------
+
+# SQLite database with the answers and grades of every run of every assistant, keyed
+# by (assistant, run id, question index, variant). The per-step CSVs are still written;
+# the worst questions and the unified CSV are read from here when it is enabled
+RESULTS_STORE_ENABLED = True
+PATH_RESULTS_DB = "data/results/results.sqlite3"
+
+# ------------------------------------------------------------------
+# 14) Dynamic ("en la cancha") tests
+# ------------------------------------------------------------------
+
+# Exports of real conversations (.jsonl with one {"messages": [...]} per line, or .csv
+# with one message per row: conversation_id, role, content; both may be .gz)
+PATH_CONVERSATIONS_EXPORTS = [f"data/conversations/{ASSISTANT_NAME}_conversations.jsonl"]
+
+# Test CSV with every real (question, answer) pair that asks one of the test questions
+PATH_DYNAMIC_TEST_CSV = f"data/test/{ASSISTANT_NAME}_dynamic_test_examples.csv"
+
+# Minimum word similarity (Jaccard, 0..1) between a real message and a test question
+DYNAMIC_MATCH_THRESHOLD = 0.6
+
+# Most real pairs kept per test question (None = all)
+DYNAMIC_MAX_PER_QUESTION = 50
+
+# Processes matching the conversations (None = one per CPU)
+DYNAMIC_WORKERS = None
@@ -1,14 +1,19 @@
 # assistant_crator.py
 
-from openai import OpenAI
+from src.assistant_creator.assistant_registry import AssistantRegistry
+from src.openai_clients.client_factory import OpenAIClientFactory
 
 class AssistantCreator:
-    def __init__(self, api_key: str, instructions_path: str):
+    def __init__(self, api_key: str, instructions_path: str, assistant_name: str = None, registry_path: str = None,
+                 client_factory: OpenAIClientFactory = None):
 
-        from parameters import ASSISTANT_NAME
-        self.assistant_name = ASSISTANT_NAME
-        self.client = OpenAI(api_key=api_key)
+        if assistant_name is None:
+            from parameters import ASSISTANT_NAME
+            assistant_name = ASSISTANT_NAME
+        self.assistant_name = assistant_name
+        self.client = (client_factory or OpenAIClientFactory.shared(api_key)).sync()
         self.instructions_path = instructions_path
+        self.registry = AssistantRegistry(self.client, registry_path) if registry_path else None
 
     def load_instructions(self) -> str:
         with open(self.instructions_path, 'r', encoding='utf-8') as file:
@@ -26,3 +31,24 @@ class AssistantCreator:
             temperature=temperature,
             top_p=top_p
         )
+
+    def get_or_create_assistant(self, name_suffix: str, model: str, tools: list, temperature: float, top_p: float,
+                                track_renames: bool = False):
+        """
+        Like create_assistant, but through the assistant registry: an assistant with the
+        same name and configuration is reused, and one with a changed configuration is
+        updated in place. With `track_renames`, an assistant registered under another name
+        with the same configuration is renamed and reused. Without a registry, it always
+        creates a new assistant.
+        """
+        if self.registry is None:
+            return self.create_assistant(name_suffix, model, tools, temperature=temperature, top_p=top_p)
+        return self.registry.get_or_create(
+            name=f"{self.assistant_name}_{name_suffix}",
+            instructions=self.load_instructions(),
+            model=model,
+            tools=tools,
+            temperature=temperature,
+            top_p=top_p,
+            track_renames=track_renames
+        )
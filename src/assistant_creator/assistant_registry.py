@@ -0,0 +1,107 @@
+# assistant_registry.py
+
+import hashlib
+import json
+import os
+
+
+class AssistantRegistry:
+    """
+    Local record of the assistants created by the pipeline, addressed by the hash of
+    their configuration (instructions, model, tools, temperature, top_p).
+
+    For a given assistant name:
+      - same configuration as a registered assistant -> that assistant is reused,
+      - same name but a different configuration -> the assistant is updated in place
+        (same id, so the ids files and the previous results keep pointing to it),
+      - unknown name -> a new assistant is created. Only with `track_renames=True` is
+        an assistant registered under another name with the same configuration taken
+        over (renamed) instead; otherwise two names never share an assistant.
+
+    The registry is a JSON file:
+        {"assistants": {name: {"id": ..., "config_hash": ..., "model": ...}}}
+    """
+
+    def __init__(self, client, registry_path: str):
+        self.client = client
+        self.registry_path = registry_path
+        self.assistants = {}
+        if os.path.exists(registry_path):
+            with open(registry_path, "r", encoding="utf-8") as f:
+                self.assistants = json.load(f).get("assistants", {})
+
+    @staticmethod
+    def config_hash(instructions: str, model: str, tools: list, temperature, top_p) -> str:
+        payload = json.dumps({
+            "instructions": instructions,
+            "model": model,
+            "tools": tools or [],
+            "temperature": temperature,
+            "top_p": top_p,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def find_by_hash(self, config_hash: str):
+        for name, entry in self.assistants.items():
+            if entry["config_hash"] == config_hash:
+                return name, entry
+        return None, None
+
+    def get_or_create(self, name: str, instructions: str, model: str, tools: list, temperature, top_p,
+                      track_renames: bool = False):
+        """
+        Returns the assistant object for `name` with exactly this configuration,
+        creating or updating it only when needed. With `track_renames`, an unknown
+        name reuses (and renames) the assistant registered with the same configuration.
+        """
+        config_hash = self.config_hash(instructions, model, tools, temperature, top_p)
+        entry = self.assistants.get(name)
+        if entry is None and track_renames:
+            # Another name with the very same configuration (e.g. the assistant was renamed)
+            other_name, entry = self.find_by_hash(config_hash)
+            if entry is not None:
+                del self.assistants[other_name]
+
+        assistant = self._retrieve(entry["id"]) if entry is not None else None
+        if assistant is not None and entry["config_hash"] == config_hash and assistant.name == name:
+            print(f"Reusing assistant {name} ({assistant.id}): configuration unchanged.")
+            return assistant
+
+        settings = dict(
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            model=model,
+            temperature=temperature,
+            top_p=top_p
+        )
+        if assistant is not None:
+            reason = "renamed" if entry["config_hash"] == config_hash else "configuration changed"
+            print(f"Updating assistant {name} ({assistant.id}) in place: {reason}.")
+            assistant = self.client.beta.assistants.update(assistant.id, **settings)
+        else:
+            print(f"Creating assistant with name: {name}")
+            assistant = self.client.beta.assistants.create(**settings)
+
+        self.assistants[name] = {"id": assistant.id, "config_hash": config_hash, "model": model}
+        self._save()
+        return assistant
+
+    def _retrieve(self, assistant_id: str):
+        """
+        The assistant, or None if it no longer exists in the account.
+        """
+        try:
+            return self.client.beta.assistants.retrieve(assistant_id)
+        except Exception as e:
+            print(f"Registered assistant {assistant_id} is not available: {e}")
+            return None
+
+    def _save(self):
+        folder = os.path.dirname(self.registry_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"assistants": self.assistants}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.registry_path)
@@ -1,13 +1,16 @@
 import time
-from openai import OpenAI
+from src.openai_clients.client_factory import OpenAIClientFactory
 
 class OpenAIFineTuner:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, client_factory: OpenAIClientFactory = None, poll_interval: float = 30):
         """
         Initialize the OpenAIFineTuner with the API key.
+        Uses the shared client of `client_factory` (default: the process-wide one).
+        `poll_interval` is the number of seconds between status checks of a job.
         """
         self.api_key = api_key
-        self.client = OpenAI(api_key=api_key)
+        self.poll_interval = poll_interval
+        self.client = (client_factory or OpenAIClientFactory.shared(api_key)).sync()
 
     def create_fine_tuning_job(self, training_file_id: str, model: str, suffix: str = None, n_epochs = 1) -> dict:
         """
@@ -50,7 +53,7 @@ class OpenAIFineTuner:
                 model_id = job_status.fine_tuned_model
                 return model_id
                 break
-            time.sleep(30)  # Wait for 30 seconds before checking again
+            time.sleep(self.poll_interval)  # Wait before checking again
 
     def list_fine_tuning_jobs(self, limit: int = 10) -> list:
         """
@@ -1,14 +1,16 @@
 import os
 from pathlib import Path
-from openai import OpenAI
+
+from src.openai_clients.client_factory import OpenAIClientFactory
 
 class OpenAIFileUploader:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, client_factory: OpenAIClientFactory = None):
         """
         Initialize the OpenAIFileUploader with the API key.
+        Uses the shared client of `client_factory` (default: the process-wide one).
         """
         self.api_key = api_key
-        self.client = OpenAI(api_key=api_key)
+        self.client = (client_factory or OpenAIClientFactory.shared(api_key)).sync()
 
     def upload_file(self, file_path: str, purpose: str) -> dict:
         """
@@ -0,0 +1,121 @@
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional
+
+import parameters as p
+
+
+@dataclass
+class AssistantConfig:
+    """
+    Everything AssistantImprover needs to run the pipeline for ONE assistant.
+
+    The defaults come from parameters.py. Use AssistantConfig.for_assistant(name)
+    to get the same configuration for another assistant (all the data paths are
+    rebuilt with that name), without touching parameters.py.
+    """
+
+    # Assistant/Model Basic Info
+    assistant_name: str = p.ASSISTANT_NAME
+    base_model_name: str = p.BASE_MODEL_NAME
+    base_model_suffix: str = p.BASE_MODEL_SUFFIX
+    base_temperature: float = p.BASE_TEMPERATURE
+    base_top_p: float = p.BASE_TOP_P
+
+    # Fine-tuning
+    num_worst_examples: int = p.NUM_WORST_EXAMPLES
+    fine_tuned_model_suffix: str = p.FINE_TUNED_MODEL_SUFFIX
+
+    # Evaluator
+    evaluator_model_name: str = p.EVALUATOR_MODEL_NAME
+    evaluator_temperature: float = p.EVALUATOR_TEMPERATURE
+    evaluator_top_p: float = p.EVALUATOR_TOP_P
+
+    # Instructions/Examples
+    path_instructions_txt: str = p.PATH_INSTRUCTIONS_TXT
+    path_instructions_no_examples: str = p.PATH_INSTRUCTIONS_NO_EXAMPLES
+    path_examples_txt: str = p.PATH_EXAMPLES_TXT
+
+    # Assistant IDs
+    path_assistants_ids_txt: str = p.PATH_ASSISTANTS_IDS_TXT
+    path_assistant_id_fine_tuned_txt: str = p.PATH_ASSISTANT_ID_FINE_TUNED_TXT
+    path_assistant_registry: str = p.PATH_ASSISTANT_REGISTRY
+    path_instructions_evaluator_txt: str = p.PATH_INSTRUCTIONS_EVALUATOR_TXT
+    path_evaluator_id_txt: str = p.PATH_EVALUATOR_ID_TXT
+
+    # Test inputs, answers & grades
+    path_test_examples_csv: str = p.PATH_TEST_EXAMPLES_CSV
+    path_base_answers_csv: str = p.PATH_BASE_ANSWERS_CSV
+    path_base_grades_csv: str = p.PATH_BASE_GRADES_CSV
+    path_fine_tuned_answers_csv: str = p.PATH_FINE_TUNED_ANSWERS_CSV
+    path_fine_tuned_grades_csv: str = p.PATH_FINE_TUNED_GRADES_CSV
+    path_unified_results_csv: str = p.PATH_UNIFIED_RESULTS_CSV
+    path_question_stats_csv: str = p.PATH_QUESTION_STATS_CSV
+    test_replicas: int = p.TEST_REPLICAS
+
+    # Worst Qs
+    path_worst_questions_txt: str = p.PATH_WORST_QUESTIONS_TXT
+    path_worst_questions_jsonl: str = p.PATH_WORST_QUESTIONS_JSONL
+
+    # Execution / Concurrency
+    answers_execution_mode: str = p.ANSWERS_EXECUTION_MODE
+    max_concurrent_requests: int = p.MAX_CONCURRENT_REQUESTS
+    thread_mode: str = p.THREAD_MODE
+    replica_sampling: str = p.REPLICA_SAMPLING
+    grading_execution_mode: str = p.GRADING_EXECUTION_MODE
+    grading_requests_per_minute: Optional[float] = p.GRADING_REQUESTS_PER_MINUTE
+    grading_backend: str = p.GRADING_BACKEND
+    grading_rows_per_request: int = p.GRADING_ROWS_PER_REQUEST
+    evaluator_context_tokens: int = p.EVALUATOR_CONTEXT_TOKENS
+    path_batch_dir: str = p.PATH_BATCH_DIR
+    batch_poll_interval: float = p.BATCH_POLL_INTERVAL
+
+    # Caches
+    grade_cache_enabled: bool = p.GRADE_CACHE_ENABLED
+    path_grade_cache_db: str = p.PATH_GRADE_CACHE_DB
+    grade_cache_max_entries: int = p.GRADE_CACHE_MAX_ENTRIES
+    path_airtable_cache: str = p.PATH_AIRTABLE_CACHE
+    airtable_cache_ttl_seconds: float = p.AIRTABLE_CACHE_TTL_SECONDS
+
+    # Checkpoints / Resume
+    path_pipeline_manifest: str = p.PATH_PIPELINE_MANIFEST
+    incremental_reevaluation: bool = p.INCREMENTAL_REEVALUATION
+
+    # Metrics
+    path_api_metrics_prom: str = p.PATH_API_METRICS_PROM
+
+    # Dynamic tests
+    path_conversations_exports: list = dataclasses.field(default_factory=lambda: list(p.PATH_CONVERSATIONS_EXPORTS))
+    path_dynamic_test_csv: str = p.PATH_DYNAMIC_TEST_CSV
+    dynamic_match_threshold: float = p.DYNAMIC_MATCH_THRESHOLD
+    dynamic_max_per_question: Optional[int] = p.DYNAMIC_MAX_PER_QUESTION
+    dynamic_workers: Optional[int] = p.DYNAMIC_WORKERS
+
+    # Results store
+    results_store_enabled: bool = p.RESULTS_STORE_ENABLED
+    path_results_db: str = p.PATH_RESULTS_DB
+
+    @classmethod
+    def for_assistant(cls, assistant_name: str, **overrides) -> "AssistantConfig":
+        """
+        Same configuration as parameters.py, for `assistant_name`.
+
+        Every path_* default (or path in a list of paths) that contains
+        parameters.ASSISTANT_NAME gets it replaced by `assistant_name` (the paths in
+        parameters.py are f-strings built from it).
+        `overrides` replace any other field.
+        """
+        config = cls()
+        renamed = {}
+        for field in dataclasses.fields(cls):
+            if not field.name.startswith("path_"):
+                continue
+            value = getattr(config, field.name)
+            if isinstance(value, list):
+                # e.g. path_conversations_exports, a list of paths
+                if any(p.ASSISTANT_NAME in path for path in value):
+                    renamed[field.name] = [path.replace(p.ASSISTANT_NAME, assistant_name) for path in value]
+            elif p.ASSISTANT_NAME in value:
+                renamed[field.name] = value.replace(p.ASSISTANT_NAME, assistant_name)
+        renamed.update(overrides)
+        return dataclasses.replace(config, assistant_name=assistant_name, **renamed)
@@ -1,7 +1,9 @@
 import os
 import csv
+import heapq
 import json
 import re
+from itertools import zip_longest
 from dotenv import load_dotenv
 
 # --- Import your custom classes/modules ---
@@ -9,12 +11,26 @@ from src.instructions_creation.file_importer import DocumentImporter
 from src.instructions_creation.text_separator import TextSeparatorRunner
 from src.instructions_creation.intructions_id_finder import AssistantDocFinder
 from src.assistant_creator.assistant_creator import AssistantCreator
+from src.assistant_creator.assistant_registry import AssistantRegistry
 from src.assistant_finetuner.examples_to_jsonl import TxtToJsonlConverter
 from src.assistant_finetuner.create_finetune_model import OpenAIFineTuner
 from src.assistant_finetuner.upload_jsonl import OpenAIFileUploader
 from src.assistant_testing.static_test_creator import StaticExamplesTestCreator
+from src.assistant_testing.dynamic_test_creator import DynamicConversationTestCreator
 from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.assistant_testing.async_static_assistant_tester import AsyncStaticAssistantsRunner
+from src.assistant_testing.batch_assistant_tester import BatchAssistantsRunner
 from src.assistant_testing.static_grader_results import FileManagerGrader
+from src.assistant_testing.concurrent_grader_results import ConcurrentFileManagerGrader
+from src.assistant_testing.grade_cache import GradeCache
+from src.assistant_testing.results_store import ResultsStore
+from src.assistant_testing.chat_row_processor import ChatRowProcessor, LogprobRowProcessor, MultiRowChatProcessor
+from src.assistant_testing.batch_grader_results import BatchFileManagerGrader
+from src.assistant_testing.multi_row_grader_results import MultiRowFileManagerGrader
+from src.assistant_improver.assistant_config import AssistantConfig
+from src.openai_clients.api_metrics import ApiMetrics
+from src.openai_clients.client_factory import OpenAIClientFactory
+from src.assistant_improver.pipeline import PipelineManifest, PipelineRunner, PipelineStep, file_sha256
 
 # --- Import parameters from your parameters.py ---
 import parameters as p
@@ -40,6 +56,8 @@ EVALUATOR_DESCRIPTION_PROMPT = p.EVALUATOR_DESCRIPTION_PROMPT
 # CSV columns
 COLUMN_QUESTION = p.COLUMN_QUESTION
 COLUMN_HUMAN_ANSWER = p.COLUMN_HUMAN_ANSWER
+COLUMN_QUESTION_ID = p.COLUMN_QUESTION_ID
+COLUMN_REPLICA = p.COLUMN_REPLICA
 
 # Instructions/Examples
 PATH_INSTRUCTIONS_TXT = p.PATH_INSTRUCTIONS_TXT
@@ -49,11 +67,13 @@ PATH_EXAMPLES_TXT = p.PATH_EXAMPLES_TXT
 # Assistant IDs
 PATH_ASSISTANTS_IDS_TXT = p.PATH_ASSISTANTS_IDS_TXT
 PATH_ASSISTANT_ID_FINE_TUNED_TXT = p.PATH_ASSISTANT_ID_FINE_TUNED_TXT
+PATH_ASSISTANT_REGISTRY = p.PATH_ASSISTANT_REGISTRY
 PATH_INSTRUCTIONS_EVALUATOR_TXT = p.PATH_INSTRUCTIONS_EVALUATOR_TXT
 PATH_EVALUATOR_ID_TXT = p.PATH_EVALUATOR_ID_TXT
 
 # Test inputs
 PATH_TEST_EXAMPLES_CSV = p.PATH_TEST_EXAMPLES_CSV
+TEST_REPLICAS = p.TEST_REPLICAS
 
 # Separate answers & grades
 PATH_BASE_ANSWERS_CSV = p.PATH_BASE_ANSWERS_CSV
@@ -61,59 +81,149 @@ PATH_BASE_GRADES_CSV = p.PATH_BASE_GRADES_CSV
 PATH_FINE_TUNED_ANSWERS_CSV = p.PATH_FINE_TUNED_ANSWERS_CSV
 PATH_FINE_TUNED_GRADES_CSV = p.PATH_FINE_TUNED_GRADES_CSV
 PATH_UNIFIED_RESULTS_CSV = p.PATH_UNIFIED_RESULTS_CSV
+PATH_QUESTION_STATS_CSV = p.PATH_QUESTION_STATS_CSV
 
 # Worst Qs
 PATH_WORST_QUESTIONS_TXT = p.PATH_WORST_QUESTIONS_TXT
 PATH_WORST_QUESTIONS_JSONL = p.PATH_WORST_QUESTIONS_JSONL
 
+# Execution / Concurrency
+ANSWERS_EXECUTION_MODE = p.ANSWERS_EXECUTION_MODE
+MAX_CONCURRENT_REQUESTS = p.MAX_CONCURRENT_REQUESTS
+THREAD_MODE = p.THREAD_MODE
+REPLICA_SAMPLING = p.REPLICA_SAMPLING
+GRADING_EXECUTION_MODE = p.GRADING_EXECUTION_MODE
+GRADING_REQUESTS_PER_MINUTE = p.GRADING_REQUESTS_PER_MINUTE
+GRADING_BACKEND = p.GRADING_BACKEND
+GRADING_ROWS_PER_REQUEST = p.GRADING_ROWS_PER_REQUEST
+EVALUATOR_CONTEXT_TOKENS = p.EVALUATOR_CONTEXT_TOKENS
+PATH_BATCH_DIR = p.PATH_BATCH_DIR
+BATCH_POLL_INTERVAL = p.BATCH_POLL_INTERVAL
+
+# Caches
+GRADE_CACHE_ENABLED = p.GRADE_CACHE_ENABLED
+PATH_GRADE_CACHE_DB = p.PATH_GRADE_CACHE_DB
+GRADE_CACHE_MAX_ENTRIES = p.GRADE_CACHE_MAX_ENTRIES
+PATH_AIRTABLE_CACHE = p.PATH_AIRTABLE_CACHE
+AIRTABLE_CACHE_TTL_SECONDS = p.AIRTABLE_CACHE_TTL_SECONDS
+
+# Checkpoints / Resume
+PATH_PIPELINE_MANIFEST = p.PATH_PIPELINE_MANIFEST
+INCREMENTAL_REEVALUATION = p.INCREMENTAL_REEVALUATION
+
+# Metrics
+PATH_API_METRICS_PROM = p.PATH_API_METRICS_PROM
+
+# Dynamic tests
+PATH_CONVERSATIONS_EXPORTS = p.PATH_CONVERSATIONS_EXPORTS
+PATH_DYNAMIC_TEST_CSV = p.PATH_DYNAMIC_TEST_CSV
+DYNAMIC_MATCH_THRESHOLD = p.DYNAMIC_MATCH_THRESHOLD
+DYNAMIC_MAX_PER_QUESTION = p.DYNAMIC_MAX_PER_QUESTION
+DYNAMIC_WORKERS = p.DYNAMIC_WORKERS
+
+# Results store
+RESULTS_STORE_ENABLED = p.RESULTS_STORE_ENABLED
+PATH_RESULTS_DB = p.PATH_RESULTS_DB
+
 
 
 class AssistantImprover:
-    def __init__(self):
+    def __init__(self, config: AssistantConfig = None):
+        """
+        :param config: per-assistant configuration. If None, everything comes from parameters.py.
+        """
         load_dotenv()
 
+        if config is None:
+            config = AssistantConfig()
+        self.config = config
+
         # -------------------------------------------------
         # Basic assistant & model config
         # -------------------------------------------------
-        self.assistant_name = ASSISTANT_NAME
-        self.base_model_name = BASE_MODEL_NAME
-        self.base_model_suffix = BASE_MODEL_SUFFIX
-        self.base_temperature = BASE_TEMPERATURE
-        self.base_top_p = BASE_TOP_P
+        self.assistant_name = config.assistant_name
+        self.base_model_name = config.base_model_name
+        self.base_model_suffix = config.base_model_suffix
+        self.base_temperature = config.base_temperature
+        self.base_top_p = config.base_top_p
 
         # Fine-tuning
-        self.num_worst_examples = NUM_WORST_EXAMPLES
-        self.fine_tuned_model_suffix = FINE_TUNED_MODEL_SUFFIX
+        self.num_worst_examples = config.num_worst_examples
+        self.fine_tuned_model_suffix = config.fine_tuned_model_suffix
 
         # Evaluator
-        self.evaluator_model_name = EVALUATOR_MODEL_NAME
-        self.evaluator_temperature = EVALUATOR_TEMPERATURE
-        self.evaluator_top_p = EVALUATOR_TOP_P
+        self.evaluator_model_name = config.evaluator_model_name
+        self.evaluator_temperature = config.evaluator_temperature
+        self.evaluator_top_p = config.evaluator_top_p
 
         # -------------------------------------------------
         # Local file paths
         # -------------------------------------------------
-        self.path_instructions_txt = PATH_INSTRUCTIONS_TXT
-        self.path_instructions_no_examples = PATH_INSTRUCTIONS_NO_EXAMPLES
-        self.path_examples_txt = PATH_EXAMPLES_TXT
-        self.path_assistants_ids_txt = PATH_ASSISTANTS_IDS_TXT
-        self.path_assistant_id_fine_tuned_txt = PATH_ASSISTANT_ID_FINE_TUNED_TXT
-        self.path_instructions_evaluator_txt = PATH_INSTRUCTIONS_EVALUATOR_TXT
-        self.path_evaluator_id_txt = PATH_EVALUATOR_ID_TXT
+        self.path_instructions_txt = config.path_instructions_txt
+        self.path_instructions_no_examples = config.path_instructions_no_examples
+        self.path_examples_txt = config.path_examples_txt
+        self.path_assistants_ids_txt = config.path_assistants_ids_txt
+        self.path_assistant_id_fine_tuned_txt = config.path_assistant_id_fine_tuned_txt
+        self.path_assistant_registry = config.path_assistant_registry
+        self.path_instructions_evaluator_txt = config.path_instructions_evaluator_txt
+        self.path_evaluator_id_txt = config.path_evaluator_id_txt
 
         # Test sets
-        self.path_test_examples_csv = PATH_TEST_EXAMPLES_CSV
+        self.path_test_examples_csv = config.path_test_examples_csv
+        self.test_replicas = config.test_replicas
 
         # Separate answers & grades
-        self.path_base_answers_csv = PATH_BASE_ANSWERS_CSV
-        self.path_base_grades_csv = PATH_BASE_GRADES_CSV
-        self.path_fine_tuned_answers_csv = PATH_FINE_TUNED_ANSWERS_CSV
-        self.path_fine_tuned_grades_csv = PATH_FINE_TUNED_GRADES_CSV
-        self.path_unified_results_csv = PATH_UNIFIED_RESULTS_CSV
+        self.path_base_answers_csv = config.path_base_answers_csv
+        self.path_base_grades_csv = config.path_base_grades_csv
+        self.path_fine_tuned_answers_csv = config.path_fine_tuned_answers_csv
+        self.path_fine_tuned_grades_csv = config.path_fine_tuned_grades_csv
+        self.path_unified_results_csv = config.path_unified_results_csv
+        self.path_question_stats_csv = config.path_question_stats_csv
 
         # Worst questions
-        self.path_worst_questions_txt = PATH_WORST_QUESTIONS_TXT
-        self.path_worst_questions_jsonl = PATH_WORST_QUESTIONS_JSONL
+        self.path_worst_questions_txt = config.path_worst_questions_txt
+        self.path_worst_questions_jsonl = config.path_worst_questions_jsonl
+
+        # Execution / Concurrency
+        self.answers_execution_mode = config.answers_execution_mode
+        self.max_concurrent_requests = config.max_concurrent_requests
+        self.thread_mode = config.thread_mode
+        self.replica_sampling = config.replica_sampling
+        self.grading_execution_mode = config.grading_execution_mode
+        self.grading_requests_per_minute = config.grading_requests_per_minute
+        self.grading_backend = config.grading_backend
+        self.grading_rows_per_request = config.grading_rows_per_request
+        self.evaluator_context_tokens = config.evaluator_context_tokens
+        self.path_batch_dir = config.path_batch_dir
+        self.batch_poll_interval = config.batch_poll_interval
+
+        # Caches
+        self.grade_cache_enabled = config.grade_cache_enabled
+        self.path_grade_cache_db = config.path_grade_cache_db
+        self.grade_cache_max_entries = config.grade_cache_max_entries
+        self.path_airtable_cache = config.path_airtable_cache
+        self.airtable_cache_ttl_seconds = config.airtable_cache_ttl_seconds
+
+        # Checkpoints / Resume
+        self.path_pipeline_manifest = config.path_pipeline_manifest
+        self.incremental_reevaluation = config.incremental_reevaluation
+        self.manifest = None
+
+        # Metrics
+        self.path_api_metrics_prom = config.path_api_metrics_prom
+
+        # Dynamic tests
+        self.path_conversations_exports = config.path_conversations_exports
+        self.path_dynamic_test_csv = config.path_dynamic_test_csv
+        self.dynamic_match_threshold = config.dynamic_match_threshold
+        self.dynamic_max_per_question = config.dynamic_max_per_question
+        self.dynamic_workers = config.dynamic_workers
+
+        # Results store (run_id is set by the base answers step, or restored from the manifest)
+        self.results_store_enabled = config.results_store_enabled
+        self.path_results_db = config.path_results_db
+        self.results_store = ResultsStore(self.path_results_db) if self.results_store_enabled else None
+        self.run_id = None
 
         # -------------------------------------------------
         # Credentials (environment variables)
@@ -125,17 +235,24 @@ class AssistantImprover:
         # -------------------------------------------------
         # Tools
         # -------------------------------------------------
-        self.fine_tuner = OpenAIFineTuner(api_key=self.openai_api_key)
+        # One pooled client (and connection pool) shared by every step of the run,
+        # which also records the metrics of every API call
+        self.client_factory = OpenAIClientFactory(
+            self.openai_api_key,
+            metrics=ApiMetrics(labels={"assistant": self.assistant_name})
+        )
+        self.fine_tuner = OpenAIFineTuner(api_key=self.openai_api_key, client_factory=self.client_factory)
         self.static_test_creator = StaticExamplesTestCreator(
             input_test_file=self.path_examples_txt,
-            output_test_file=self.path_test_examples_csv
+            output_test_file=self.path_test_examples_csv,
+            replicas=self.test_replicas
         )
 
     # -------------------------------------------------------------------------
     # 1) CREATE INSTRUCTIONS & SEPARATE EXAMPLES
     # -------------------------------------------------------------------------
     def find_doc_id(self):
-        finder = AssistantDocFinder()
+        finder = AssistantDocFinder(cache_path=self.path_airtable_cache, cache_ttl=self.airtable_cache_ttl_seconds)
         _, gdocs_address = finder.get_doc_id_by_assistant_name(self.assistant_name)
         self.document_id = gdocs_address
         print(f"Document ID for '{self.assistant_name}' found: {self.document_id}")
@@ -152,15 +269,22 @@ class AssistantImprover:
     def separate_text(self):
         separator_runner = TextSeparatorRunner(
             api_key=self.openai_api_key,
-            assistant_id=self.separator_assistant_id
+            client_factory=self.client_factory,
+            assistant_id=self.separator_assistant_id,
+            path_instructions_txt=self.path_instructions_txt,
+            path_instructions_no_examples=self.path_instructions_no_examples,
+            path_examples_txt=self.path_examples_txt
         )
         separator_runner.run()
         print("Text separation completed: instructions vs. examples.")
 
     def create_instructions(self):
+        self.import_instructions()
+        self.separate_text()
+
+    def import_instructions(self):
         self.find_doc_id()
         self.import_text_from_google_doc()
-        self.separate_text()
 
     # -------------------------------------------------------------------------
     # 2) CREATE THE TEST WITH QUESTIONS & HUMAN ANSWERS
@@ -169,15 +293,34 @@ class AssistantImprover:
         self.static_test_creator.create_test()
         print(f"Static test CSV created at: {self.path_test_examples_csv}")
 
+    def create_dynamic_tests(self):
+        """
+        Dynamic ("en la cancha") test from the real conversation exports: every real
+        (question, answer) pair that asks one of the static test questions. Not part of
+        run(); the resulting CSV has the same columns as the static test.
+        """
+        creator = DynamicConversationTestCreator(
+            conversation_files=self.path_conversations_exports,
+            test_questions_csv=self.path_test_examples_csv,
+            output_test_file=self.path_dynamic_test_csv,
+            threshold=self.dynamic_match_threshold,
+            max_per_question=self.dynamic_max_per_question,
+            workers=self.dynamic_workers
+        )
+        creator.create_test()
+
     # -------------------------------------------------------------------------
     # 3) CREATE BASE ASSISTANT
     # -------------------------------------------------------------------------
     def create_base_assistant(self):
         assistant_creator = AssistantCreator(
             api_key=self.openai_api_key,
-            instructions_path=self.path_instructions_txt
+            client_factory=self.client_factory,
+            instructions_path=self.path_instructions_txt,
+            assistant_name=self.assistant_name,
+            registry_path=self.path_assistant_registry
         )
-        self.base_assistant = assistant_creator.create_assistant(
+        self.base_assistant = assistant_creator.get_or_create_assistant(
             name_suffix=self.base_model_suffix,
             model=self.base_model_name,
             tools=[],
@@ -189,25 +332,111 @@ class AssistantImprover:
             self.base_assistant.id,
             self.path_assistants_ids_txt
         )
-        print(f"Base assistant created: {self.base_assistant.name}")
+        print(f"Base assistant ready: {self.base_assistant.name} ({self.base_assistant.id})")
+        return self._assistant_state(self.base_assistant, self.path_instructions_txt, self.base_model_name,
+                                     self.base_temperature, self.base_top_p)
+
+    @classmethod
+    def _assistant_state(cls, assistant, instructions_path, model, temperature, top_p):
+        """
+        Step state of an assistant creation: its id and configuration hash. An assistant
+        updated in place keeps its id, so the hash is what tells the following steps
+        that it changed.
+        """
+        return {
+            "assistant_id": assistant.id,
+            "config_hash": cls._config_hash(instructions_path, model, temperature, top_p),
+        }
+
+    @staticmethod
+    def _config_hash(instructions_path, model, temperature, top_p):
+        """
+        AssistantRegistry.config_hash of an assistant built from `instructions_path`.
+        """
+        with open(instructions_path, "r", encoding="utf-8") as f:
+            instructions = f.read()
+        return AssistantRegistry.config_hash(instructions, model, [], temperature, top_p)
 
     def _save_assistant_id(self, assistant_name, new_assistant_id, path):
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(f"{assistant_name, new_assistant_id}\n")
+        """
+        Records ('name', 'id') in the ids file, replacing the previous line of that
+        name instead of appending a new one, so the file does not grow on every run.
+        """
+        new_line = f"{assistant_name, new_assistant_id}"
+        lines = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip()]
+
+        pattern = re.compile(r"\('([^']+)',\s*'([^']+)'\)")
+        updated, replaced = [], False
+        for line in lines:
+            match = pattern.match(line)
+            if match and match.group(1) == assistant_name:
+                if not replaced:
+                    updated.append(new_line)
+                    replaced = True
+            else:
+                updated.append(line)
+        if not replaced:
+            updated.append(new_line)
+
+        if updated != lines:
+            with open(path, "w", encoding="utf-8") as f:
+                for line in updated:
+                    f.write(f"{line}\n")
 
     # -------------------------------------------------------------------------
     # 4) GET BASE ANSWERS (store them in PATH_BASE_ANSWERS_CSV)
     # -------------------------------------------------------------------------
     def get_base_assistant_answers(self):
-        runner = StaticAssistantsRunner(
-            openai_api_key=self.openai_api_key,
+        runner = self._build_answers_runner(
             txt_file_path=self.path_assistants_ids_txt,
-            csv_file_path=self.path_test_examples_csv,
             output_csv_path=self.path_base_answers_csv
         )
         runner.run_all()
         print(f"Base assistant answers stored in: {self.path_base_answers_csv}")
 
+        # New answers of the base assistant start a new run in the results store
+        self.run_id = ResultsStore.new_run_id()
+        self._store_answers(self.base_model_suffix, self.path_base_answers_csv)
+        return {"run_id": self.run_id}
+
+    def _build_answers_runner(self, txt_file_path, output_csv_path):
+        """
+        Returns the runner that collects the answers, according to ANSWERS_EXECUTION_MODE.
+        """
+        if self.answers_execution_mode == "batch":
+            return BatchAssistantsRunner(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                txt_file_path=txt_file_path,
+                csv_file_path=self.path_test_examples_csv,
+                output_csv_path=output_csv_path,
+                batch_dir=self.path_batch_dir,
+                poll_interval=self.batch_poll_interval
+            )
+        if self.answers_execution_mode == "async":
+            return AsyncStaticAssistantsRunner(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                txt_file_path=txt_file_path,
+                csv_file_path=self.path_test_examples_csv,
+                output_csv_path=output_csv_path,
+                max_concurrency=self.max_concurrent_requests,
+                thread_mode=self.thread_mode,
+                replica_sampling=self.replica_sampling
+            )
+        return StaticAssistantsRunner(
+            openai_api_key=self.openai_api_key,
+            client_factory=self.client_factory,
+            txt_file_path=txt_file_path,
+            csv_file_path=self.path_test_examples_csv,
+            output_csv_path=output_csv_path,
+            thread_mode=self.thread_mode,
+            replica_sampling=self.replica_sampling
+        )
+
     # -------------------------------------------------------------------------
     # 5) CREATE EVALUATOR ASSISTANT
     # -------------------------------------------------------------------------
@@ -217,9 +446,12 @@ class AssistantImprover:
 
         assistant_creator = AssistantCreator(
             api_key=self.openai_api_key,
-            instructions_path=self.path_instructions_evaluator_txt
+            client_factory=self.client_factory,
+            instructions_path=self.path_instructions_evaluator_txt,
+            assistant_name=self.assistant_name,
+            registry_path=self.path_assistant_registry
         )
-        self.evaluator_assistant = assistant_creator.create_assistant(
+        self.evaluator_assistant = assistant_creator.get_or_create_assistant(
             name_suffix="static_evaluator",
             model=self.evaluator_model_name,
             tools=[],
@@ -231,7 +463,9 @@ class AssistantImprover:
             self.evaluator_assistant.id,
             self.path_evaluator_id_txt
         )
-        print(f"Evaluator assistant created: {self.evaluator_assistant.name}")
+        print(f"Evaluator assistant ready: {self.evaluator_assistant.name} ({self.evaluator_assistant.id})")
+        return self._assistant_state(self.evaluator_assistant, self.path_instructions_evaluator_txt,
+                                     self.evaluator_model_name, self.evaluator_temperature, self.evaluator_top_p)
 
     def create_eval_prompt(self):
 
@@ -263,11 +497,7 @@ class AssistantImprover:
     # -------------------------------------------------------------------------
     def grade_base_assistant_responses(self):
         evaluator_id = self._extract_assistant_id_from_file(self.path_evaluator_id_txt)
-        grader = FileManagerGrader(
-            openai_api_key=self.openai_api_key,
-            assistant_id=evaluator_id,
-            csv_input_path=self.path_base_answers_csv
-        )
+        grader = self._build_grader(evaluator_id, self.path_base_answers_csv)
         base_answer_col = f"{self.assistant_name}_{self.base_model_suffix}"
         grader.run(
             question_column=COLUMN_QUESTION,
@@ -276,45 +506,167 @@ class AssistantImprover:
             output_csv_path=self.path_base_grades_csv
         )
         print(f"Base assistant responses graded. Results saved in: {self.path_base_grades_csv}")
+        self._store_grades(self.base_model_suffix, self.path_base_grades_csv, self.path_base_answers_csv)
+
+    def _build_grader(self, evaluator_id, csv_input_path):
+        """
+        Returns the grader for csv_input_path, according to GRADING_EXECUTION_MODE
+        and GRADING_BACKEND, backed by the persistent grade cache when GRADE_CACHE_ENABLED.
+        """
+        row_processor = None
+        multi_row = self.grading_backend == "multi_row" and self.grading_execution_mode != "batch"
+        if multi_row:
+            row_processor = MultiRowChatProcessor(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                evaluator_instructions_path=self.path_instructions_evaluator_txt,
+                model=self.evaluator_model_name,
+                temperature=self.evaluator_temperature,
+                top_p=self.evaluator_top_p,
+                rows_per_request=self.grading_rows_per_request,
+                context_tokens=self.evaluator_context_tokens
+            )
+        elif self.grading_backend in ("chat", "logprobs", "multi_row") or self.grading_execution_mode == "batch":
+            row_processor_class = LogprobRowProcessor if self.grading_backend == "logprobs" else ChatRowProcessor
+            row_processor = row_processor_class(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                evaluator_instructions_path=self.path_instructions_evaluator_txt,
+                model=self.evaluator_model_name,
+                temperature=self.evaluator_temperature,
+                top_p=self.evaluator_top_p
+            )
+
+        grade_cache = None
+        if self.grade_cache_enabled:
+            grade_cache = GradeCache(
+                db_path=self.path_grade_cache_db,
+                evaluator_instructions_path=self.path_instructions_evaluator_txt,
+                evaluator_model=self.evaluator_model_name,
+                max_entries=self.grade_cache_max_entries,
+                scoring=getattr(row_processor, "scoring", None)
+            )
+
+        if self.grading_execution_mode == "batch":
+            return BatchFileManagerGrader(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                csv_input_path=csv_input_path,
+                row_processor=row_processor,
+                batch_dir=self.path_batch_dir,
+                grade_cache=grade_cache,
+                poll_interval=self.batch_poll_interval
+            )
+        if multi_row:
+            # "serial" grades one group at a time
+            return MultiRowFileManagerGrader(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                csv_input_path=csv_input_path,
+                row_processor=row_processor,
+                grade_cache=grade_cache,
+                max_workers=self.max_concurrent_requests if self.grading_execution_mode == "concurrent" else 1,
+                requests_per_minute=self.grading_requests_per_minute
+            )
+        if self.grading_execution_mode == "concurrent":
+            return ConcurrentFileManagerGrader(
+                openai_api_key=self.openai_api_key,
+                client_factory=self.client_factory,
+                assistant_id=evaluator_id,
+                csv_input_path=csv_input_path,
+                grade_cache=grade_cache,
+                row_processor=row_processor,
+                max_workers=self.max_concurrent_requests,
+                requests_per_minute=self.grading_requests_per_minute
+            )
+        return FileManagerGrader(
+            openai_api_key=self.openai_api_key,
+            client_factory=self.client_factory,
+            assistant_id=evaluator_id,
+            csv_input_path=csv_input_path,
+            grade_cache=grade_cache,
+            row_processor=row_processor
+        )
 
     # -------------------------------------------------------------------------
     # 7) GATHER WORST QUESTIONS (lowest grades)
     # -------------------------------------------------------------------------
     def gather_worst_indices(self, worst_n=None):
         """
-        Return the row indices of the 'worst' (lowest-grade) examples from path_base_grades_csv.
+        Return the ids (COLUMN_QUESTION_ID) of the 'worst' questions: the distinct
+        questions with the lowest mean base grade over their replicas.
         """
         if worst_n is None:
             worst_n = self.num_worst_examples
 
+        if self._stored_grades(self.base_model_suffix):
+            # Grouped in the results store (same order as below: lowest mean, then test order)
+            worst = self.results_store.worst_questions(
+                self.assistant_name, self.run_id, self.base_model_suffix, worst_n
+            )
+            worst_ids = [question_id for question_id, _, _, _ in worst]
+            print(f"Worst {len(worst_ids)} question ids: {worst_ids}")
+            return worst_ids
+
         if not os.path.exists(self.path_base_grades_csv):
             print(f"No base grades found at {self.path_base_grades_csv}.")
             return []
 
-        # We'll read the entire grades CSV
-        with open(self.path_base_grades_csv, 'r', encoding='utf-8') as f:
-            reader = list(csv.DictReader(f))  # materialize in list
-
-        # Sort by 'grade' ascending (lowest is worst)
-        # Keep track of each row's index
-        indexed_rows = list(enumerate(reader))  # (idx, row_dict)
-        sorted_indexed_rows = sorted(
-            indexed_rows, 
-            key=lambda x: float(x[1].get('grade', 0))
+        # Stream the grades CSV, keeping one running sum per question (rows without a
+        # numeric grade are failed requests, not grades, and are left out)
+        ignored = 0
+        totals = {}  # {question_id: [sum, count]}, in test order
+        sample_ids = self._iter_sample_ids(self.path_base_answers_csv)
+        for (question_id, _), row in zip(sample_ids, self._iter_csv_rows(self.path_base_grades_csv)):
+            if self._is_numeric_grade(row.get('grade')):
+                total = totals.setdefault(question_id, [0.0, 0])
+                total[0] += float(row['grade'])
+                total[1] += 1
+            else:
+                ignored += 1
+        if ignored:
+            print(f"Ignoring {ignored} rows without a numeric grade.")
+
+        # Lowest mean first; nsmallest keeps the test order between equal means
+        worst_graded = heapq.nsmallest(
+            worst_n, ((question_id, total / count) for question_id, (total, count) in totals.items()),
+            key=lambda item: item[1]
         )
 
-        # Take the first 'worst_n' items
-        worst_indexed = sorted_indexed_rows[:worst_n]
+        # Return just the ids
+        worst_ids = [item[0] for item in worst_graded]
+        print(f"Worst {len(worst_ids)} question ids: {worst_ids}")
+        return worst_ids
 
-        # Return just the indices
-        worst_indices = [item[0] for item in worst_indexed]
-        print(f"Worst {len(worst_indices)} row indices: {worst_indices}")
-        return worst_indices
+    @staticmethod
+    def _iter_csv_rows(path):
+        """
+        Yields the rows of a CSV file one at a time, so the file is never loaded whole.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+
+    @classmethod
+    def _iter_sample_ids(cls, answers_csv_path):
+        """
+        Yields the (question_id, replica) of every row of an answers CSV. Rows of CSVs
+        written before the test had ids get their row index as question id.
+        """
+        for idx, row in enumerate(cls._iter_csv_rows(answers_csv_path)):
+            yield row.get(COLUMN_QUESTION_ID) or str(idx), int(row.get(COLUMN_REPLICA) or 0)
+
+    @staticmethod
+    def _is_numeric_grade(grade) -> bool:
+        try:
+            float(grade)
+        except (TypeError, ValueError):
+            return False
+        return True
 
     def create_worst_questions_file(self, worst_indices):
         """
-        Reads path_base_answers_csv, extracts question/human_answer for each 
-        row index in worst_indices, and saves them as a JSON array:
+        Reads path_base_answers_csv, extracts question/human_answer for each
+        question id in worst_indices, and saves them as a JSON array:
         [
           {"Q": "...", "A": "..."},
           {"Q": "...", "A": "..."}
@@ -325,18 +677,25 @@ class AssistantImprover:
             print("No worst indices found. Skipping creation of worst questions file.")
             return
 
-        # Read the base answers CSV
-        with open(self.path_base_answers_csv, 'r', encoding='utf-8') as f_ans:
-            ans_rows = list(csv.DictReader(f_ans))
-
-        data_list = []
-        for idx in worst_indices:
-            # If idx is within range:
-            if 0 <= idx < len(ans_rows):
-                row = ans_rows[idx]
+        wanted = set(worst_indices)
+        found = {}
+        if self.results_store is not None and self.run_id is not None:
+            stored = self.results_store.questions(self.assistant_name, self.run_id, self.base_model_suffix, wanted)
+            for idx, (question, answer) in stored.items():
+                found[idx] = {"Q": (question or "").strip(), "A": (answer or "").strip()}
+
+        # Otherwise, stream the base answers CSV, keeping only the questions in worst_indices
+        rows = self._iter_csv_rows(self.path_base_answers_csv) if len(found) < len(wanted) else ()
+        for (question_id, _), row in zip(self._iter_sample_ids(self.path_base_answers_csv), rows):
+            if question_id in wanted and question_id not in found:
                 question = row.get(COLUMN_QUESTION, "").strip()
                 answer = row.get(COLUMN_HUMAN_ANSWER, "").strip()
-                data_list.append({"Q": question, "A": answer})
+                found[question_id] = {"Q": question, "A": answer}
+                if len(found) == len(wanted):
+                    break
+
+        # Same order as worst_indices (worst first); unknown ids are skipped
+        data_list = [found[question_id] for question_id in worst_indices if question_id in found]
 
         # Write out to path_worst_questions_txt
         with open(self.path_worst_questions_txt, "w", encoding="utf-8") as f_out:
@@ -357,7 +716,7 @@ class AssistantImprover:
         print(f"Converted {self.path_worst_questions_txt} to {self.path_worst_questions_jsonl}")
 
     def upload_worst_jsonl(self):
-        uploader = OpenAIFileUploader(api_key=self.openai_api_key)
+        uploader = OpenAIFileUploader(api_key=self.openai_api_key, client_factory=self.client_factory)
         response = uploader.upload_file(
             file_path=self.path_worst_questions_jsonl,
             purpose="fine-tune"
@@ -378,9 +737,12 @@ class AssistantImprover:
     def create_fine_tuned_assistant(self):
         assistant_creator = AssistantCreator(
             api_key=self.openai_api_key,
-            instructions_path=self.path_instructions_txt
+            client_factory=self.client_factory,
+            instructions_path=self.path_instructions_txt,
+            assistant_name=self.assistant_name,
+            registry_path=self.path_assistant_registry
         )
-        self.new_fine_tuned_assistant = assistant_creator.create_assistant(
+        self.new_fine_tuned_assistant = assistant_creator.get_or_create_assistant(
             name_suffix=self.fine_tuned_model_suffix,
             model=self.fine_tune_model,
             tools=[],
@@ -392,7 +754,9 @@ class AssistantImprover:
             self.new_fine_tuned_assistant.id,
             self.path_assistant_id_fine_tuned_txt
         )
-        print(f"Fine-tuned assistant created: {self.new_fine_tuned_assistant.name}")
+        print(f"Fine-tuned assistant ready: {self.new_fine_tuned_assistant.name} ({self.new_fine_tuned_assistant.id})")
+        return self._assistant_state(self.new_fine_tuned_assistant, self.path_instructions_txt, self.fine_tune_model,
+                                     self.base_temperature, self.base_top_p)
 
     def fine_tune_new_assistant_workflow(self):
         """
@@ -407,29 +771,63 @@ class AssistantImprover:
         self.create_fine_tuning_job(file_id)
         self.create_fine_tuned_assistant()
 
+    def fine_tune_model_step(self):
+        """
+        Upload + fine-tuning job, resumable: the uploaded file and the job id are saved
+        in the pipeline manifest as soon as they exist, so an interrupted run keeps
+        monitoring the same job instead of uploading and fine-tuning again.
+        Returns the state stored in the manifest.
+        """
+        step = "fine_tune_model"
+        training_sha256 = file_sha256(self.path_worst_questions_jsonl)
+        state = self.manifest.state(step) if self.manifest else {}
+        if state.get("training_sha256") != training_sha256:
+            state = {}
+
+        fine_tune_job_id = state.get("fine_tune_job_id")
+        if fine_tune_job_id:
+            print(f"Resuming fine-tuning job {fine_tune_job_id}.")
+        else:
+            file_id = state.get("training_file_id") or self.upload_worst_jsonl()
+            self._save_step_state(step, training_sha256=training_sha256, training_file_id=file_id)
+            fine_tune_job_id = self.fine_tuner.create_fine_tuning_job(
+                training_file_id=file_id,
+                model=self.base_model_name,
+                suffix=f"{self.assistant_name}_{self.fine_tuned_model_suffix}",
+            ).id
+            self._save_step_state(step, fine_tune_job_id=fine_tune_job_id)
+
+        self.fine_tune_model = self.fine_tuner.monitor_fine_tuning_job(fine_tune_job_id)
+        if not self.fine_tune_model:
+            raise RuntimeError(f"Fine-tuning job {fine_tune_job_id} did not produce a model.")
+        print(f"Fine-tuned model is ready: {self.fine_tune_model}")
+        return {"fine_tune_model": self.fine_tune_model}
+
+    def _save_step_state(self, step, **values):
+        if self.manifest is not None:
+            self.manifest.update_state(step, **values)
+
+    def _restore_fine_tune_model(self, state):
+        self.fine_tune_model = state.get("fine_tune_model")
+
     # -------------------------------------------------------------------------
     # 11) GET FINE-TUNED ANSWERS => store them in PATH_FINE_TUNED_ANSWERS_CSV
     # -------------------------------------------------------------------------
     def get_fine_tuned_assistant_answers(self):
-        runner = StaticAssistantsRunner(
-            openai_api_key=self.openai_api_key,
+        runner = self._build_answers_runner(
             txt_file_path=self.path_assistant_id_fine_tuned_txt,
-            csv_file_path=self.path_test_examples_csv,
             output_csv_path=self.path_fine_tuned_answers_csv
         )
         runner.run_all()
         print(f"Fine-tuned assistant answers stored in: {self.path_fine_tuned_answers_csv}")
+        self._store_answers(self.fine_tuned_model_suffix, self.path_fine_tuned_answers_csv)
 
     # -------------------------------------------------------------------------
     # 12) GRADE FINE-TUNED ANSWERS => store in PATH_FINE_TUNED_GRADES_CSV
     # -------------------------------------------------------------------------
     def grade_fine_tuned_assistant_responses(self):
         evaluator_id = self._extract_assistant_id_from_file(self.path_evaluator_id_txt)
-        grader = FileManagerGrader(
-            openai_api_key=self.openai_api_key,
-            assistant_id=evaluator_id,
-            csv_input_path=self.path_fine_tuned_answers_csv
-        )
+        grader = self._build_grader(evaluator_id, self.path_fine_tuned_answers_csv)
         ft_answer_col = f"{self.assistant_name}_{self.fine_tuned_model_suffix}"
         grader.run(
             question_column=COLUMN_QUESTION,
@@ -438,6 +836,80 @@ class AssistantImprover:
             output_csv_path=self.path_fine_tuned_grades_csv
         )
         print(f"Fine-tuned assistant responses graded. Results in: {self.path_fine_tuned_grades_csv}")
+        self._store_grades(self.fine_tuned_model_suffix, self.path_fine_tuned_grades_csv,
+                           self.path_fine_tuned_answers_csv)
+
+    # -------------------------------------------------------------------------
+    # RESULTS STORE
+    # -------------------------------------------------------------------------
+    def _store_answers(self, variant, answers_csv_path):
+        """
+        Copies the answers CSV of a variant into the results store (under self.run_id).
+        """
+        if self.results_store is None or not os.path.exists(answers_csv_path):
+            return
+        if self.run_id is None:
+            self.run_id = ResultsStore.new_run_id()
+        answer_column = f"{self.assistant_name}_{variant}"
+        stored = self.results_store.record_answers(
+            self.assistant_name, self.run_id, variant,
+            (
+                (question_id, replica,
+                 row.get(COLUMN_QUESTION, ""), row.get(COLUMN_HUMAN_ANSWER, ""), row.get(answer_column, ""))
+                for (question_id, replica), row
+                in zip(self._iter_sample_ids(answers_csv_path), self._iter_csv_rows(answers_csv_path))
+            )
+        )
+        print(f"{stored} {variant} answers saved in the results store (run {self.run_id}).")
+
+    def _store_grades(self, variant, grades_csv_path, answers_csv_path):
+        """
+        Copies the grades CSV of a variant into the results store (under self.run_id).
+        The grades are in the order of the answers CSV, which gives their question id
+        and replica.
+        """
+        if self.results_store is None or not os.path.exists(grades_csv_path) or not os.path.exists(answers_csv_path):
+            return
+        if self.run_id is None:
+            self.run_id = ResultsStore.new_run_id()
+        stored = self.results_store.record_grades(
+            self.assistant_name, self.run_id, variant,
+            (
+                (question_id, replica, row.get("grade", ""), row.get("confidence"))
+                for (question_id, replica), row
+                in zip(self._iter_sample_ids(answers_csv_path), self._iter_csv_rows(grades_csv_path))
+            )
+        )
+        print(f"{stored} {variant} grades saved in the results store (run {self.run_id}).")
+
+    def _stored_grades(self, variant) -> bool:
+        """
+        True if the results store has the grades of `variant` for the current run.
+        """
+        return (self.results_store is not None and self.run_id is not None
+                and self.results_store.count(self.assistant_name, self.run_id, variant, graded=True) > 0)
+
+    def _restore_run_id(self, state):
+        """
+        Restores the run of a skipped base answers step. Manifests written before the
+        results store existed have no run_id: a new run is started from the CSVs.
+        """
+        self.run_id = state.get("run_id")
+        if self.run_id is None:
+            self.run_id = ResultsStore.new_run_id()
+            self._save_step_state("get_base_assistant_answers", run_id=self.run_id)
+        if (self.results_store is not None
+                and not self.results_store.count(self.assistant_name, self.run_id, self.base_model_suffix)):
+            self._store_answers(self.base_model_suffix, self.path_base_answers_csv)
+
+    def _restore_stored_answers(self, variant, answers_csv_path):
+        if (self.results_store is not None
+                and not self.results_store.count(self.assistant_name, self.run_id, variant)):
+            self._store_answers(variant, answers_csv_path)
+
+    def _restore_stored_grades(self, variant, grades_csv_path, answers_csv_path):
+        if self.results_store is not None and not self._stored_grades(variant):
+            self._store_grades(variant, grades_csv_path, answers_csv_path)
 
     # -------------------------------------------------------------------------
     # 13) UNIFY RESULTS
@@ -465,37 +937,31 @@ class AssistantImprover:
                 print(f"Missing file: {file_path}")
                 return
 
-        # 2. Read each file into a list of rows
-        with open(self.path_base_answers_csv, "r", encoding="utf-8") as f:
-            base_answers = list(csv.DictReader(f))
-
-        with open(self.path_base_grades_csv, "r", encoding="utf-8") as f:
-            base_grades = list(csv.DictReader(f))
-
-        with open(self.path_fine_tuned_answers_csv, "r", encoding="utf-8") as f:
-            fine_tuned_answers = list(csv.DictReader(f))
-
-        with open(self.path_fine_tuned_grades_csv, "r", encoding="utf-8") as f:
-            fine_tuned_grades = list(csv.DictReader(f))
-
-        # 3. Combine rows by index
-        combined_rows = []
-        for idx in range(len(base_answers)):
-            base_row = base_answers[idx] if idx < len(base_answers) else {}
-            base_grade_row = base_grades[idx] if idx < len(base_grades) else {}
-            fine_tuned_row = fine_tuned_answers[idx] if idx < len(fine_tuned_answers) else {}
-            fine_tuned_grade_row = fine_tuned_grades[idx] if idx < len(fine_tuned_grades) else {}
-
-            combined_rows.append({
-                "question": base_row.get(COLUMN_QUESTION, ""),
-                "human_response": base_row.get(COLUMN_HUMAN_ANSWER, ""),
-                f"{self.assistant_name}_base_answer": base_row.get(f"{self.assistant_name}_base", ""),
-                f"{self.assistant_name}_base_grade": base_grade_row.get("grade", ""),
-                f"{self.assistant_name}_fine_tuned_answer": fine_tuned_row.get(f"{self.assistant_name}_fine_tuned_with_worst", ""),
-                f"{self.assistant_name}_fine_tuned_grade": fine_tuned_grade_row.get("grade", ""),
-            })
-
-        # 4. Write the unified CSV
+        # 2. Rows from the results store (one indexed join), or the 4 files streamed
+        #    side by side, one row of each at a time
+        if self._stored_grades(self.base_model_suffix):
+            rows = (
+                (
+                    {COLUMN_QUESTION: question, COLUMN_HUMAN_ANSWER: human_answer,
+                     f"{self.assistant_name}_{self.base_model_suffix}": base_answer},
+                    {"grade": base_grade},
+                    {f"{self.assistant_name}_{self.fine_tuned_model_suffix}": fine_tuned_answer},
+                    {"grade": fine_tuned_grade},
+                )
+                for question, human_answer, base_answer, base_grade, fine_tuned_answer, fine_tuned_grade
+                in self.results_store.iter_unified(
+                    self.assistant_name, self.run_id, self.base_model_suffix, self.fine_tuned_model_suffix
+                )
+            )
+        else:
+            rows = zip_longest(
+                self._iter_csv_rows(self.path_base_answers_csv),
+                self._iter_csv_rows(self.path_base_grades_csv),
+                self._iter_csv_rows(self.path_fine_tuned_answers_csv),
+                self._iter_csv_rows(self.path_fine_tuned_grades_csv),
+            )
+
+        # 3. Write the unified CSV, combining the rows by index
         fieldnames = [
             "question",
             "human_response",
@@ -507,14 +973,91 @@ class AssistantImprover:
         with open(out_file, "w", newline="", encoding="utf-8") as f_out:
             writer = csv.DictWriter(f_out, fieldnames=fieldnames)
             writer.writeheader()
-            writer.writerows(combined_rows)
+
+            for base_row, base_grade_row, fine_tuned_row, fine_tuned_grade_row in rows:
+                # The base answers define the rows; missing rows of the other files are left empty
+                if base_row is None:
+                    break
+                base_grade_row = base_grade_row or {}
+                fine_tuned_row = fine_tuned_row or {}
+                fine_tuned_grade_row = fine_tuned_grade_row or {}
+
+                writer.writerow({
+                    "question": base_row.get(COLUMN_QUESTION, ""),
+                    "human_response": base_row.get(COLUMN_HUMAN_ANSWER, ""),
+                    f"{self.assistant_name}_base_answer": base_row.get(f"{self.assistant_name}_{self.base_model_suffix}", ""),
+                    f"{self.assistant_name}_base_grade": base_grade_row.get("grade", ""),
+                    f"{self.assistant_name}_fine_tuned_answer": fine_tuned_row.get(f"{self.assistant_name}_{self.fine_tuned_model_suffix}", ""),
+                    f"{self.assistant_name}_fine_tuned_grade": fine_tuned_grade_row.get("grade", ""),
+                })
 
         print(f"Unified CSV created at: {out_file}")
 
+    # -------------------------------------------------------------------------
+    # 14) MEAN AND VARIANCE OF EACH QUESTION'S GRADES
+    # -------------------------------------------------------------------------
+    def summarize_question_grades(self):
+        """
+        Groups the graded samples by question id (each test question is answered
+        TEST_REPLICAS times) and writes the mean and sample variance of the base and
+        fine-tuned grades of each question to path_question_stats_csv.
+        Rows without a numeric grade are left out of the statistics.
+        """
+        if not os.path.exists(self.path_base_answers_csv):
+            print(f"Missing file: {self.path_base_answers_csv}")
+            return
+
+        # {question_id: [question, samples, {variant: [count, mean, M2]}]} (Welford's online algorithm)
+        stats = {}
+        rows = zip_longest(
+            self._iter_csv_rows(self.path_base_answers_csv),
+            self._iter_csv_rows(self.path_base_grades_csv) if os.path.exists(self.path_base_grades_csv) else (),
+            self._iter_csv_rows(self.path_fine_tuned_grades_csv)
+            if os.path.exists(self.path_fine_tuned_grades_csv) else (),
+        )
+        variants = ("base", "fine_tuned")
+        for answer_row, base_grade_row, fine_tuned_grade_row in rows:
+            if answer_row is None:
+                break
+            question = answer_row.get(COLUMN_QUESTION, "")
+            question_id = answer_row.get(COLUMN_QUESTION_ID) or question
+            entry = stats.setdefault(question_id, [question, 0, {variant: [0, 0.0, 0.0] for variant in variants}])
+            entry[1] += 1
+            for variant, grade_row in zip(variants, (base_grade_row, fine_tuned_grade_row)):
+                grade = (grade_row or {}).get("grade")
+                if not self._is_numeric_grade(grade):
+                    continue
+                running = entry[2][variant]
+                running[0] += 1
+                delta = float(grade) - running[1]
+                running[1] += delta / running[0]
+                running[2] += delta * (float(grade) - running[1])
+
+        def mean_and_variance(running):
+            count, mean, m2 = running
+            if not count:
+                return "", ""
+            return round(mean, 4), round(m2 / (count - 1), 4) if count > 1 else ""
+
+        fieldnames = [
+            COLUMN_QUESTION_ID, "question", "replicas",
+            "base_mean", "base_variance", "fine_tuned_mean", "fine_tuned_variance",
+        ]
+        with open(self.path_question_stats_csv, "w", newline="", encoding="utf-8") as f_out:
+            writer = csv.writer(f_out)
+            writer.writerow(fieldnames)
+            for question_id, (question, samples, running) in stats.items():
+                writer.writerow([
+                    question_id, question, samples,
+                    *mean_and_variance(running["base"]), *mean_and_variance(running["fine_tuned"]),
+                ])
+
+        print(f"Grade mean and variance of {len(stats)} questions saved in: {self.path_question_stats_csv}")
+
     # -------------------------------------------------------------------------
     # RUN: MAIN WORKFLOW
     # -------------------------------------------------------------------------
-    def run(self):
+    def run(self, force_steps=()):
         """
         Steps:
           1) create_instructions()
@@ -525,44 +1068,212 @@ class AssistantImprover:
           6) grade_base_assistant_responses()
           7) gather worst questions indices + create worst questions file
           8) convert worst txt to JSONL
-          9) upload JSONL
-          10) create fine-tuned model
+          9, 10) upload JSONL + create fine-tuned model
+          10b) create fine-tuned assistant
           11) get fine-tuned answers
           12) grade fine-tuned answers
           13) unify CSV
-        """
-        # 1) Create instructions & separate examples
-        self.create_instructions()
-
-        # 2) Create the test CSV
-        self.create_static_tests()
-
-        # 3) Create base assistant
-        self.create_base_assistant()
-
-        # 4) Get base answers
-        self.get_base_assistant_answers()
-
-        # 5) Create evaluator
-        self.create_evaluator_assistant()
-
-        # 6) Grade base answers
-        self.grade_base_assistant_responses()
-
-        # 7) Gather worst questions
-        worst_questions = self.gather_worst_indices()
-        self.create_worst_questions_file(worst_questions)
+          14) mean and variance of the grades of each question
 
-        # 8,9,10) Fine-tune model + create fine-tuned assistant
-        self.fine_tune_new_assistant_workflow()
+        Completed steps are recorded in PATH_PIPELINE_MANIFEST with the hashes of their
+        files. A new run skips the steps that are still up to date and resumes from the
+        first one that is not (e.g. after a crash while grading). `force_steps` are run
+        again anyway, e.g. force_steps=["create_static_tests"].
 
-        # 11) Get fine-tuned answers
-        self.get_fine_tuned_assistant_answers()
+        With INCREMENTAL_REEVALUATION the Google Doc is imported on every run, and only
+        what depends on what changed runs again: an unchanged Doc stops after the import.
+        The test questions are the examples in the base assistant's instructions, so
+        editing one of them re-asks every question; grades of answers that come out
+        identical are served by the grade cache.
 
-        # 12) Grade fine-tuned answers
-        self.grade_fine_tuned_assistant_responses()
+        The latency, retries and tokens of every API call are printed per step at the
+        end and written to PATH_API_METRICS_PROM.
 
-        # 13) Unify results
-        self.unify_results_in_single_csv()
+        Answers and grades are also saved in the results store (PATH_RESULTS_DB) under
+        one run id per set of base answers; steps 7 and 13 read them from there.
+        """
+        self.manifest = PipelineManifest(self.path_pipeline_manifest)
+        metrics = self.client_factory.metrics
+        runner = PipelineRunner(self.build_pipeline_steps(), self.manifest, force_steps=force_steps,
+                                step_context=metrics.step)
+        try:
+            if runner.run():
+                print("Done!")
+        finally:
+            print("\n=== API calls per step ===")
+            print(metrics.report())
+            metrics.write_prometheus(self.path_api_metrics_prom)
+            print(f"API metrics written to {self.path_api_metrics_prom}")
+
+    def build_pipeline_steps(self):
+        if self.incremental_reevaluation:
+            # 1) Import the Google Doc on every run; separate examples only if its text changed
+            instructions_steps = [
+                PipelineStep(
+                    "import_instructions", self.import_instructions,
+                    outputs=[self.path_instructions_txt],
+                    always_run=True
+                ),
+                PipelineStep(
+                    "create_instructions", self.separate_text,
+                    inputs=[self.path_instructions_txt],
+                    outputs=[self.path_instructions_no_examples, self.path_examples_txt],
+                    depends_on=["import_instructions"]
+                ),
+            ]
+        else:
+            # 1) Create instructions & separate examples
+            instructions_steps = [
+                PipelineStep(
+                    "create_instructions", self.create_instructions,
+                    outputs=[self.path_instructions_txt, self.path_instructions_no_examples, self.path_examples_txt]
+                ),
+            ]
+        return instructions_steps + [
+            # 2) Create the test CSV
+            PipelineStep(
+                "create_static_tests", self.create_static_tests,
+                inputs=[self.path_examples_txt],
+                outputs=[self.path_test_examples_csv],
+                depends_on=["create_instructions"]
+            ),
+            # 3) Create base assistant
+            PipelineStep(
+                "create_base_assistant", self.create_base_assistant,
+                inputs=[self.path_instructions_txt],
+                outputs=[self.path_assistants_ids_txt],
+                depends_on=["create_instructions"]
+            ),
+            # 4) Get base answers
+            PipelineStep(
+                "get_base_assistant_answers", self.get_base_assistant_answers,
+                inputs=[self.path_assistants_ids_txt, self.path_test_examples_csv],
+                outputs=[self.path_base_answers_csv],
+                depends_on=["create_static_tests", "create_base_assistant"],
+                restore=self._restore_run_id,
+                is_complete=lambda: self._all_samples_answered(self.path_base_answers_csv)
+            ),
+            # 5) Create evaluator
+            PipelineStep(
+                "create_evaluator_assistant", self.create_evaluator_assistant,
+                inputs=[self.path_instructions_no_examples],
+                outputs=[self.path_instructions_evaluator_txt, self.path_evaluator_id_txt],
+                depends_on=["create_instructions"]
+            ),
+            # 6) Grade base answers
+            PipelineStep(
+                "grade_base_assistant_responses", self.grade_base_assistant_responses,
+                inputs=[self.path_base_answers_csv, self.path_instructions_evaluator_txt, self.path_evaluator_id_txt],
+                outputs=[self.path_base_grades_csv],
+                depends_on=["get_base_assistant_answers", "create_evaluator_assistant"],
+                restore=lambda state: self._restore_stored_grades(
+                    self.base_model_suffix, self.path_base_grades_csv, self.path_base_answers_csv
+                ),
+                is_complete=lambda: self._all_rows_graded(self.path_base_grades_csv)
+            ),
+            # 7) Gather worst questions
+            PipelineStep(
+                "create_worst_questions_file",
+                lambda: self.create_worst_questions_file(self.gather_worst_indices()),
+                inputs=[self.path_base_grades_csv, self.path_base_answers_csv],
+                outputs=[self.path_worst_questions_txt],
+                depends_on=["grade_base_assistant_responses"]
+            ),
+            # 8) Convert worst txt to JSONL
+            PipelineStep(
+                "convert_worst_txt_to_jsonl", self.convert_worst_txt_to_jsonl,
+                inputs=[self.path_worst_questions_txt, self.path_instructions_no_examples],
+                outputs=[self.path_worst_questions_jsonl],
+                depends_on=["create_worst_questions_file"]
+            ),
+            # 9, 10) Upload JSONL + fine-tune model
+            PipelineStep(
+                "fine_tune_model", self.fine_tune_model_step,
+                inputs=[self.path_worst_questions_jsonl],
+                depends_on=["convert_worst_txt_to_jsonl"],
+                restore=self._restore_fine_tune_model
+            ),
+            # 10b) Create fine-tuned assistant
+            PipelineStep(
+                "create_fine_tuned_assistant", self.create_fine_tuned_assistant,
+                inputs=[self.path_instructions_txt],
+                outputs=[self.path_assistant_id_fine_tuned_txt],
+                depends_on=["fine_tune_model"]
+            ),
+            # 11) Get fine-tuned answers
+            PipelineStep(
+                "get_fine_tuned_assistant_answers", self.get_fine_tuned_assistant_answers,
+                inputs=[self.path_assistant_id_fine_tuned_txt, self.path_test_examples_csv],
+                outputs=[self.path_fine_tuned_answers_csv],
+                depends_on=["create_fine_tuned_assistant", "create_static_tests"],
+                restore=lambda state: self._restore_stored_answers(
+                    self.fine_tuned_model_suffix, self.path_fine_tuned_answers_csv
+                ),
+                is_complete=lambda: self._all_samples_answered(self.path_fine_tuned_answers_csv)
+            ),
+            # 12) Grade fine-tuned answers
+            PipelineStep(
+                "grade_fine_tuned_assistant_responses", self.grade_fine_tuned_assistant_responses,
+                inputs=[self.path_fine_tuned_answers_csv, self.path_instructions_evaluator_txt,
+                        self.path_evaluator_id_txt],
+                outputs=[self.path_fine_tuned_grades_csv],
+                depends_on=["get_fine_tuned_assistant_answers", "create_evaluator_assistant"],
+                restore=lambda state: self._restore_stored_grades(
+                    self.fine_tuned_model_suffix, self.path_fine_tuned_grades_csv, self.path_fine_tuned_answers_csv
+                ),
+                is_complete=lambda: self._all_rows_graded(self.path_fine_tuned_grades_csv)
+            ),
+            # 13) Unify results
+            PipelineStep(
+                "unify_results_in_single_csv", self.unify_results_in_single_csv,
+                inputs=[self.path_base_answers_csv, self.path_base_grades_csv,
+                        self.path_fine_tuned_answers_csv, self.path_fine_tuned_grades_csv],
+                outputs=[self.path_unified_results_csv],
+                depends_on=["grade_base_assistant_responses", "grade_fine_tuned_assistant_responses"]
+            ),
+            # 14) Per-question grade statistics
+            PipelineStep(
+                "summarize_question_grades", self.summarize_question_grades,
+                inputs=[self.path_base_answers_csv, self.path_base_grades_csv, self.path_fine_tuned_grades_csv],
+                outputs=[self.path_question_stats_csv],
+                depends_on=["grade_base_assistant_responses", "grade_fine_tuned_assistant_responses"]
+            ),
+        ]
 
-        print("Done!")
\ No newline at end of file
+    def _all_samples_answered(self, answers_csv_path):
+        """
+        True if every assistant column of the answers CSV has a real answer (not a
+        failed request). Failed answers are not journaled, so the next run asks only
+        those again and replays the others from the runner's journal.
+        """
+        if not os.path.exists(answers_csv_path):
+            return False
+        failed_prefixes = StaticAssistantsRunner.FAILED_ANSWER_PREFIXES + ("No data",)
+        metadata = (COLUMN_QUESTION_ID, COLUMN_REPLICA, COLUMN_QUESTION, COLUMN_HUMAN_ANSWER)
+        total = failed = 0
+        for row in self._iter_csv_rows(answers_csv_path):
+            for column, answer in row.items():
+                if column in metadata:
+                    continue
+                total += 1
+                failed += not answer or answer.startswith(failed_prefixes)
+        if failed:
+            print(f"{failed} of {total} answers in {answers_csv_path} failed.")
+        return not failed
+
+    def _all_rows_graded(self, grades_csv_path):
+        """
+        True if every row of the grades CSV has a grade (and not an error message).
+        Rows with errors are graded again on the next run; the ones that already have
+        a grade come from the grade cache.
+        """
+        if not os.path.exists(grades_csv_path):
+            return False
+        total = failed = 0
+        for row in self._iter_csv_rows(grades_csv_path):
+            grade = row.get("grade", "")
+            total += 1
+            failed += not grade or grade.startswith(FileManagerGrader.ERROR_PREFIXES)
+        if failed:
+            print(f"{failed} of {total} rows in {grades_csv_path} have no grade.")
+        return not failed
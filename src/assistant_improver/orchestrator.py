@@ -0,0 +1,200 @@
+import contextlib
+import csv
+import dataclasses
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from parameters import GLOBAL_MAX_CONCURRENT_REQUESTS, GRADING_REQUESTS_PER_MINUTE, MAX_PARALLEL_ASSISTANTS, PATH_LOGS_DIR
+from parameters import GOOGLE_DOCS_MAX_WORKERS
+
+from src.assistant_improver.assistant_config import AssistantConfig
+
+
+def _run_assistant(config: AssistantConfig, log_path: str) -> dict:
+    """
+    Runs the whole pipeline for one assistant inside a worker process.
+    Everything the pipeline prints goes to `log_path`.
+    """
+    # Imported here so each worker process loads it (and its clients) on its own
+    from src.assistant_improver.assistant_improver import AssistantImprover
+
+    start_time = time.time()
+    error = None
+    with open(log_path, "a", encoding="utf-8", buffering=1) as log_file, \
+            contextlib.redirect_stdout(log_file), contextlib.redirect_stderr(log_file):
+        print(f"===== {time.strftime('%Y-%m-%d %H:%M:%S')} - Corriendo para: {config.assistant_name} =====")
+        try:
+            AssistantImprover(config).run()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        elapsed = time.time() - start_time
+        print(f"===== Tiempo total para {config.assistant_name}: {elapsed:.2f} segundos =====")
+
+    return {
+        "assistant_name": config.assistant_name,
+        "status": "error" if error else "ok",
+        "seconds": elapsed,
+        "error": error or "",
+        "log_path": log_path,
+    }
+
+
+class MultiAssistantOrchestrator:
+    """
+    Runs the pipeline for several assistants in parallel, one process per assistant
+    (at most `max_parallel` at the same time).
+
+    Each assistant gets its own AssistantConfig, so nothing is written to parameters.py.
+    The API budget is global: `global_max_concurrent_requests` and
+    `grading_requests_per_minute` are split evenly between the processes that run
+    at the same time.
+
+    Before the processes start, the Airtable table is listed once and the Google Docs
+    of all the assistants are imported concurrently (see prefetch_instructions); the
+    import step of each process then finds its document unchanged.
+
+    The output of each assistant goes to {logs_dir}/{assistant_name}.log, and the
+    timing of every run is appended to {logs_dir}/run_timings.csv.
+    """
+
+    def __init__(self, assistant_names: list, max_parallel: int = MAX_PARALLEL_ASSISTANTS,
+                 global_max_concurrent_requests: int = GLOBAL_MAX_CONCURRENT_REQUESTS,
+                 grading_requests_per_minute: float = GRADING_REQUESTS_PER_MINUTE,
+                 logs_dir: str = PATH_LOGS_DIR, config_overrides: dict = None,
+                 google_docs_max_workers: int = GOOGLE_DOCS_MAX_WORKERS):
+        """
+        :param assistant_names: assistants to run
+        :param max_parallel: maximum number of assistants running at the same time
+        :param global_max_concurrent_requests: requests in flight, summed over all processes
+        :param grading_requests_per_minute: grading requests per minute, summed over all processes (None = no bound)
+        :param logs_dir: folder for the per-assistant logs and the timings CSV
+        :param config_overrides: AssistantConfig fields applied to every assistant
+        :param google_docs_max_workers: Google Docs imported at the same time by prefetch_instructions
+                                        (0 = no prefetch, each process imports its own)
+        """
+        self.assistant_names = list(assistant_names)
+        self.max_parallel = max(1, min(max_parallel, len(self.assistant_names) or 1))
+        self.global_max_concurrent_requests = global_max_concurrent_requests
+        self.grading_requests_per_minute = grading_requests_per_minute
+        self.logs_dir = logs_dir
+        self.config_overrides = config_overrides or {}
+        self.google_docs_max_workers = google_docs_max_workers
+
+    def build_config(self, assistant_name: str) -> AssistantConfig:
+        """
+        AssistantConfig of one assistant, with its share of the global API budget.
+        """
+        per_process_requests = max(1, self.global_max_concurrent_requests // self.max_parallel)
+        per_process_rpm = None
+        if self.grading_requests_per_minute:
+            per_process_rpm = self.grading_requests_per_minute / self.max_parallel
+
+        overrides = {
+            "max_concurrent_requests": per_process_requests,
+            "grading_requests_per_minute": per_process_rpm,
+        }
+        overrides.update(self.config_overrides)
+        return AssistantConfig.for_assistant(assistant_name, **overrides)
+
+    def prefetch_instructions(self, configs: list) -> dict:
+        """
+        Looks up the Google Doc of every assistant with one Airtable listing (saved in
+        the shared Airtable cache) and imports all the documents concurrently with one
+        Docs service. Returns {assistant_name: status}. Any failure is only reported:
+        the pipeline of each assistant imports its document anyway.
+        """
+        # Imported here: the orchestrator itself does not need the Google/Airtable clients otherwise
+        from src.instructions_creation.file_importer import GoogleDocsBulkImporter
+        from src.instructions_creation.intructions_id_finder import AssistantDocFinder
+
+        try:
+            finder = AssistantDocFinder(cache_path=configs[0].path_airtable_cache,
+                                        cache_ttl=configs[0].airtable_cache_ttl_seconds)
+            doc_ids = finder.get_doc_ids([config.assistant_name for config in configs])
+            importer = GoogleDocsBulkImporter(os.getenv("SERVICE_ACCOUNT_FILE"),
+                                              max_workers=self.google_docs_max_workers)
+            statuses = importer.import_all({
+                config.path_instructions_txt: doc_ids[config.assistant_name][1]
+                for config in configs if config.assistant_name in doc_ids
+            })
+        except Exception as e:
+            print(f"Could not prefetch the instructions ({type(e).__name__}: {e}); "
+                  f"each assistant imports its own.")
+            return {}
+        return {
+            config.assistant_name: statuses.get(config.path_instructions_txt, "not found in Airtable")
+            for config in configs
+        }
+
+    def log_path_for(self, assistant_name: str) -> str:
+        return os.path.join(self.logs_dir, f"{assistant_name}.log")
+
+    def run(self) -> list:
+        """
+        Runs every assistant and returns one result dict per assistant
+        (assistant_name, status, seconds, error, log_path), in the input order.
+        """
+        os.makedirs(self.logs_dir, exist_ok=True)
+        start_time = time.time()
+
+        configs = {name: self.build_config(name) for name in self.assistant_names}
+        if self.google_docs_max_workers and configs:
+            self.prefetch_instructions(list(configs.values()))
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = {}
+            for name in self.assistant_names:
+                config = configs[name]
+                log_path = self.log_path_for(name)
+                print(f"Corriendo para: {name} (log: {log_path}, "
+                      f"max_concurrent_requests={config.max_concurrent_requests})")
+                futures[executor.submit(_run_assistant, config, log_path)] = name
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (the pipeline errors are caught inside it)
+                    result = {"assistant_name": name, "status": "error", "seconds": 0.0,
+                              "error": f"{type(e).__name__}: {e}", "log_path": self.log_path_for(name)}
+                results[name] = result
+
+                if result["status"] == "ok":
+                    print(f"[OK] {name}: {result['seconds']:.2f} segundos")
+                else:
+                    print(f"[ERROR] {name}: {result['error']} (ver {result['log_path']})")
+
+        ordered = [results[name] for name in self.assistant_names]
+        self._write_timings(ordered)
+        self._print_summary(ordered, time.time() - start_time)
+        return ordered
+
+    def _write_timings(self, results: list):
+        timings_path = os.path.join(self.logs_dir, "run_timings.csv")
+        is_new = not os.path.exists(timings_path)
+        finished_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with open(timings_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["finished_at", "assistant_name", "status", "seconds", "error"])
+            if is_new:
+                writer.writeheader()
+            for result in results:
+                writer.writerow({
+                    "finished_at": finished_at,
+                    "assistant_name": result["assistant_name"],
+                    "status": result["status"],
+                    "seconds": f"{result['seconds']:.2f}",
+                    "error": result["error"],
+                })
+
+    @staticmethod
+    def _print_summary(results: list, wall_seconds: float):
+        print("\n=== Resumen de ejecuciones ===")
+        for result in results:
+            print(f"{result['assistant_name']:>30}: {result['status']:>5}  {result['seconds']:8.2f} s")
+        sequential = sum(result["seconds"] for result in results)
+        print(f"Tiempo total (paralelo): {wall_seconds:.2f} segundos; suma de los tiempos individuales: {sequential:.2f} segundos.")
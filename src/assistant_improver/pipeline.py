@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import time
+
+
+def file_sha256(path: str):
+    """
+    SHA-256 of a file's content, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PipelineStep:
+    """
+    One step of the pipeline.
+
+    :param name: unique name, used as key in the manifest
+    :param action: callable without arguments that runs the step. It may return a
+                   dict, which is stored in the manifest as the step "state"
+    :param inputs: files the step reads (a change in any of them makes the step run again)
+    :param outputs: files the step writes (if one is missing or was modified, the step runs again)
+    :param depends_on: names of the steps that must run before this one
+    :param restore: callable(state) called when the step is skipped, to restore in memory
+                    what the step would have produced (e.g. the fine-tuned model name)
+    :param is_complete: optional callable() -> bool; if it returns False the step is
+                        not marked as completed (e.g. a grades file with failed rows)
+    :param always_run: run the step on every execution, because what it reads is not a
+                       local file (e.g. a Google Doc that may have been edited). Its
+                       dependents still only run again if its outputs changed.
+    """
+
+    def __init__(self, name: str, action, inputs=(), outputs=(), depends_on=(), restore=None, is_complete=None,
+                 always_run: bool = False):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.depends_on = list(depends_on)
+        self.restore = restore
+        self.is_complete = is_complete
+        self.always_run = always_run
+
+
+class PipelineManifest:
+    """
+    JSON file that records, for every step, its status ("in_progress" / "completed"),
+    the SHA-256 of its input and output files when it completed, its duration and
+    its state. It is rewritten atomically after every change, so a crash never
+    leaves it half written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.steps = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.steps = json.load(f).get("steps", {})
+
+    def get(self, step_name: str) -> dict:
+        return self.steps.get(step_name, {})
+
+    def state(self, step_name: str) -> dict:
+        return self.get(step_name).get("state", {})
+
+    def update_state(self, step_name: str, **values):
+        """
+        Saves values in the state of a step, e.g. the id of a job that is still running,
+        so that an interrupted step can pick it up again.
+        """
+        entry = self.steps.setdefault(step_name, {"status": "in_progress"})
+        entry.setdefault("state", {}).update(values)
+        self.save()
+
+    def mark_in_progress(self, step_name: str):
+        entry = self.steps.setdefault(step_name, {})
+        entry["status"] = "in_progress"
+        entry["started_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.save()
+
+    def mark_completed(self, step_name: str, inputs: dict, outputs: dict, seconds: float, state: dict = None):
+        entry = self.steps.setdefault(step_name, {})
+        entry.update({
+            "status": "completed",
+            "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "seconds": round(seconds, 2),
+            "inputs": inputs,
+            "outputs": outputs,
+        })
+        if state:
+            entry.setdefault("state", {}).update(state)
+        self.save()
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class PipelineRunner:
+    """
+    Executes a list of PipelineStep in dependency order.
+
+    A step is skipped when:
+      - the manifest says it completed,
+      - its input files still have the hashes recorded at that time,
+      - its output files still exist with the recorded hashes,
+      - none of its dependencies ran again in this execution with a different result,
+      - it is not in `force_steps` and not `always_run`.
+    A dependency that ran again but produced the same output files and the same state
+    as before does not make its dependents run: e.g. a re-imported document that did
+    not change stops there. Steps without outputs or state always count as changed.
+
+    Steps that were interrupted ("in_progress") run again, and can read their saved
+    state from the manifest to resume (see PipelineManifest.update_state).
+    """
+
+    def __init__(self, steps: list, manifest: PipelineManifest, force_steps=(), step_context=None):
+        """
+        :param step_context: optional callable(step_name) returning a context manager
+                             that wraps the step's action (e.g. ApiMetrics.step)
+        """
+        self.steps = self._sorted_steps(steps)
+        self.manifest = manifest
+        self.force_steps = set(force_steps)
+        self.step_context = step_context
+        self.executed = set()
+        self.changed = set()  # executed steps whose outputs or state differ from the previous run
+
+    @staticmethod
+    def _sorted_steps(steps: list) -> list:
+        """
+        Topological order, keeping the given order between independent steps.
+        """
+        by_name = {step.name: step for step in steps}
+        ordered, visiting, done = [], set(), set()
+
+        def visit(step):
+            if step.name in done:
+                return
+            if step.name in visiting:
+                raise ValueError(f"Cyclic dependency at step '{step.name}'")
+            visiting.add(step.name)
+            for dependency in step.depends_on:
+                if dependency not in by_name:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dependency}'")
+                visit(by_name[dependency])
+            visiting.discard(step.name)
+            done.add(step.name)
+            ordered.append(step)
+
+        for step in steps:
+            visit(step)
+        return ordered
+
+    @staticmethod
+    def _hashes(paths: list) -> dict:
+        return {path: file_sha256(path) for path in paths}
+
+    def is_up_to_date(self, step: PipelineStep) -> bool:
+        if step.name in self.force_steps or step.always_run:
+            return False
+        if any(dependency in self.changed for dependency in step.depends_on):
+            return False
+
+        entry = self.manifest.get(step.name)
+        if entry.get("status") != "completed":
+            return False
+        if entry.get("inputs") != self._hashes(step.inputs):
+            return False
+        outputs = self._hashes(step.outputs)
+        if any(digest is None for digest in outputs.values()):
+            return False
+        return entry.get("outputs") == outputs
+
+    def run(self) -> bool:
+        """
+        Runs the pending steps. Returns False if a step was left with pending work
+        (the following steps are not run), True otherwise.
+        """
+        for step in self.steps:
+            if self.is_up_to_date(step):
+                print(f"[pipeline] {step.name}: up to date, skipped.")
+                if step.restore is not None:
+                    step.restore(self.manifest.state(step.name))
+                continue
+
+            previous_status = self.manifest.get(step.name).get("status")
+            if previous_status == "in_progress":
+                print(f"[pipeline] {step.name}: resuming interrupted step...")
+            else:
+                print(f"[pipeline] {step.name}: running...")
+
+            previous = self.manifest.get(step.name)
+            # Outputs of the last completion (kept while the step is in progress again)
+            previous_outputs = previous.get("outputs")
+            previous_state = dict(previous.get("state", {}))
+
+            self.manifest.mark_in_progress(step.name)
+            input_hashes = self._hashes(step.inputs)
+            start_time = time.time()
+            if self.step_context is not None:
+                with self.step_context(step.name):
+                    state = step.action()
+            else:
+                state = step.action()
+            elapsed = time.time() - start_time
+            self.executed.add(step.name)
+
+            if step.is_complete is not None and not step.is_complete():
+                print(f"[pipeline] {step.name}: finished with pending work after {elapsed:.2f} s. "
+                      f"Stopping here; the next run resumes from this step.")
+                return False
+
+            output_hashes = self._hashes(step.outputs)
+            self.manifest.mark_completed(
+                step.name,
+                inputs=input_hashes,
+                outputs=output_hashes,
+                seconds=elapsed,
+                state=state if isinstance(state, dict) else None
+            )
+            new_state = self.manifest.state(step.name)
+            if ((not step.outputs and not new_state)
+                    or output_hashes != previous_outputs or new_state != previous_state):
+                self.changed.add(step.name)
+                print(f"[pipeline] {step.name}: completed in {elapsed:.2f} s.")
+            else:
+                print(f"[pipeline] {step.name}: completed in {elapsed:.2f} s, with the same result as before.")
+        return True
@@ -0,0 +1,377 @@
+import asyncio
+
+from openai import AsyncOpenAI
+from tqdm import tqdm
+from parameters import (
+    COLUMN_QUESTION,
+    MAX_CONCURRENT_REQUESTS,
+    REPLICA_SAMPLING,
+    RUN_COMPLETION_MODE,
+    THREAD_MODE,
+)
+
+from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.assistant_testing.run_completion_engine import RunCompletionEngine
+
+
+class AsyncStaticAssistantsRunner(StaticAssistantsRunner):
+    """
+    Same 7-step flow as StaticAssistantsRunner, but steps 3, 4 and 5 (creating threads,
+    posting the questions and launching the runs) are issued concurrently with
+    AsyncOpenAI instead of one request after another.
+
+    Step 6 waits for the runs in one of two ways (`completion_mode`):
+      - "poll":   RunCompletionEngine checks only the pending runs, concurrently and
+                  with a per-run adaptive backoff starting at `poll_interval`.
+      - "stream": runs are created with `runs.stream`, so completion (and the final
+                  answer) is pushed by the API and no polling is needed at all.
+
+    With thread_mode="per_assistant" every (assistant, question) pair gets its own
+    thread through threads.create_and_run(_stream), and all those requests are issued
+    concurrently, so the wall time stays flat as assistants are added.
+
+    With replica_sampling="chat", the chat completion requests that sample the replicas
+    of each (assistant, question) are issued concurrently too.
+
+    At most `max_concurrency` requests are in flight at the same time. The output CSV
+    is identical to the one written by StaticAssistantsRunner.write_results_to_csv.
+
+    run_all executes steps 3 to 6 inside a single event loop, so all of them share
+    the same pooled AsyncOpenAI client (and its keep-alive connections).
+    """
+
+    def __init__(self, openai_api_key: str, txt_file_path: str, csv_file_path: str, output_csv_path: str,
+                 poll_interval: float = 3.0, max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+                 completion_mode: str = RUN_COMPLETION_MODE, journal: bool = True, client_factory=None,
+                 thread_mode: str = THREAD_MODE,
+                 replica_sampling: str = REPLICA_SAMPLING):
+        super().__init__(openai_api_key, txt_file_path, csv_file_path, output_csv_path,
+                         poll_interval=poll_interval, journal=journal, client_factory=client_factory,
+                         thread_mode=thread_mode,
+                         replica_sampling=replica_sampling)
+        self.max_concurrency = max_concurrency
+        self.completion_mode = completion_mode
+
+    def sample_replicas(self):
+        """
+        Replicas of each (assistant, question) sampled by one chat completion request
+        ("n" = replicas), all the requests issued concurrently.
+        """
+        self._run_in_new_loop(self._asample_replicas())
+
+    def create_threads_and_send_questions(self):
+        """
+        Steps 3 & 4:
+          - Create a Thread for each question, with the question already posted
+            as its first user message (one request instead of two).
+        """
+        self._run_in_new_loop(self._acreate_threads_and_send_questions())
+
+    def create_runs(self):
+        """
+        Step 5 (part 1):
+        Create a run with each assistant for every thread. Threads are handled
+        concurrently; the runs of a single thread are still created one after
+        another, exactly like the sync runner does.
+        """
+        self._run_in_new_loop(self._acreate_runs())
+
+    def poll_runs_until_complete(self, poll_interval: float = 3.0):
+        """
+        Step 5 (part 2) & 6:
+        Wait until every pending run is in a terminal state and store its answer.
+        Runs that were streamed to completion in create_runs are already answered.
+        """
+        self._run_in_new_loop(self._apoll_runs_until_complete(poll_interval))
+
+    def collect_answers(self):
+        """
+        Steps 3 to 6 in one event loop, with one pooled client.
+        """
+        async def collect():
+            await self._asample_replicas()
+            if not self._pending_question_indices():
+                return
+            await self._acreate_threads_and_send_questions()
+            await self._acreate_runs()
+            await self._apoll_runs_until_complete(self.poll_interval)
+
+        self._run_in_new_loop(collect())
+
+    # -------------------------------------------------------------------------
+    # Async helpers
+    # -------------------------------------------------------------------------
+    def _run_in_new_loop(self, coroutine):
+        """
+        Runs `coroutine` in a new event loop and closes that loop's client at the end.
+        """
+        async def run_and_close():
+            try:
+                return await coroutine
+            finally:
+                await self.client_factory.aclose()
+
+        return asyncio.run(run_and_close())
+
+    def _new_async_client(self) -> AsyncOpenAI:
+        """
+        Pooled client of the running event loop.
+        """
+        return self.client_factory.async_client()
+
+    async def _asample_replicas(self):
+        groups = self._replica_groups()
+        if not groups:
+            return
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._new_async_client()
+        configs = await self._aload_assistant_configs(client, semaphore, {asst_name for asst_name, _ in groups})
+        requests = self._replica_requests(groups, configs)
+        print(f"\n=== Sampling the replicas of {len(requests)} (assistant, question) pairs with one chat "
+              f"completion each (max {self.max_concurrency} concurrent requests) ===\n")
+        with tqdm(total=len(requests), desc="Sampling replicas") as pbar:
+            await asyncio.gather(*(
+                self._sample_replicas(client, semaphore, asst_name, samples, body, pbar)
+                for asst_name, samples, body in requests
+            ))
+
+    async def _aload_assistant_configs(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                       asst_names: set) -> dict:
+        """
+        Async version of StaticAssistantsRunner.load_assistant_configs, for `asst_names` only.
+        """
+        async def retrieve(asst_name):
+            if asst_name in self.assistant_configs:
+                return asst_name, self.assistant_configs[asst_name]
+            async with semaphore:
+                try:
+                    return asst_name, await client.beta.assistants.retrieve(self.assistants_dict[asst_name])
+                except Exception as e:
+                    print(f"Error retrieving assistant {asst_name} ({self.assistants_dict[asst_name]}): {e}")
+                    return asst_name, None
+
+        results = await asyncio.gather(*(retrieve(asst_name) for asst_name in asst_names))
+        self.assistant_configs.update((asst_name, assistant) for asst_name, assistant in results if assistant is not None)
+        return {asst_name: self.assistant_configs[asst_name] for asst_name in asst_names
+                if asst_name in self.assistant_configs}
+
+    async def _sample_replicas(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore, asst_name: str,
+                               samples: list, body: dict, pbar: tqdm):
+        async with semaphore:
+            try:
+                self._record_choices(asst_name, samples, await client.chat.completions.create(**body))
+            except Exception as e:
+                # The replicas stay pending and are asked with Assistants runs
+                print(f"Error sampling replicas for (assistant={asst_name}, question={samples[0]}): {e}")
+        pbar.update(1)
+
+    async def _acreate_threads_and_send_questions(self):
+        if self.thread_mode == "per_assistant":
+            # The threads are created together with their runs in _acreate_runs
+            return
+        print(f"\n=== Creating a thread for each question (max {self.max_concurrency} concurrent requests) ===\n")
+        await self._create_all_threads()
+
+    async def _acreate_runs(self):
+        if self.thread_mode == "per_assistant":
+            pending = self._pending_pairs()
+            print(f"\n=== Creating {len(pending)} threads with their runs (max {self.max_concurrency} "
+                  f"concurrent requests, completion_mode={self.completion_mode}) ===\n")
+            await self._create_all_threads_and_runs(pending)
+            return
+
+        total_runs = sum(
+            not self._is_answered((asst_name, idx))
+            for idx in self._pending_question_indices()
+            for asst_name in self.assistants_dict
+        )
+        print(f"\n=== Creating {total_runs} runs (max {self.max_concurrency} concurrent requests, "
+              f"completion_mode={self.completion_mode}) ===\n")
+        await self._create_all_runs(total_runs)
+
+    async def _apoll_runs_until_complete(self, poll_interval: float):
+        for key, run_id in self.run_map.items():
+            if run_id is None and key not in self.answers_map:
+                self.answers_map[key] = "Error: Run not created"
+
+        pending = {
+            key: (self._thread_id(key), run_id)
+            for key, run_id in self.run_map.items()
+            if key not in self.answers_map
+        }
+        print(f"\n=== Waiting for {len(pending)} pending runs to complete ===\n")
+        if pending:
+            await self._wait_for_pending_runs(pending, poll_interval)
+        print("\nAll runs reached a terminal state.")
+
+    async def _create_all_threads(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = self._pending_question_indices()
+        client = self._new_async_client()
+        with tqdm(total=len(pending), desc="Creating threads") as pbar:
+            await asyncio.gather(*(
+                self._create_thread(client, semaphore, idx, self.qa_data[idx][COLUMN_QUESTION], pbar)
+                for idx in pending
+            ))
+
+    async def _create_thread(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore, idx: int,
+                             question: str, pbar: tqdm):
+        async with semaphore:
+            try:
+                thread = await client.beta.threads.create(
+                    messages=[{"role": "user", "content": question}]
+                )
+                self.thread_map[idx] = thread.id
+            except Exception as e:
+                print(f"Error creating/sending question '{question}': {e}")
+                self.thread_map[idx] = None
+        pbar.update(1)
+
+    async def _create_all_runs(self, total_runs: int):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._new_async_client()
+        with tqdm(total=total_runs, desc="Creating runs") as pbar:
+            await asyncio.gather(*(
+                self._create_runs_for_thread(client, semaphore, idx, pbar)
+                for idx in self._pending_question_indices()
+            ))
+
+    async def _create_runs_for_thread(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore, idx: int,
+                                      pbar: tqdm):
+        # Pairs already answered (e.g. replayed from the journal) get no run
+        asst_names = [name for name in self.assistants_dict if not self._is_answered((name, idx))]
+        thread_id = self.thread_map.get(idx)
+        if thread_id is None:
+            # Could not create a thread for that question, skip
+            for asst_name in asst_names:
+                self.run_map[(asst_name, idx)] = None
+            pbar.update(len(asst_names))
+            return
+
+        for asst_name in asst_names:
+            asst_id = self.assistants_dict[asst_name]
+            async with semaphore:
+                try:
+                    if self.completion_mode == "stream":
+                        await self._stream_run(client, asst_name, asst_id, idx, thread_id)
+                    else:
+                        run = await client.beta.threads.runs.create(
+                            thread_id=thread_id,
+                            assistant_id=asst_id
+                        )
+                        self.run_map[(asst_name, idx)] = run.id
+                except Exception as e:
+                    print(f"Error creating run for (assistant={asst_name}, thread={thread_id}): {e}")
+                    self.run_map[(asst_name, idx)] = None
+            pbar.update(1)
+
+    async def _create_all_threads_and_runs(self, pending: list):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._new_async_client()
+        with tqdm(total=len(pending), desc="Creating runs") as pbar:
+            await asyncio.gather(*(
+                self._create_thread_and_run(client, semaphore, key, pbar)
+                for key in pending
+            ))
+
+    async def _create_thread_and_run(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore, key, pbar: tqdm):
+        """
+        Thread, question and run of one (assistant, question) pair in a single request.
+        """
+        asst_name, idx = key
+        asst_id = self.assistants_dict[asst_name]
+        async with semaphore:
+            try:
+                if self.completion_mode == "stream":
+                    async with client.beta.threads.create_and_run_stream(
+                        assistant_id=asst_id,
+                        thread=self._thread_params(idx)
+                    ) as stream:
+                        await self._finish_stream(stream, key, "threads.create_and_run_stream")
+                else:
+                    run = await client.beta.threads.create_and_run(
+                        assistant_id=asst_id,
+                        thread=self._thread_params(idx)
+                    )
+                    self.thread_map[key] = run.thread_id
+                    self.run_map[key] = run.id
+            except Exception as e:
+                print(f"Error creating thread and run for (assistant={asst_name}, question={idx}): {e}")
+                self.thread_map.setdefault(key, None)
+                self.run_map.setdefault(key, None)
+        pbar.update(1)
+
+    async def _stream_run(self, client: AsyncOpenAI, asst_name: str, asst_id: str, idx: int, thread_id: str):
+        """
+        Creates the run as a stream and waits for the API to push its terminal state.
+        The answer is taken from the streamed messages, without any extra request.
+        """
+        async with client.beta.threads.runs.stream(
+            thread_id=thread_id,
+            assistant_id=asst_id
+        ) as stream:
+            await self._finish_stream(stream, (asst_name, idx), "runs.stream")
+
+    async def _finish_stream(self, stream, key, operation: str):
+        """
+        Waits for the streamed run of `key` to end and stores its answer. The run's
+        token usage is recorded under `operation` (streams are not seen by the metrics hooks).
+        """
+        await stream.until_done()
+        run_obj = await stream.get_final_run()
+        self.client_factory.metrics.record_usage(operation, run_obj.usage)
+        self.run_map[key] = run_obj.id
+        if self.thread_mode == "per_assistant":
+            self.thread_map[key] = run_obj.thread_id
+
+        if run_obj.status != "completed":
+            self.answers_map[key] = f"Run ended with status={run_obj.status}"
+            return
+
+        assistant_messages = [m for m in await stream.get_final_messages() if m.role == "assistant"]
+        if assistant_messages:
+            self._record_answer(key, self._message_to_text(assistant_messages[-1]))
+        else:
+            self.answers_map[key] = "No assistant messages found."
+
+    async def _wait_for_pending_runs(self, pending: dict, poll_interval: float):
+        client = self._new_async_client()
+        engine = RunCompletionEngine(
+            client,
+            max_concurrency=self.max_concurrency,
+            initial_delay=poll_interval
+        )
+        with tqdm(total=len(pending), desc="Waiting for runs", unit="run") as pbar:
+
+            async def on_terminal(key, run_obj):
+                if run_obj.status == "completed":
+                    self._record_answer(key, await self._aget_final_assistant_message(client, run_obj))
+                else:
+                    self.answers_map[key] = f"Run ended with status={run_obj.status}"
+                pbar.update(1)
+
+            async def on_error(key, error):
+                self.answers_map[key] = f"Error polling run {self.run_map[key]}: {error}"
+                pbar.update(1)
+
+            await engine.wait_for_runs(pending, on_terminal, on_error)
+        print(f"Run status checks issued: {engine.api_calls}")
+
+    async def _aget_final_assistant_message(self, client: AsyncOpenAI, run_obj) -> str:
+        """
+        Async version of StaticAssistantsRunner._get_final_assistant_message.
+        """
+        try:
+            page = await client.beta.threads.messages.list(
+                thread_id=run_obj.thread_id,
+                run_id=run_obj.id,
+                order="desc",
+                limit=1
+            )
+        except Exception as e:
+            return f"Error: {e}"
+
+        assistant_messages = [m for m in page.data if m.role == "assistant"]
+        if not assistant_messages:
+            return "No assistant messages found."
+        return self._message_to_text(assistant_messages[0])
@@ -0,0 +1,96 @@
+import os
+import time
+
+from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.assistant_testing.batch_jobs import BatchJobClient
+
+
+class BatchAssistantsRunner(StaticAssistantsRunner):
+    """
+    Collects the answers through the Batch API instead of live Assistants runs.
+
+    The Batch API does not accept Assistants runs, so each assistant from the ids
+    file is retrieved once and its configuration (instructions, model, temperature,
+    top_p) is turned into one chat completion request per question:
+        system = assistant instructions, user = question
+    Every (assistant, question) pair goes into a single JSONL batch, and the
+    results are mapped back into answers_map, so write_results_to_csv produces the
+    usual answers CSV layout. The replicas of a question are sampled by one request
+    with "n" = number of replicas, so the prompt is sent (and billed) once.
+
+    The instructions are the same system message, byte for byte, in every request of
+    an assistant, and those requests share a prompt_cache_key, so the provider serves
+    that prefix from its prompt cache and only the question is billed in full.
+    """
+
+    def __init__(self, openai_api_key: str, txt_file_path: str, csv_file_path: str, output_csv_path: str,
+                 batch_dir: str, poll_interval: float = 30.0, journal: bool = True, client_factory=None):
+        super().__init__(openai_api_key, txt_file_path, csv_file_path, output_csv_path,
+                         poll_interval=poll_interval, journal=journal, client_factory=client_factory)
+        self.batch_dir = batch_dir
+        self.request_samples = {}  # {custom_id: [sample indices in qa_data, one per choice]}
+        self.batch_client = BatchJobClient(openai_api_key, poll_interval=poll_interval,
+                                           client_factory=self.client_factory)
+
+    def build_requests(self, configs: dict) -> dict:
+        """
+        Returns {custom_id: chat completion body}, one per (assistant, question) with
+        the pending replicas of that question as its "n" completions.
+        custom_id is "<assistant_index>-<index of the first pending sample>".
+        """
+        requests = {}
+        self.request_samples = {}
+        for asst_idx, asst_name in enumerate(self.assistants_dict):
+            assistant = configs.get(asst_name)
+            if assistant is None:
+                continue
+
+            for samples in self._pending_sample_groups(asst_name):
+                custom_id = f"{asst_idx}-{samples[0]}"
+                requests[custom_id] = self._chat_body(assistant, samples)
+                self.request_samples[custom_id] = samples
+        return requests
+
+    def run_all(self):
+        """
+        1) Load assistants and Q&A
+        2) Build one chat completion request per (assistant, question)
+        3) Submit them as a batch and wait for it
+        4) Map the results back and write the answers CSV
+        """
+        start_time = time.time()
+
+        self.load_assistants()
+        self.load_qa_data()
+
+        if not self.assistants_dict or not self.qa_data:
+            print("No assistants or QA data found. Exiting.")
+            return
+
+        # Answers saved by a previous, interrupted run
+        self.load_journal()
+
+        if self._pending_question_indices():
+            configs = self.load_assistant_configs()
+            requests = self.build_requests(configs)
+
+            output_name = os.path.splitext(os.path.basename(self.output_csv_path))[0]
+            jsonl_path = os.path.join(self.batch_dir, f"{output_name}_batch_input.jsonl")
+            results = self.batch_client.run(requests, jsonl_path, description=output_name)
+
+            assistant_names = list(self.assistants_dict)
+            for custom_id, samples in self.request_samples.items():
+                asst_name = assistant_names[int(custom_id.split("-")[0])]
+                result = results.get(custom_id, {"error": "no result in the batch output"})
+                for choice, q_idx in enumerate(samples):
+                    self._record_answer((asst_name, q_idx), self.batch_client.completion_text(result, choice))
+            # Assistants whose configuration could not be retrieved have no requests
+            for asst_name in assistant_names:
+                for q_idx in range(len(self.qa_data)):
+                    if not self._is_answered((asst_name, q_idx)):
+                        self.answers_map[(asst_name, q_idx)] = "Error: Assistant configuration not available"
+
+        self.write_results_to_csv()
+
+        total_time = time.time() - start_time
+        print(f"\nTotal testing time: {total_time:.2f} seconds")
@@ -0,0 +1,75 @@
+import os
+
+from src.assistant_testing.static_grader_results import FileManagerGrader
+from src.assistant_testing.chat_row_processor import ChatRowProcessor
+from src.assistant_testing.batch_jobs import BatchJobClient
+
+
+class BatchFileManagerGrader(FileManagerGrader):
+    """
+    Igual que FileManagerGrader, pero envía TODAS las filas en un solo trabajo de la
+    Batch API (una solicitud de chat.completions por fila, construida con
+    ChatRowProcessor). Las notas se escriben en el orden original de las filas.
+
+    Las filas repetidas se envían una sola vez, y las que ya están en la caché de
+    notas no se envían.
+    """
+    def __init__(self, openai_api_key: str, csv_input_path: str, row_processor: ChatRowProcessor,
+                 batch_dir: str, grade_cache=None, poll_interval: float = 30.0, journal: bool = True,
+                 client_factory=None):
+        """
+        :param row_processor: ChatRowProcessor con el prompt y el modelo del evaluador
+        :param batch_dir: carpeta donde se guardan los JSONL del batch
+        """
+        super().__init__(openai_api_key, None, csv_input_path, grade_cache=grade_cache,
+                         row_processor=row_processor, journal=journal, client_factory=client_factory)
+        self.batch_dir = batch_dir
+        self.batch_client = BatchJobClient(openai_api_key, poll_interval=poll_interval,
+                                           client_factory=self.client_factory)
+
+    def _grade_rows(self, rows, question_column, human_answer_column, machine_answer_column):
+        """
+        Construye los prompts de todas las filas, califica los que faltan en un batch
+        y genera las notas en el orden original.
+        """
+        fields = [self._row_fields(row, question_column, human_answer_column, machine_answer_column) for row in rows]
+        prompts = [self.row_processor.build_prompt(*row_fields) for row_fields in fields]
+
+        # Las filas sin una respuesta real no se envían al evaluador
+        grades = {}
+        for prompt, (_, _, machine_answer) in zip(prompts, fields):
+            failed = self._failed_answer_grade(machine_answer)
+            if failed is not None:
+                grades[prompt] = failed
+        if self.journal is not None:
+            for prompt in set(prompts) - set(grades):
+                journaled = self.journal.get(self._journal_key(prompt))
+                if journaled is not None:
+                    grades[prompt] = journaled
+        if self.grade_cache is not None:
+            for prompt in set(prompts) - set(grades):
+                cached = self.grade_cache.get(prompt)
+                if cached is not None:
+                    grades[prompt] = cached
+
+        # Un custom_id por prompt distinto que aún no tiene nota
+        pending = list(dict.fromkeys(p for p in prompts if p not in grades))
+        requests = {f"row-{i}": self.row_processor.build_request_body(prompt) for i, prompt in enumerate(pending)}
+
+        input_name = os.path.splitext(os.path.basename(self.csv_input_path))[0]
+        jsonl_path = os.path.join(self.batch_dir, f"{input_name}_grades_batch_input.jsonl")
+        results = self.batch_client.run(requests, jsonl_path, description=f"grades {input_name}")
+
+        for i, prompt in enumerate(pending):
+            result = results[f"row-{i}"]
+            if result.get("error"):
+                grades[prompt] = f"Error al procesar la fila: {result['error']}"
+                continue
+            grade = self.response_cleaner.clean(self.row_processor.parse_completion(result["body"]))
+            grades[prompt] = grade or "No hubo respuesta del asistente."
+            if self.grade_cache is not None and self._is_valid_grade(grades[prompt]):
+                self.grade_cache.put(prompt, grades[prompt])
+            self._journal_grade(prompt, grades[prompt])
+
+        for prompt in prompts:
+            yield grades[prompt]
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import time
+
+from src.openai_clients.client_factory import OpenAIClientFactory
+
+
+class BatchJobClient:
+    """
+    Small wrapper around the OpenAI Batch API:
+      1) write a JSONL file with one request per line (custom_id + body)
+      2) upload it (purpose="batch") and create the batch job
+      3) poll the job until it reaches a terminal state
+      4) download the output/error files and map every result back to its custom_id
+
+    The id of the submitted batch is stored next to the JSONL file
+    (<jsonl>.batch.json) together with a hash of the requests, so if the process
+    is interrupted the next call re-attaches to the same batch instead of
+    submitting (and paying for) it again.
+
+    The token usage of the results (including the prompt-cache hits) is added to
+    the client factory's ApiMetrics, as "batches.chat.completions".
+    """
+
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(self, openai_api_key: str, poll_interval: float = 30.0,
+                 endpoint: str = "/v1/chat/completions", completion_window: str = "24h",
+                 client_factory: OpenAIClientFactory = None):
+        self.openai_api_key = openai_api_key
+        self.poll_interval = poll_interval
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+        client_factory = client_factory or OpenAIClientFactory.shared(openai_api_key)
+        self.client = client_factory.sync()
+        self.metrics = client_factory.metrics
+
+    def run(self, requests: dict, jsonl_path: str, description: str = "") -> dict:
+        """
+        Executes `requests` ({custom_id: body}) as a single batch job.
+
+        Returns {custom_id: {"body": <response body or None>, "error": <str or None>}}.
+        Requests missing from the output are reported with an error.
+        """
+        if not requests:
+            return {}
+
+        input_hash = self.write_requests(jsonl_path, requests)
+        batch = self._find_tracked_batch(jsonl_path, input_hash)
+        if batch is None:
+            batch = self.submit(jsonl_path, description)
+            self._track_batch(jsonl_path, input_hash, batch.id)
+        else:
+            print(f"Re-attaching to batch {batch.id} (status={batch.status}).")
+
+        batch = self.monitor(batch.id)
+        results = self.fetch_results(batch)
+
+        for custom_id in requests:
+            if custom_id not in results:
+                results[custom_id] = {"body": None, "error": f"Batch {batch.id} ended with status={batch.status}"}
+
+        if batch.status == "completed":
+            self._untrack_batch(jsonl_path)
+        return results
+
+    def write_requests(self, jsonl_path: str, requests: dict) -> str:
+        """
+        Writes the JSONL input file and returns the SHA-256 of its content.
+        """
+        folder = os.path.dirname(jsonl_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for custom_id, body in requests.items():
+                line = json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.endpoint,
+                    "body": body,
+                }, ensure_ascii=False) + "\n"
+                digest.update(line.encode("utf-8"))
+                f.write(line)
+
+        print(f"Batch input with {len(requests)} requests written to {jsonl_path}")
+        return digest.hexdigest()
+
+    def submit(self, jsonl_path: str, description: str = ""):
+        with open(jsonl_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+            metadata={"description": description} if description else None
+        )
+        print(f"Batch {batch.id} submitted ({description or jsonl_path}).")
+        return batch
+
+    def monitor(self, batch_id: str):
+        """
+        Polls the batch until it reaches a terminal state and returns it.
+        """
+        print(f"Monitoring batch {batch_id}...")
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+            print(f"Current status: {batch.status}{progress}")
+            if batch.status in self.TERMINAL_STATUSES:
+                return batch
+            time.sleep(self.poll_interval)
+
+    def fetch_results(self, batch) -> dict:
+        """
+        Downloads the output and error files of a finished batch.
+        """
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.client.files.content(file_id).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                body = response.get("body")
+                error = item.get("error")
+                if error is None and response.get("status_code", 200) != 200:
+                    error = (body or {}).get("error")
+
+                if error is None:
+                    results[item["custom_id"]] = {"body": body, "error": None}
+                    self.metrics.record_usage("batches.chat.completions", (body or {}).get("usage"))
+                else:
+                    message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                    results[item["custom_id"]] = {"body": None, "error": message}
+        return results
+
+    @staticmethod
+    def completion_text(result: dict, choice: int = 0) -> str:
+        """
+        Extracts the assistant text of a chat completion result (or an error message).
+        `choice` selects one of the n completions of a request sent with "n". A missing
+        or empty choice is an "Error: ..." message too, so it is not journaled as an answer.
+        """
+        if result.get("error"):
+            return f"Error: {result['error']}"
+        try:
+            choices = {item["index"]: item for item in result["body"]["choices"]}
+        except (KeyError, TypeError):
+            return "Error: Unexpected batch result"
+        if choice not in choices:
+            return "Error: No completion returned for this replica"
+        content = (choices[choice].get("message") or {}).get("content")
+        if not content:
+            return f"Error: Empty completion (finish_reason={choices[choice].get('finish_reason')})"
+        return content
+
+    # -------------------------------------------------------------------------
+    # Batch tracking
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _tracking_path(jsonl_path: str) -> str:
+        return f"{jsonl_path}.batch.json"
+
+    def _track_batch(self, jsonl_path: str, input_hash: str, batch_id: str):
+        with open(self._tracking_path(jsonl_path), "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "input_sha256": input_hash}, f)
+
+    def _untrack_batch(self, jsonl_path: str):
+        if os.path.exists(self._tracking_path(jsonl_path)):
+            os.remove(self._tracking_path(jsonl_path))
+
+    def _find_tracked_batch(self, jsonl_path: str, input_hash: str):
+        """
+        Returns the previously submitted batch for these exact requests, if it can still be used.
+        """
+        path = self._tracking_path(jsonl_path)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            tracked = json.load(f)
+        if tracked.get("input_sha256") != input_hash:
+            return None
+        try:
+            batch = self.client.batches.retrieve(tracked["batch_id"])
+        except Exception as e:
+            print(f"Could not retrieve tracked batch {tracked['batch_id']}: {e}")
+            return None
+        if batch.status in ("failed", "expired", "cancelled"):
+            return None
+        return batch
@@ -0,0 +1,291 @@
+import json
+import math
+
+from parameters import EVALUATOR_CONTEXT_TOKENS, GRADING_ROWS_PER_REQUEST
+
+from src.assistant_testing.static_grader_results import RowProcessor
+from src.openai_clients.client_factory import OpenAIClientFactory
+from src.openai_clients.prompt_cache import prompt_cache_key
+
+
+# IDs de los tokens "1".."5" (iguales en los tokenizadores cl100k_base y o200k_base,
+# usados por los modelos gpt-4 / gpt-4o)
+GRADE_TOKEN_IDS = {"1": 16, "2": 17, "3": 18, "4": 19, "5": 20}
+
+
+class ChatRowProcessor(RowProcessor):
+    """
+    Alternativa a RowProcessor que califica con UNA sola llamada a chat.completions
+    en vez de crear un thread, un mensaje, un run y listar los mensajes.
+
+    El prompt del evaluador (el archivo generado por create_eval_prompt) va como
+    mensaje de sistema, la fila como mensaje de usuario, y la respuesta se limita a
+    un solo token restringido a "1".."5" con logit_bias.
+
+    El mensaje de sistema es idéntico, byte a byte, en todas las filas (nunca lleva
+    datos de la fila) y va primero, junto con un prompt_cache_key propio: así el
+    proveedor reutiliza el prefijo en caché y solo cobra completa la parte de la fila.
+    """
+    def __init__(self, openai_api_key: str, evaluator_instructions_path: str, model: str,
+                 temperature: float = 0, top_p: float = 1, client_factory: OpenAIClientFactory = None):
+        """
+        :param openai_api_key: La API key de OpenAI.
+        :param evaluator_instructions_path: Archivo con el prompt del evaluador.
+        :param model: Modelo con el que se califica.
+        :param client_factory: fábrica de clientes compartida (por defecto, la del proceso).
+        """
+        self.openai_api_key = openai_api_key
+        self.assistant_id = None
+        self.model = model
+        self.temperature = temperature
+        self.top_p = top_p
+
+        with open(evaluator_instructions_path, "r", encoding="utf-8") as f:
+            self.system_prompt = f.read()
+        self.prompt_cache_key = prompt_cache_key(model, self.system_prompt)
+
+        self.client_factory = client_factory or OpenAIClientFactory.shared(openai_api_key)
+        self.client = self.client_factory.sync()
+
+    def ask_assistant(self, prompt: str):
+        """
+        Envía la fila al evaluador y retorna la nota como string.
+        Los errores de la API se propagan, igual que en RowProcessor.ask_assistant.
+        """
+        completion = self.client.chat.completions.create(**self.build_request_body(prompt))
+        return self.parse_completion(completion.model_dump())
+
+    def parse_completion(self, completion: dict) -> str:
+        """
+        Nota de una respuesta de chat.completions en forma de dict (el objeto del SDK
+        con model_dump(), o el "body" de un resultado del modo Batch).
+        """
+        try:
+            content = completion["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            content = None
+        if not content:
+            return "No hubo respuesta del asistente."
+        return content.strip()
+
+    def build_request_body(self, prompt: str) -> dict:
+        """
+        Parámetros de la llamada a chat.completions para una fila. También se usan
+        como cuerpo de cada solicitud en el modo Batch.
+        """
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": 1,
+            "logit_bias": {str(token_id): 100 for token_id in GRADE_TOKEN_IDS.values()},
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+        }
+        if self.prompt_cache_key:
+            body["prompt_cache_key"] = self.prompt_cache_key
+        return body
+
+
+class LogprobRowProcessor(ChatRowProcessor):
+    """
+    Igual que ChatRowProcessor (una llamada, un token restringido a "1".."5"), pero
+    pide también los top_logprobs de ese token y retorna la nota ESPERADA:
+
+        nota = sum(p(k) * k) / sum(p(k)),   k = 1..5
+
+    con p(k) la probabilidad del token "k". Es una nota continua (3.72 en vez de 4)
+    y estable: no depende de qué token salió sorteado, así que no hace falta calificar
+    varias veces la misma respuesta para suavizar el ruido del evaluador. La confianza
+    es la probabilidad de la nota más probable (1.0 = el evaluador no tiene dudas).
+
+    La respuesta es un JSON {"grade": "3.72", "confidence": "0.81"}, que
+    FileManagerGrader separa en las columnas "grade" y "confidence".
+    """
+    scoring = "logprobs"
+    reports_confidence = True
+    TOP_LOGPROBS = 5
+
+    def build_request_body(self, prompt: str) -> dict:
+        body = super().build_request_body(prompt)
+        body["logprobs"] = True
+        body["top_logprobs"] = self.TOP_LOGPROBS
+        return body
+
+    def parse_completion(self, completion: dict) -> str:
+        try:
+            top_logprobs = completion["choices"][0]["logprobs"]["content"][0]["top_logprobs"]
+        except (KeyError, IndexError, TypeError):
+            top_logprobs = None
+
+        probabilities = {}
+        for candidate in top_logprobs or []:
+            token = str(candidate.get("token", "")).strip()
+            if token in GRADE_TOKEN_IDS:
+                probabilities[token] = probabilities.get(token, 0.0) + math.exp(candidate["logprob"])
+
+        total = sum(probabilities.values())
+        if not total:
+            # Sin logprobs (p. ej. un modelo que no los entrega): la nota del token, sin confianza
+            grade = super().parse_completion(completion)
+            if grade not in GRADE_TOKEN_IDS:
+                return grade
+            return json.dumps({"grade": grade, "confidence": ""})
+
+        expected = sum(int(token) * p for token, p in probabilities.items()) / total
+        confidence = max(probabilities.values()) / total
+        return json.dumps({"grade": f"{expected:.3f}", "confidence": f"{confidence:.3f}"})
+
+
+class MultiRowChatProcessor(ChatRowProcessor):
+    """
+    Califica VARIAS filas con una sola llamada a chat.completions: el prompt del
+    evaluador se envía una vez por grupo en vez de una vez por fila, así que los
+    tokens de entrada y las solicitudes bajan cerca de `rows_per_request` veces.
+
+    Las filas van numeradas en el mensaje de usuario ("### Fila 1", "### Fila 2", ...)
+    y la respuesta se pide con un JSON schema estricto: {"notas": [{"fila": 1, "nota": 4}, ...]}.
+    parse_multi_completion valida cada elemento; las filas sin una nota válida quedan
+    en None, y quien llama las califica una a una (ask_assistant, heredado).
+
+    Un grupo tiene a lo más `rows_per_request` filas, y se corta antes si el prompt
+    estimado (más la respuesta) no cabe en `context_tokens`.
+    """
+    scoring = "multi_row"
+
+    MULTI_ROW_INSTRUCTIONS = (
+        "\n\nRecibirás varias filas numeradas (\"### Fila N\"). Califica CADA fila por separado, "
+        "con el mismo criterio, y responde solo con el JSON pedido: una nota por fila, con su número."
+    )
+    # Tokens de la respuesta por fila ({"fila": N, "nota": K}) y del resto del JSON
+    ANSWER_TOKENS_PER_ROW = 12
+    ANSWER_TOKENS_OVERHEAD = 16
+
+    def __init__(self, openai_api_key: str, evaluator_instructions_path: str, model: str,
+                 temperature: float = 0, top_p: float = 1, client_factory: OpenAIClientFactory = None,
+                 rows_per_request: int = GRADING_ROWS_PER_REQUEST, context_tokens: int = EVALUATOR_CONTEXT_TOKENS):
+        """
+        :param rows_per_request: máximo de filas por llamada
+        :param context_tokens: ventana de contexto del modelo evaluador
+        """
+        super().__init__(openai_api_key, evaluator_instructions_path, model, temperature=temperature,
+                         top_p=top_p, client_factory=client_factory)
+        self.rows_per_request = max(1, rows_per_request)
+        self.context_tokens = context_tokens
+        # Las instrucciones de grupo van al final del mensaje de sistema, que sigue siendo fijo
+        self.multi_row_system_prompt = self.system_prompt + self.MULTI_ROW_INSTRUCTIONS
+        self.multi_row_cache_key = prompt_cache_key(model, self.multi_row_system_prompt)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Estimación gruesa (unos 4 caracteres por token), suficiente para no pasarse de la ventana.
+        """
+        return len(text) // 4 + 1
+
+    @staticmethod
+    def row_header(position: int) -> str:
+        return f"### Fila {position}\n"
+
+    def pack(self, prompts: list) -> list:
+        """
+        Reparte los prompts en grupos consecutivos (listas de índices) que respetan
+        rows_per_request y context_tokens. Una fila que no cabe sola queda en su propio grupo.
+        """
+        fixed = self.estimate_tokens(self.multi_row_system_prompt) + self.ANSWER_TOKENS_OVERHEAD
+        groups, group, used = [], [], fixed
+        for index, prompt in enumerate(prompts):
+            cost = (self.estimate_tokens(self.row_header(len(group) + 1) + prompt)
+                    + self.ANSWER_TOKENS_PER_ROW)
+            if group and (len(group) >= self.rows_per_request or used + cost > self.context_tokens):
+                groups.append(group)
+                group, used = [], fixed
+            group.append(index)
+            used += cost
+        if group:
+            groups.append(group)
+        return groups
+
+    def build_multi_request_body(self, prompts: list) -> dict:
+        """
+        Parámetros de la llamada a chat.completions para un grupo de filas.
+        """
+        rows = "\n".join(f"{self.row_header(position)}{prompt}" for position, prompt in enumerate(prompts, start=1))
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.multi_row_system_prompt},
+                {"role": "user", "content": rows},
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "notas",
+                    "strict": True,
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "notas": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "fila": {"type": "integer"},
+                                        "nota": {"type": "integer", "enum": [1, 2, 3, 4, 5]},
+                                    },
+                                    "required": ["fila", "nota"],
+                                    "additionalProperties": False,
+                                },
+                            },
+                        },
+                        "required": ["notas"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "max_tokens": self.ANSWER_TOKENS_OVERHEAD + self.ANSWER_TOKENS_PER_ROW * len(prompts),
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+        }
+        if self.multi_row_cache_key:
+            body["prompt_cache_key"] = self.multi_row_cache_key
+        return body
+
+    def ask_assistant_many(self, prompts: list) -> list:
+        """
+        Envía un grupo de filas y retorna sus notas (None = sin nota válida).
+        Los errores de la API se propagan, igual que en ask_assistant.
+        """
+        completion = self.client.chat.completions.create(**self.build_multi_request_body(prompts))
+        return self.parse_multi_completion(completion.model_dump(), len(prompts))
+
+    def parse_multi_completion(self, completion: dict, count: int) -> list:
+        """
+        Notas de las `count` filas de un grupo, validadas contra el schema: la fila
+        debe estar entre 1 y count, la nota entre 1 y 5, y cada fila aparecer una sola vez.
+        """
+        grades = [None] * count
+        try:
+            items = json.loads(completion["choices"][0]["message"]["content"])["notas"]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return grades
+        if not isinstance(items, list):
+            return grades
+
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            position, grade = item.get("fila"), item.get("nota")
+            if (not isinstance(position, int) or isinstance(position, bool)
+                    or not 1 <= position <= count or str(grade) not in GRADE_TOKEN_IDS):
+                continue
+            if position in seen:
+                # Dos notas para la misma fila: no se confía en ninguna
+                grades[position - 1] = None
+                continue
+            seen.add(position)
+            grades[position - 1] = str(grade)
+        return grades
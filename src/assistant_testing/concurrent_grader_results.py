@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+from parameters import MAX_CONCURRENT_REQUESTS, GRADING_REQUESTS_PER_MINUTE
+
+from src.assistant_testing.static_grader_results import FileManagerGrader
+
+
+class ConcurrentFileManagerGrader(FileManagerGrader):
+    """
+    Igual que FileManagerGrader, pero califica varias filas en paralelo con un pool
+    de `max_workers` hilos. Las notas se escriben en el MISMO orden de las filas de
+    entrada, por lo que gather_worst_indices y unify_results_in_single_csv siguen
+    funcionando igual.
+
+    Los 429 no se manejan aquí: el AdaptiveRateLimiter compartido del client_factory
+    pausa todas las solicitudes y el cliente de openai las reintenta (max_retries).
+    Aquí solo se espacian los inicios de las filas según `requests_per_minute`.
+    """
+    def __init__(self, openai_api_key: str, assistant_id: str, csv_input_path: str, grade_cache=None,
+                 row_processor=None, max_workers: int = MAX_CONCURRENT_REQUESTS,
+                 requests_per_minute: float = GRADING_REQUESTS_PER_MINUTE,
+                 journal: bool = True, client_factory=None):
+        """
+        :param max_workers: número máximo de filas calificándose al mismo tiempo
+        :param requests_per_minute: tope de filas iniciadas por minuto (None = sin tope)
+        """
+        super().__init__(openai_api_key, assistant_id, csv_input_path, grade_cache=grade_cache,
+                         row_processor=row_processor, journal=journal, client_factory=client_factory)
+        self.max_workers = max_workers
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.pace_lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def _grade_rows(self, rows, question_column, human_answer_column, machine_answer_column):
+        """
+        Genera la nota limpia de cada fila en el orden original, calificando
+        hasta `max_workers` filas al mismo tiempo.
+
+        Solo hay una ventana de 2 * max_workers filas en vuelo: las filas se leen del
+        CSV a medida que se entregan las notas, así la memoria no crece con el archivo.
+        """
+        def grade(row):
+            fields = self._row_fields(row, question_column, human_answer_column, machine_answer_column)
+            return self._grade_fields(*fields)
+
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                tqdm(total=self.total_rows, desc="Procesando filas") as pbar:
+            for row in rows:
+                window.append(executor.submit(grade, row))
+                if len(window) >= 2 * self.max_workers:
+                    # La fila más antigua sale primero: las notas quedan en el orden de las filas
+                    yield window.popleft().result()
+                    pbar.update(1)
+            while window:
+                yield window.popleft().result()
+                pbar.update(1)
+
+    def _wait_for_slot(self):
+        """
+        Bloquea hasta que el worker pueda iniciar una solicitud sin superar `requests_per_minute`.
+        """
+        if not self.min_interval:
+            return
+        with self.pace_lock:
+            now = time.monotonic()
+            start = max(now, self.next_slot)
+            self.next_slot = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _request_grade(self, question: str, human_answer: str, machine_answer: str) -> str:
+        """
+        Califica una fila respetando el ritmo de `requests_per_minute`. Los 429 los
+        reintenta el cliente de openai, detrás del rate limiter compartido.
+        """
+        prompt = self.row_processor.build_prompt(question, human_answer, machine_answer)
+        self._wait_for_slot()
+        try:
+            return self.response_cleaner.clean(self.row_processor.ask_assistant(prompt))
+        except Exception as e:
+            return f"Error al procesar la fila: {e}"
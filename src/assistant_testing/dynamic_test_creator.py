@@ -0,0 +1,328 @@
+import csv
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import unicodedata
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+from parameters import (
+    COLUMN_HUMAN_ANSWER,
+    COLUMN_QUESTION,
+    DYNAMIC_MATCH_THRESHOLD,
+    DYNAMIC_MAX_PER_QUESTION,
+    DYNAMIC_WORKERS,
+)
+
+
+def normalize_tokens(text: str) -> frozenset:
+    """
+    Lowercase words of `text` without accents or punctuation ("¿Cuánto cuesta?" -> {"cuanto", "cuesta"}).
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return frozenset(re.findall(r"\w+", text.lower()))
+
+
+class QuestionMatcher:
+    """
+    Finds which test question a real message is asking, with an inverted index
+    (word -> test questions that contain it): only the test questions that share a
+    word with the message are scored, by the Jaccard similarity of their word sets.
+    """
+
+    def __init__(self, test_questions: list, threshold: float = 0.6):
+        self.threshold = threshold
+        self.question_tokens = [normalize_tokens(question) for question in test_questions]
+        self.index = {}
+        for question_id, tokens in enumerate(self.question_tokens):
+            for token in tokens:
+                self.index.setdefault(token, []).append(question_id)
+
+    def match(self, text: str):
+        """
+        (question_id, similarity) of the most similar test question, or None below the threshold.
+        """
+        tokens = normalize_tokens(text)
+        if not tokens:
+            return None
+        overlaps = Counter()
+        for token in tokens:
+            overlaps.update(self.index.get(token, ()))
+
+        best = None
+        for question_id, overlap in overlaps.items():
+            similarity = overlap / (len(tokens) + len(self.question_tokens[question_id]) - overlap)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (question_id, similarity)
+        return best
+
+
+# -----------------------------------------------------------------------------
+# Conversation readers: (question, answer) pairs, one at a time
+# -----------------------------------------------------------------------------
+def messages_to_pairs(messages, question_role: str, answer_role: str):
+    """
+    (question, answer) pairs of a sequence of (role, content) messages: a
+    question-role message followed by an answer-role message.
+    """
+    question = None
+    for role, content in messages:
+        if role == question_role and isinstance(content, str):
+            question = content
+        elif role == answer_role and isinstance(content, str) and question is not None:
+            yield question.strip(), content.strip()
+            question = None
+
+
+def jsonl_lines_to_pairs(lines, question_role: str, answer_role: str):
+    """
+    Pairs of JSONL conversations, one per line: {"messages": [{"role": ..., "content": ...}, ...]}.
+    Lines that are not valid conversations are skipped.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        messages = record.get("messages") if isinstance(record, dict) else None
+        if not isinstance(messages, list):
+            continue
+        yield from messages_to_pairs(
+            ((message.get("role"), message.get("content")) for message in messages if isinstance(message, dict)),
+            question_role, answer_role
+        )
+
+
+def csv_rows_to_pairs(rows, conversation_column: str, role_column: str, content_column: str,
+                      question_role: str, answer_role: str):
+    """
+    Pairs of a CSV export with one message per row (conversation id, role, content),
+    with the messages of each conversation in consecutive rows.
+    """
+    def conversations():
+        current_id, messages = None, []
+        for row in rows:
+            if row.get(conversation_column) != current_id:
+                if messages:
+                    yield messages
+                current_id, messages = row.get(conversation_column), []
+            messages.append((row.get(role_column), row.get(content_column)))
+        if messages:
+            yield messages
+
+    for messages in conversations():
+        yield from messages_to_pairs(messages, question_role, answer_role)
+
+
+def mapped_lines(path: str, start: int, end: int):
+    """
+    Lines of an uncompressed file that start in [start, end), read through a memory map.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = start
+        while position < end:
+            line_end = mapped.find(b"\n", position)
+            if line_end == -1:
+                line_end = len(mapped)
+            yield mapped[position:line_end]
+            position = line_end + 1
+
+
+# -----------------------------------------------------------------------------
+# Worker processes (each one gets its own QuestionMatcher from the pool initializer)
+# -----------------------------------------------------------------------------
+_worker = {}
+
+
+def _init_worker(matcher: QuestionMatcher, question_role: str, answer_role: str):
+    _worker.update(matcher=matcher, question_role=question_role, answer_role=answer_role)
+
+
+def _match_pairs(pairs) -> tuple:
+    """
+    (pairs read, [(question_id, similarity, question, answer)] of the pairs that match a test question).
+    """
+    matcher = _worker["matcher"]
+    read, matches = 0, []
+    for question, answer in pairs:
+        read += 1
+        match = matcher.match(question)
+        if match is not None:
+            matches.append((match[0], match[1], question, answer))
+    return read, matches
+
+
+def _match_jsonl_range(path: str, start: int, end: int) -> tuple:
+    return _match_pairs(jsonl_lines_to_pairs(
+        mapped_lines(path, start, end), _worker["question_role"], _worker["answer_role"]
+    ))
+
+
+class DynamicConversationTestCreator:
+    """
+    Dynamic ("en la cancha") test: every time a real conversation asks one of the
+    test questions, its question and the answer given there are written to a test CSV
+    with the same COLUMN_QUESTION / COLUMN_HUMAN_ANSWER columns as the static test.
+
+    The conversation exports may be much larger than memory, so they are streamed:
+      - .jsonl (one {"messages": [...]} conversation per line), uncompressed: read through
+        a memory map and split into byte ranges that are matched in parallel processes.
+      - .jsonl.gz and .csv(.gz) (one message per row: conversation id, role, content):
+        read sequentially, and matched in parallel in batches of pairs.
+    Only a bounded window of ranges/batches is in flight at a time, and the output is
+    written as the matches arrive. Repeated (question, answer) pairs are written once,
+    and at most `max_per_question` pairs are kept per test question.
+    """
+
+    def __init__(self, conversation_files: list, test_questions_csv: str, output_test_file: str,
+                 threshold: float = DYNAMIC_MATCH_THRESHOLD, max_per_question: int = DYNAMIC_MAX_PER_QUESTION,
+                 workers: int = DYNAMIC_WORKERS,
+                 question_role: str = "user", answer_role: str = "assistant",
+                 conversation_column: str = "conversation_id", role_column: str = "role",
+                 content_column: str = "content", chunk_bytes: int = 32 * 1024 * 1024, batch_size: int = 2000):
+        """
+        :param conversation_files: conversation exports (.jsonl, .csv, optionally .gz)
+        :param test_questions_csv: test CSV whose COLUMN_QUESTION holds the questions to look for
+        :param threshold: minimum word (Jaccard) similarity between a message and a test question
+        :param max_per_question: most pairs kept per test question (None = all)
+        :param workers: processes matching in parallel (None = one per CPU)
+        :param question_role, answer_role: roles of the customer and of the human agent
+        :param conversation_column, role_column, content_column: columns of the CSV exports
+        :param chunk_bytes: size of the byte ranges of the uncompressed JSONL files
+        :param batch_size: pairs per batch of the sequentially read files
+        """
+        self.conversation_files = list(conversation_files)
+        self.test_questions_csv = test_questions_csv
+        self.output_test_file = output_test_file
+        self.threshold = threshold
+        self.max_per_question = max_per_question
+        self.workers = workers or os.cpu_count() or 1
+        self.question_role = question_role
+        self.answer_role = answer_role
+        self.conversation_column = conversation_column
+        self.role_column = role_column
+        self.content_column = content_column
+        self.chunk_bytes = chunk_bytes
+        self.batch_size = batch_size
+
+    def load_test_questions(self) -> list:
+        """
+        Distinct questions of the test CSV (the static test repeats each one).
+        """
+        with open(self.test_questions_csv, "r", encoding="utf-8") as f:
+            questions = (row.get(COLUMN_QUESTION, "").strip() for row in csv.DictReader(f))
+            return list(dict.fromkeys(question for question in questions if question))
+
+    def create_test(self):
+        test_questions = self.load_test_questions()
+        if not test_questions:
+            print(f"No test questions found in {self.test_questions_csv}.")
+            return
+        matcher = QuestionMatcher(test_questions, self.threshold)
+
+        seen = set()               # digests of the pairs already written
+        per_question = Counter()   # pairs written per test question
+        pairs_read = 0
+
+        folder = os.path.dirname(self.output_test_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.output_test_file, "w", newline="", encoding="utf-8") as csv_file, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                    initargs=(matcher, self.question_role, self.answer_role)) as executor:
+            writer = csv.writer(csv_file)
+            writer.writerow([COLUMN_QUESTION, COLUMN_HUMAN_ANSWER])
+
+            for path in self.conversation_files:
+                if not os.path.exists(path):
+                    print(f"Conversation file not found: {path}")
+                    continue
+                for read, matches in tqdm(self._match_file(executor, path), desc=os.path.basename(path), unit="chunk"):
+                    pairs_read += read
+                    for question_id, _, question, answer in matches:
+                        if self.max_per_question and per_question[question_id] >= self.max_per_question:
+                            continue
+                        digest = hashlib.sha256(
+                            f"{' '.join(sorted(normalize_tokens(question)))}\0{answer}".encode("utf-8")
+                        ).digest()
+                        if digest in seen:
+                            continue
+                        seen.add(digest)
+                        per_question[question_id] += 1
+                        writer.writerow([question, answer])
+
+        print(f"Dynamic test file created: {self.output_test_file} ({len(seen)} pairs from {pairs_read} "
+              f"conversation turns; {len(per_question)} of {len(test_questions)} test questions found)")
+
+    def _match_file(self, executor, path: str):
+        """
+        Yields (pairs read, matches) per range/batch of the file, in file order.
+        """
+        if path.endswith(".jsonl"):
+            tasks = (executor.submit(_match_jsonl_range, path, start, end) for start, end in self._byte_ranges(path))
+        else:
+            tasks = (executor.submit(_match_pairs, batch) for batch in self._batches(self._read_pairs(path)))
+
+        # At most 2 tasks per worker in flight, so the file is never read far ahead of the matching
+        window = deque()
+        for task in tasks:
+            window.append(task)
+            if len(window) >= 2 * self.workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    def _byte_ranges(self, path: str):
+        """
+        [start, end) ranges of about chunk_bytes, each one ending after a newline.
+        """
+        size = os.path.getsize(path)
+        if not size:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                newline = mapped.find(b"\n", min(start + self.chunk_bytes, size) - 1)
+                end = size if newline == -1 else newline + 1
+                yield start, end
+                start = end
+
+    def _read_pairs(self, path: str):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", newline="") as f:
+            if path.endswith((".csv", ".csv.gz")):
+                yield from csv_rows_to_pairs(
+                    csv.DictReader(f), self.conversation_column, self.role_column, self.content_column,
+                    self.question_role, self.answer_role
+                )
+            else:
+                yield from jsonl_lines_to_pairs(f, self.question_role, self.answer_role)
+
+    def _batches(self, pairs):
+        batch = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# Example usage (run from the repository root: python -m src.assistant_testing.dynamic_test_creator)
+if __name__ == "__main__":
+    from parameters import PATH_CONVERSATIONS_EXPORTS, PATH_DYNAMIC_TEST_CSV, PATH_TEST_EXAMPLES_CSV
+
+    creator = DynamicConversationTestCreator(
+        conversation_files=PATH_CONVERSATIONS_EXPORTS,
+        test_questions_csv=PATH_TEST_EXAMPLES_CSV,
+        output_test_file=PATH_DYNAMIC_TEST_CSV
+    )
+    creator.create_test()
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class GradeCache:
+    """
+    Persistent cache of evaluator grades, stored in SQLite.
+
+    Each entry is keyed by a SHA-256 of:
+      - the evaluator instructions file content,
+      - the evaluator model,
+      - the prompt built by RowProcessor.build_prompt (question, human answer, machine answer),
+      - the scoring method, when it is not the plain grade token (e.g. "logprobs").
+    So a change in the evaluator prompt, model or scoring never returns a stale grade.
+
+    The least recently used entries are evicted once the cache holds more than
+    `max_entries` grades. Hits and misses of the current session are counted in
+    `hits` / `misses`.
+    """
+
+    def __init__(self, db_path: str, evaluator_instructions_path: str, evaluator_model: str,
+                 max_entries: int = 100_000, scoring: str = None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.evaluator_fingerprint = self._fingerprint_evaluator(evaluator_instructions_path, evaluator_model, scoring)
+
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.lock = threading.Lock()
+        # {key: [lock, callers using it]}, only while get_or_compute runs for that key
+        self.key_locks = {}
+        # The database is shared by the assistants that run in parallel processes (main.py)
+        self.connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS grades ("
+                " key TEXT PRIMARY KEY,"
+                " grade TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_grades_last_used ON grades(last_used)")
+
+    @staticmethod
+    def _fingerprint_evaluator(evaluator_instructions_path: str, evaluator_model: str, scoring: str = None) -> str:
+        digest = hashlib.sha256()
+        if evaluator_instructions_path and os.path.exists(evaluator_instructions_path):
+            with open(evaluator_instructions_path, "rb") as f:
+                digest.update(f.read())
+        digest.update(b"\0")
+        digest.update(str(evaluator_model).encode("utf-8"))
+        if scoring:
+            # Without a scoring method the fingerprint (and every existing key) is unchanged
+            digest.update(b"\0")
+            digest.update(scoring.encode("utf-8"))
+        return digest.hexdigest()
+
+    def key_for(self, prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.evaluator_fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, prompt: str):
+        """
+        Returns the cached grade for `prompt`, or None.
+        """
+        key = self.key_for(prompt)
+        with self.lock:
+            row = self.connection.execute("SELECT grade FROM grades WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self.connection:
+                self.connection.execute("UPDATE grades SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, prompt: str, grade: str):
+        key = self.key_for(prompt)
+        with self.lock, self.connection:
+            inserted = self.connection.execute(
+                "INSERT OR IGNORE INTO grades (key, grade, last_used) VALUES (?, ?, ?)",
+                (key, grade, time.time())
+            ).rowcount
+            if not inserted:
+                self.connection.execute(
+                    "UPDATE grades SET grade = ?, last_used = ? WHERE key = ?",
+                    (grade, time.time(), key)
+                )
+            elif self.max_entries:
+                self._evict()
+
+    def get_or_compute(self, prompt: str, compute, should_store=None):
+        """
+        Returns the cached grade for `prompt`, or calls `compute()` and stores its
+        result (only if `should_store(result)` is true). Concurrent callers with the
+        same prompt wait for the first one instead of requesting the grade twice.
+        """
+        key = self.key_for(prompt)
+        with self.lock:
+            entry = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                grade = self.get(prompt)
+                if grade is not None:
+                    return grade
+                grade = compute()
+                if should_store is None or should_store(grade):
+                    self.put(prompt, grade)
+                return grade
+        finally:
+            # The last caller of a key drops its lock, so key_locks does not grow with every prompt
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.key_locks[key]
+
+    def _evict(self):
+        """
+        Deletes the least recently used grades above `max_entries`. Must be called with the lock
+        held, inside the write transaction of put: other processes share the database, so the
+        entries are counted there rather than tracked in this process.
+        """
+        excess = self._count() - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM grades WHERE key IN (SELECT key FROM grades ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def _count(self) -> int:
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM grades").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self.lock:
+            entries = self._count()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,128 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+from parameters import MAX_CONCURRENT_REQUESTS, GRADING_REQUESTS_PER_MINUTE
+
+from src.assistant_testing.concurrent_grader_results import ConcurrentFileManagerGrader
+from src.assistant_testing.chat_row_processor import MultiRowChatProcessor
+
+
+class MultiRowFileManagerGrader(ConcurrentFileManagerGrader):
+    """
+    Igual que ConcurrentFileManagerGrader, pero cada solicitud califica un GRUPO de
+    filas (MultiRowChatProcessor): con grupos de K filas, el prompt del evaluador se
+    envía una vez cada K filas y las solicitudes bajan cerca de K veces.
+
+    Las filas se leen en bloques de `rows_per_request`; de cada bloque solo se envían
+    las que no están en el journal ni en la caché. Las filas sin una nota válida en la
+    respuesta del grupo se califican una a una, con la misma llamada que ChatRowProcessor.
+    Las notas se escriben en el orden original de las filas.
+    """
+    def __init__(self, openai_api_key: str, csv_input_path: str, row_processor: MultiRowChatProcessor,
+                 grade_cache=None, max_workers: int = MAX_CONCURRENT_REQUESTS,
+                 requests_per_minute: float = GRADING_REQUESTS_PER_MINUTE,
+                 journal: bool = True, client_factory=None):
+        """
+        :param row_processor: MultiRowChatProcessor con el prompt, el modelo y el tamaño de los grupos
+        """
+        super().__init__(openai_api_key, None, csv_input_path, grade_cache=grade_cache,
+                         row_processor=row_processor, max_workers=max_workers,
+                         requests_per_minute=requests_per_minute,
+                         journal=journal, client_factory=client_factory)
+        self.stats_lock = threading.Lock()
+        self.group_requests = 0
+        self.grouped_rows = 0
+        self.fallback_rows = 0
+
+    def _grade_rows(self, rows, question_column, human_answer_column, machine_answer_column):
+        """
+        Genera la nota limpia de cada fila en el orden original, calificando hasta
+        `max_workers` bloques al mismo tiempo (solo 2 * max_workers bloques en vuelo).
+        """
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                tqdm(total=self.total_rows, desc="Procesando filas") as pbar:
+            for block in self._blocks(rows, question_column, human_answer_column, machine_answer_column):
+                window.append(executor.submit(self._grade_block, block))
+                if len(window) >= 2 * self.max_workers:
+                    grades = window.popleft().result()
+                    pbar.update(len(grades))
+                    yield from grades
+            while window:
+                grades = window.popleft().result()
+                pbar.update(len(grades))
+                yield from grades
+
+        print(f"Calificación por grupos: {self.grouped_rows} filas en {self.group_requests} solicitudes, "
+              f"{self.fallback_rows} filas calificadas una a una.")
+
+    def _blocks(self, rows, question_column, human_answer_column, machine_answer_column):
+        """
+        Bloques de hasta rows_per_request filas, como tuplas (pregunta, respuesta humana, respuesta máquina).
+        """
+        block = []
+        for row in rows:
+            block.append(self._row_fields(row, question_column, human_answer_column, machine_answer_column))
+            if len(block) >= self.row_processor.rows_per_request:
+                yield block
+                block = []
+        if block:
+            yield block
+
+    def _grade_block(self, block: list) -> list:
+        """
+        Notas limpias de un bloque de filas, en orden.
+        """
+        prompts = [self.row_processor.build_prompt(*fields) for fields in block]
+        grades = [None] * len(block)
+
+        # Notas del journal y de la caché; las filas repetidas del bloque se piden una vez
+        pending = {}  # {prompt: [posiciones en el bloque]}
+        for position, prompt in enumerate(prompts):
+            # Las filas sin una respuesta real no se envían al evaluador
+            grades[position] = self._failed_answer_grade(block[position][2])
+            if grades[position] is None and self.journal is not None:
+                grades[position] = self.journal.get(self._journal_key(prompt))
+            if grades[position] is None and self.grade_cache is not None and prompt not in pending:
+                grades[position] = self.grade_cache.get(prompt)
+            if grades[position] is None:
+                pending.setdefault(prompt, []).append(position)
+
+        pending_prompts = list(pending)
+        for group in self.row_processor.pack(pending_prompts):
+            group_prompts = [pending_prompts[index] for index in group]
+            if len(group_prompts) == 1:
+                # Un grupo de una fila se califica directamente, sin JSON
+                group_grades = [self._request_grade(*block[pending[group_prompts[0]][0]])]
+            else:
+                group_grades = self._request_group(group_prompts)
+            for prompt, grade in zip(group_prompts, group_grades):
+                if grade is None:
+                    with self.stats_lock:
+                        self.fallback_rows += 1
+                    grade = self._request_grade(*block[pending[prompt][0]])
+                if self.grade_cache is not None and self._is_valid_grade(grade):
+                    self.grade_cache.put(prompt, grade)
+                self._journal_grade(prompt, grade)
+                for position in pending[prompt]:
+                    grades[position] = grade
+        return grades
+
+    def _request_group(self, prompts: list) -> list:
+        """
+        Notas de un grupo de filas (None = sin nota válida, se califica sola), respetando
+        el ritmo de `requests_per_minute`. Los 429 los reintenta el cliente de openai.
+        """
+        self._wait_for_slot()
+        try:
+            grades = self.row_processor.ask_assistant_many(prompts)
+            with self.stats_lock:
+                self.group_requests += 1
+                self.grouped_rows += sum(grade is not None for grade in grades)
+            return grades
+        except Exception as e:
+            # Respuesta inválida o error de la API: cada fila se califica sola
+            print(f"Error al calificar un grupo de {len(prompts)} filas ({e}); se califican una a una.")
+            return [None] * len(prompts)
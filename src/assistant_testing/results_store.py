@@ -0,0 +1,242 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class ResultsStore:
+    """
+    Answers and grades of every test run, stored in SQLite.
+
+    One row per (client, run_id, question_id, replica, variant):
+      - client:      assistant name
+      - run_id:      one evaluation of the test set (see new_run_id)
+      - question_id: id of the question in the test CSV (COLUMN_QUESTION_ID), stable
+                     when other questions are added or removed
+      - replica:     which of the question's sampled answers (COLUMN_REPLICA)
+      - variant:     which assistant answered, e.g. "base" or "fine_tuned_with_worst"
+    with the question, human answer, machine answer and grade (as text, and as a
+    number when it is one, so the grades can be sorted by an index), plus the
+    evaluator's confidence when the grading backend gives one. `position` keeps the
+    order of the answers CSV.
+
+    The per-step CSVs are still written for compatibility; the steps that read
+    results (worst questions, unified CSV) query this store instead, and so can
+    any cross-run or cross-client analysis (see worst_questions / grade_deltas).
+    The database is shared by the assistants that run in parallel processes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self.connection:
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(results)")}
+            if columns and "replica" not in columns:
+                # Databases keyed by row index: their rows become replica 0 of question "<index>"
+                self.connection.execute("ALTER TABLE results RENAME TO results_by_row")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " client TEXT NOT NULL,"
+                " run_id TEXT NOT NULL,"
+                " question_id TEXT NOT NULL,"
+                " replica INTEGER NOT NULL,"
+                " variant TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " question TEXT,"
+                " human_answer TEXT,"
+                " answer TEXT,"
+                " grade TEXT,"
+                " grade_value REAL,"
+                " confidence REAL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (client, run_id, question_id, replica, variant))"
+            )
+            if columns and "replica" not in columns:
+                confidence = "confidence" if "confidence" in columns else "NULL"
+                self.connection.execute(
+                    "INSERT INTO results (client, run_id, question_id, replica, variant, position, question,"
+                    " human_answer, answer, grade, grade_value, confidence, updated_at)"
+                    " SELECT client, run_id, CAST(question_id AS TEXT), 0, variant, question_id, question,"
+                    f" human_answer, answer, grade, grade_value, {confidence}, updated_at FROM results_by_row"
+                )
+                self.connection.execute("DROP TABLE results_by_row")
+                self.connection.execute("DROP INDEX IF EXISTS idx_results_grade")
+                self.connection.execute("DROP INDEX IF EXISTS idx_results_variant_grade")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_grade ON results(client, run_id, variant, grade_value)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_variant_grade ON results(variant, grade_value)"
+            )
+
+    @staticmethod
+    def new_run_id() -> str:
+        """
+        Sortable and unique: "20250101-120000-1a2b3c".
+        """
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    @staticmethod
+    def _grade_value(grade):
+        try:
+            return float(grade)
+        except (TypeError, ValueError):
+            return None
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+    def record_answers(self, client: str, run_id: str, variant: str, rows) -> int:
+        """
+        Stores (question_id, replica, question, human_answer, answer) tuples in the
+        order of the answers CSV. Existing rows keep their grade. Returns the rows stored.
+        """
+        now = time.time()
+        values = (
+            (client, run_id, str(question_id), int(replica), variant, position, question, human_answer, answer, now)
+            for position, (question_id, replica, question, human_answer, answer) in enumerate(rows)
+        )
+        with self.lock, self.connection:
+            return self.connection.executemany(
+                "INSERT INTO results (client, run_id, question_id, replica, variant, position, question,"
+                " human_answer, answer, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (client, run_id, question_id, replica, variant) DO UPDATE SET"
+                " position = excluded.position, question = excluded.question,"
+                " human_answer = excluded.human_answer, answer = excluded.answer, updated_at = excluded.updated_at",
+                values
+            ).rowcount
+
+    def record_grades(self, client: str, run_id: str, variant: str, grades) -> int:
+        """
+        Stores (question_id, replica, grade, confidence) tuples in the order of the
+        grades CSV. Returns the rows stored.
+        """
+        now = time.time()
+        values = (
+            (client, run_id, str(question_id), int(replica), variant, position,
+             grade, self._grade_value(grade), self._grade_value(confidence), now)
+            for position, (question_id, replica, grade, confidence) in enumerate(grades)
+        )
+        with self.lock, self.connection:
+            return self.connection.executemany(
+                "INSERT INTO results (client, run_id, question_id, replica, variant, position, grade, grade_value,"
+                " confidence, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (client, run_id, question_id, replica, variant) DO UPDATE SET"
+                " grade = excluded.grade, grade_value = excluded.grade_value, confidence = excluded.confidence,"
+                " updated_at = excluded.updated_at",
+                values
+            ).rowcount
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+    def count(self, client: str, run_id: str, variant: str, graded: bool = False) -> int:
+        """
+        Rows of a run and variant (with an answer, or with a grade if `graded`).
+        """
+        column = "grade" if graded else "answer"
+        with self.lock:
+            (total,) = self.connection.execute(
+                f"SELECT COUNT(*) FROM results WHERE client = ? AND run_id = ? AND variant = ? AND {column} IS NOT NULL",
+                (client, run_id, variant)
+            ).fetchone()
+        return total
+
+    def worst_questions(self, client: str, run_id: str, variant: str, limit: int) -> list:
+        """
+        The `limit` distinct questions with the lowest mean numeric grade over their
+        replicas (ties in test-set order), as (question_id, question, human_answer,
+        mean grade) tuples.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT question_id, question, human_answer, AVG(grade_value) AS mean_grade,"
+                " MIN(position) AS first_position FROM results"
+                " WHERE client = ? AND run_id = ? AND variant = ? AND grade_value IS NOT NULL"
+                " GROUP BY question_id ORDER BY mean_grade ASC, first_position ASC LIMIT ?",
+                (client, run_id, variant, limit)
+            ).fetchall()
+        return [row[:4] for row in rows]
+
+    def questions(self, client: str, run_id: str, variant: str, question_ids) -> dict:
+        """
+        {question_id: (question, human_answer)} for the given ids.
+        """
+        question_ids = [str(question_id) for question_id in question_ids]
+        if not question_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in question_ids)
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT question_id, question, human_answer FROM results"
+                f" WHERE client = ? AND run_id = ? AND variant = ? AND question_id IN ({placeholders})"
+                " ORDER BY position",
+                (client, run_id, variant, *question_ids)
+            ).fetchall()
+        questions = {}
+        for question_id, question, human_answer in rows:
+            questions.setdefault(question_id, (question, human_answer))
+        return questions
+
+    def grade_deltas(self, client: str, run_id: str, base_variant: str, other_variant: str) -> list:
+        """
+        (question_id, replica, question, base grade, other grade, other - base) for every
+        sample graded in both variants, largest drop first.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT b.question_id, b.replica, b.question, b.grade_value, o.grade_value,"
+                " o.grade_value - b.grade_value"
+                " FROM results b JOIN results o"
+                "   ON o.client = b.client AND o.run_id = b.run_id AND o.question_id = b.question_id"
+                "   AND o.replica = b.replica"
+                " WHERE b.client = ? AND b.run_id = ? AND b.variant = ? AND o.variant = ?"
+                "   AND b.grade_value IS NOT NULL AND o.grade_value IS NOT NULL"
+                " ORDER BY o.grade_value - b.grade_value ASC, b.position ASC",
+                (client, run_id, base_variant, other_variant)
+            ).fetchall()
+
+    def run_ids(self, client: str) -> list:
+        """
+        Runs of a client, oldest first.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT run_id FROM results WHERE client = ? ORDER BY run_id", (client,)
+            ).fetchall()
+        return [run_id for (run_id,) in rows]
+
+    def iter_unified(self, client: str, run_id: str, base_variant: str, other_variant: str):
+        """
+        Yields (question, human_answer, base answer, base grade, other answer, other grade)
+        for every question answered in `base_variant`, in test-set order. Missing values are "".
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT b.question, b.human_answer, b.answer, b.grade, o.answer, o.grade"
+                " FROM results b LEFT JOIN results o"
+                "   ON o.client = b.client AND o.run_id = b.run_id AND o.question_id = b.question_id"
+                "   AND o.replica = b.replica AND o.variant = ?"
+                " WHERE b.client = ? AND b.run_id = ? AND b.variant = ? AND b.answer IS NOT NULL"
+                " ORDER BY b.position",
+                (other_variant, client, run_id, base_variant)
+            )
+        # Fetched in batches, so a large test set is never held in memory at once
+        while True:
+            with self.lock:
+                batch = cursor.fetchmany(1000)
+            if not batch:
+                break
+            for row in batch:
+                yield tuple("" if value is None else value for value in row)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+import random
+
+from openai import AsyncOpenAI
+
+
+class RunCompletionEngine:
+    """
+    Waits for many Assistants runs to reach a terminal state.
+
+    Instead of sweeping over every run on each pass (and sleeping a fixed interval),
+    only the pending runs are kept in a priority queue ordered by their next check
+    time. Each run has its own delay that grows by `backoff_factor` every time it is
+    found unfinished (capped at `max_delay`), and up to `max_concurrency`
+    `runs.retrieve` calls are in flight at the same time.
+    """
+
+    TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired", "incomplete")
+
+    def __init__(self, client: AsyncOpenAI, max_concurrency: int = 16, initial_delay: float = 1.0,
+                 max_delay: float = 10.0, backoff_factor: float = 1.5, max_errors: int = 3):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.max_errors = max_errors
+
+        # Number of runs.retrieve calls issued, useful to compare with the sweep polling
+        self.api_calls = 0
+
+    async def wait_for_runs(self, runs: dict, on_terminal, on_error):
+        """
+        :param runs: {key: (thread_id, run_id)} for every pending run.
+        :param on_terminal: async callback(key, run_obj) called once per run in a terminal state.
+        :param on_error: async callback(key, exception) called when a run could not be retrieved
+                         after `max_errors` consecutive attempts.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Heap entries: (due_time, sequence, key, delay, errors)
+        heap = []
+        sequence = 0
+        for key in runs:
+            heapq.heappush(heap, (loop.time() + self.initial_delay, sequence, key, self.initial_delay, 0))
+            sequence += 1
+
+        in_flight = set()
+        while heap or in_flight:
+            # Launch every check that is due, as long as there is room
+            while heap and heap[0][0] <= loop.time() and len(in_flight) < self.max_concurrency:
+                _, _, key, delay, errors = heapq.heappop(heap)
+                thread_id, run_id = runs[key]
+                in_flight.add(asyncio.create_task(
+                    self._check(key, thread_id, run_id, delay, errors, on_terminal, on_error)
+                ))
+
+            timeout = max(0.0, heap[0][0] - loop.time()) if heap else None
+            if not in_flight:
+                await asyncio.sleep(timeout)
+                continue
+
+            if len(in_flight) >= self.max_concurrency:
+                timeout = None
+            done, in_flight = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                key, run_obj, error, delay, errors = task.result()
+
+                if error is not None:
+                    if errors < self.max_errors:
+                        # Retry a transient error after the current delay
+                        heapq.heappush(heap, (loop.time() + delay, sequence, key, delay, errors))
+                        sequence += 1
+                    continue
+
+                if run_obj is None:
+                    # Terminal: already handed to the callbacks by _check
+                    continue
+
+                # Still running: check again later, a bit less often each time
+                next_delay = min(delay * self.backoff_factor, self.max_delay)
+                jitter = random.uniform(0, next_delay * 0.1)
+                heapq.heappush(heap, (loop.time() + next_delay + jitter, sequence, key, next_delay, 0))
+                sequence += 1
+
+    async def _check(self, key, thread_id: str, run_id: str, delay: float, errors: int, on_terminal, on_error):
+        """
+        Retrieves the run once. Terminal runs (and runs that failed too many times)
+        are handed to the callbacks here, so that slow callbacks do not hold back
+        the dispatcher. Returns (key, run_obj, error, delay, errors), with run_obj=None
+        when the run is finished.
+        """
+        self.api_calls += 1
+        try:
+            run_obj = await self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+        except Exception as e:
+            if errors + 1 >= self.max_errors:
+                await on_error(key, e)
+            return key, None, e, delay, errors + 1
+
+        if run_obj.status in self.TERMINAL_STATUSES:
+            await on_terminal(key, run_obj)
+            return key, None, None, delay, 0
+        return key, run_obj, None, delay, 0
@@ -5,9 +5,20 @@ import os
 import time
 import re
 import csv
-from openai import OpenAI
 from tqdm import tqdm
-from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION
+from parameters import (
+    COLUMN_HUMAN_ANSWER,
+    COLUMN_QUESTION,
+    COLUMN_QUESTION_ID,
+    COLUMN_REPLICA,
+    COLUMN_REPLICAS,
+    REPLICA_SAMPLING,
+    THREAD_MODE,
+)
+
+from src.assistant_testing.row_journal import RowJournal
+from src.openai_clients.client_factory import OpenAIClientFactory
+from src.openai_clients.prompt_cache import prompt_cache_key
 
 
 class StaticAssistantsRunner:
@@ -20,20 +31,68 @@ class StaticAssistantsRunner:
       5) create a run for each thread/assistant pair and poll until completed
       6) whenever a run is in state "completed" store the answer
       7) finish when every run is completed and all answers are saved
+
+    `thread_mode` chooses the threads of steps 3 to 5:
+      - "shared":        one thread per question, with a run of every assistant on it.
+      - "per_assistant": one thread per (assistant, question), created together with
+                         its run by threads.create_and_run (steps 3, 4 and 5 in a single
+                         request). Every run starts on a clean thread and no run has
+                         to wait for another one on the same thread.
+
+    Each test question is asked `replicas` times (column COLUMN_REPLICAS of the test CSV,
+    1 if missing): qa_data holds one item per (question, replica) sample, and every
+    sample gets its own row in the answers CSV, with its question id and replica number.
+    `replica_sampling` chooses how the replicas of a question are asked:
+      - "chat": the assistant's configuration is retrieved once and all the pending
+                replicas of a question are sampled by a single chat completion request
+                with "n" = replicas, so the prompt is sent (and billed) once.
+                Questions with a single pending replica, and replicas whose chat
+                completion failed or came back empty, still get an Assistants run.
+      - "runs": every replica gets its own Assistants run (and thread). The Assistants
+                API has no "n", and a thread holds a single active run whose later
+                runs see the earlier answers, so replicas cannot share a thread.
+
+    With `journal=True`, every answer is appended to <output_csv_path>.journal.jsonl
+    as soon as it arrives. If the process dies, the next run_all replays that journal
+    and only asks for the (assistant, question) pairs that are still missing. Journal
+    keys include each assistant's configuration (retrieved once), so the answers of an
+    assistant updated in place since then are not replayed.
     """
 
-    def __init__(self, openai_api_key: str, txt_file_path: str, csv_file_path: str, output_csv_path: str):
+    # Values stored in answers_map when there is no real answer; they are never journaled
+    FAILED_ANSWER_PREFIXES = (
+        "Error:", "Error polling run", "Error joining text fragments",
+        "Run ended with status=", "No assistant messages found.",
+    )
+
+    def __init__(self, openai_api_key: str, txt_file_path: str, csv_file_path: str, output_csv_path: str,
+                 poll_interval: float = 3.0, journal: bool = True, client_factory: OpenAIClientFactory = None,
+                 thread_mode: str = THREAD_MODE,
+                 replica_sampling: str = REPLICA_SAMPLING):
+        if thread_mode not in ("shared", "per_assistant"):
+            raise ValueError(f"Unknown thread_mode '{thread_mode}' (expected 'shared' or 'per_assistant')")
+        if replica_sampling not in ("chat", "runs"):
+            raise ValueError(f"Unknown replica_sampling '{replica_sampling}' (expected 'chat' or 'runs')")
         self.openai_api_key = openai_api_key
+        self.client_factory = client_factory or OpenAIClientFactory.shared(openai_api_key)
         self.txt_file_path = txt_file_path
         self.csv_file_path = csv_file_path
         self.output_csv_path = output_csv_path
+        self.poll_interval = poll_interval
+        self.thread_mode = thread_mode
+        self.use_journal = journal
+        self.journal = None
+        self.replica_sampling = replica_sampling
+        self.assistant_configs = {}       # {assistant_name: assistant object}, retrieved once
+        self.assistant_fingerprints = {}  # {assistant_name: hash of its configuration}, for the journal keys
 
         self.assistants_dict = {}  # {assistant_name: assistant_id}
-        self.qa_data = []          # list of {"question": str, "human_answer": str}
+        self.qa_data = []          # one {question, human_answer, question_id, replica} per sample
 
         # For step 3 & 4, store a thread_id for each question index
         # We'll reuse each thread with a single question:
-        #   thread_map[q_idx] = thread_id
+        #   thread_map[q_idx] = thread_id                     (thread_mode="shared")
+        #   thread_map[(assistant_name, q_idx)] = thread_id   (thread_mode="per_assistant")
         self.thread_map = {}
 
         # For step 5, we also need to store run_id for each (assistant, q_idx).
@@ -49,6 +108,8 @@ class StaticAssistantsRunner:
         Reads the .txt file with lines of the form:
             ('Assistant Name', 'assistant_id')
         Stores results in self.assistants_dict as {assistant_name: assistant_id}.
+        Repeated names keep the last id, and an id listed under several names is
+        only run once (under its first name).
         """
         if not os.path.exists(self.txt_file_path):
             print(f"Error: The file {self.txt_file_path} does not exist.")
@@ -62,6 +123,10 @@ class StaticAssistantsRunner:
                 if match:
                     assistant_name = match.group(1)
                     assistant_id = match.group(2)
+                    if assistant_id in self.assistants_dict.values() and \
+                            self.assistants_dict.get(assistant_name) != assistant_id:
+                        print(f"Skipping {assistant_name}: {assistant_id} is already loaded under another name.")
+                        continue
                     self.assistants_dict[assistant_name] = assistant_id
 
         print(f"Loaded {len(self.assistants_dict)} assistants from {self.txt_file_path}:")
@@ -70,37 +135,274 @@ class StaticAssistantsRunner:
 
     def load_qa_data(self):
         """
-        Reads the CSV file containing question,human_answer
-        and stores it in a list of dicts: [{'question':..., 'human_answer':...}, ...].
+        Reads the CSV file containing question_id,question,human_answer,replicas and
+        stores one dict per sample (each question repeated `replicas` times):
+        [{'question':..., 'human_answer':..., 'question_id':..., 'replica': 0}, ...].
+
+        Test CSVs without those columns (one row per sample) are read as they are:
+        each row is one replica, and repeated Q/A rows share the question id.
         """
         if not os.path.exists(self.csv_file_path):
             print(f"Error: The file {self.csv_file_path} does not exist.")
             return
 
+        questions = 0
+        replicas_seen = {}  # question_id -> replicas loaded so far
+        first_ids = {}      # (question, human_answer) -> question_id, for test CSVs without ids
         with open(self.csv_file_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
-            for row in reader:
+            for row_idx, row in enumerate(reader):
                 question = row.get(COLUMN_QUESTION, "").strip()
                 human_answer = row.get(COLUMN_HUMAN_ANSWER, "").strip()
-                self.qa_data.append({
-                    COLUMN_QUESTION: question,
-                    COLUMN_HUMAN_ANSWER: human_answer
-                })
+                question_id = (row.get(COLUMN_QUESTION_ID) or "").strip() or \
+                    first_ids.setdefault((question, human_answer), str(row_idx))
+                try:
+                    replicas = max(1, int(row.get(COLUMN_REPLICAS) or 1))
+                except ValueError:
+                    replicas = 1
+
+                first_replica = replicas_seen.get(question_id, 0)
+                if not first_replica:
+                    questions += 1
+                replicas_seen[question_id] = first_replica + replicas
+                for replica in range(first_replica, first_replica + replicas):
+                    self.qa_data.append({
+                        COLUMN_QUESTION: question,
+                        COLUMN_HUMAN_ANSWER: human_answer,
+                        COLUMN_QUESTION_ID: question_id,
+                        COLUMN_REPLICA: replica
+                    })
+
+        print(f"Loaded {questions} questions ({len(self.qa_data)} samples) from {self.csv_file_path}.")
+
+    # -------------------------------------------------------------------------
+    # Answers journal
+    # -------------------------------------------------------------------------
+    def load_journal(self):
+        """
+        Opens <output_csv_path>.journal.jsonl and puts the answers it already holds
+        into answers_map, so they are not requested again.
+        """
+        if not self.use_journal:
+            return
+        self.journal = RowJournal(f"{self.output_csv_path}.journal.jsonl")
+
+        # Assistants updated in place keep their id: the journal keys include their configuration
+        configs = self.load_assistant_configs()
+        self.assistant_fingerprints = {
+            asst_name: RowJournal.key_for(assistant.model, assistant.instructions or "",
+                                          assistant.temperature, assistant.top_p)
+            for asst_name, assistant in configs.items()
+        }
+
+        resumed = 0
+        for asst_name in self.assistant_fingerprints:
+            for idx in range(len(self.qa_data)):
+                answer = self.journal.get(self._journal_key(asst_name, idx))
+                if answer is not None:
+                    self.answers_map[(asst_name, idx)] = answer
+                    resumed += 1
+        if resumed:
+            print(f"Resumed {resumed} answers from {self.journal.path}.")
+
+    def _journal_key(self, asst_name: str, q_idx: int) -> str:
+        # The same question and replica asked to the same assistant id and configuration gives the same key
+        qa_item = self.qa_data[q_idx]
+        return RowJournal.key_for(self.assistants_dict[asst_name], self.assistant_fingerprints[asst_name],
+                                  qa_item[COLUMN_QUESTION], qa_item[COLUMN_REPLICA])
+
+    def _record_answer(self, key, answer: str):
+        """
+        Stores the answer of (assistant_name, q_idx) and journals it if it is a real answer.
+        An empty answer is stored as a failed one.
+        """
+        if not answer.strip():
+            answer = "Error: Empty answer"
+        self.answers_map[key] = answer
+        if self.journal is not None and key[0] in self.assistant_fingerprints \
+                and not answer.startswith(self.FAILED_ANSWER_PREFIXES):
+            self.journal.put(self._journal_key(*key), answer)
+
+    def _is_answered(self, key) -> bool:
+        return key in self.answers_map
 
-        print(f"Loaded {len(self.qa_data)} Q&A rows from {self.csv_file_path}.")
+    def _pending_question_indices(self) -> list:
+        """
+        Questions that still miss the answer of at least one assistant.
+        """
+        return [
+            idx for idx in range(len(self.qa_data))
+            if not all(self._is_answered((asst_name, idx)) for asst_name in self.assistants_dict)
+        ]
+
+    def _close_journal(self):
+        """
+        Deletes the journal once every answer is in the CSV; keeps it if some failed.
+        """
+        if self.journal is None:
+            return
+        all_answered = all(
+            not self.answers_map.get((asst_name, idx), "Error:").startswith(self.FAILED_ANSWER_PREFIXES)
+            for asst_name in self.assistants_dict
+            for idx in range(len(self.qa_data))
+        )
+        if all_answered:
+            self.journal.discard()
+        else:
+            self.journal.close()
+        self.journal = None
+
+    def _thread_id(self, key):
+        """
+        Thread of the (assistant_name, q_idx) pair, or None if it could not be created.
+        """
+        if self.thread_mode == "per_assistant":
+            return self.thread_map.get(key)
+        return self.thread_map.get(key[1])
+
+    def _pending_pairs(self) -> list:
+        """
+        (assistant_name, q_idx) pairs that are not answered yet.
+        """
+        return [
+            (asst_name, idx)
+            for idx in self._pending_question_indices()
+            for asst_name in self.assistants_dict
+            if not self._is_answered((asst_name, idx))
+        ]
+
+    # -------------------------------------------------------------------------
+    # Replicas sampled with chat completions
+    # -------------------------------------------------------------------------
+    def load_assistant_configs(self) -> dict:
+        """
+        Retrieves instructions/model/temperature/top_p of each loaded assistant (once per
+        runner). Returns {assistant_name: assistant_obj}.
+        """
+        client = self.client_factory.sync()
+        for asst_name, asst_id in self.assistants_dict.items():
+            if asst_name in self.assistant_configs:
+                continue
+            try:
+                self.assistant_configs[asst_name] = client.beta.assistants.retrieve(asst_id)
+            except Exception as e:
+                print(f"Error retrieving assistant {asst_name} ({asst_id}): {e}")
+        return dict(self.assistant_configs)
+
+    def _pending_sample_groups(self, asst_name: str) -> list:
+        """
+        Sample indices not answered yet by `asst_name`, one list per question id.
+        """
+        pending = {}  # {question_id: [sample indices]}
+        for q_idx, qa_item in enumerate(self.qa_data):
+            if not self._is_answered((asst_name, q_idx)):
+                pending.setdefault(qa_item[COLUMN_QUESTION_ID], []).append(q_idx)
+        return list(pending.values())
+
+    def _chat_body(self, assistant, samples: list) -> dict:
+        """
+        Chat completion body answering the question of `samples` as `assistant` would
+        (system = assistant instructions, user = question), with one choice per sample.
+        """
+        instructions = assistant.instructions or ""
+        body = {
+            "model": assistant.model,
+            "messages": [
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": self.qa_data[samples[0]][COLUMN_QUESTION]},
+            ],
+        }
+        if assistant.temperature is not None:
+            body["temperature"] = assistant.temperature
+        if assistant.top_p is not None:
+            body["top_p"] = assistant.top_p
+        if len(samples) > 1:
+            body["n"] = len(samples)
+        cache_key = prompt_cache_key(assistant.model, instructions)
+        if cache_key:
+            body["prompt_cache_key"] = cache_key
+        return body
+
+    def _replica_groups(self) -> list:
+        """
+        With replica_sampling="chat", [(assistant_name, samples)] for every
+        (assistant, question) with more than one pending replica.
+        """
+        if self.replica_sampling != "chat":
+            return []
+        return [
+            (asst_name, samples)
+            for asst_name in self.assistants_dict
+            for samples in self._pending_sample_groups(asst_name)
+            if len(samples) > 1
+        ]
+
+    def _replica_requests(self, groups: list, configs: dict) -> list:
+        """
+        [(assistant_name, samples, chat body)] of `groups`. Assistants whose
+        configuration could not be retrieved are left to the Assistants runs.
+        """
+        return [
+            (asst_name, samples, self._chat_body(configs[asst_name], samples))
+            for asst_name, samples in groups
+            if asst_name in configs
+        ]
+
+    def _record_choices(self, asst_name: str, samples: list, completion):
+        """
+        Stores choice i of `completion` as the answer of samples[i]. Missing or empty
+        choices are left unanswered, so those replicas get an Assistants run instead.
+        """
+        choices = {choice.index: choice for choice in completion.choices}
+        for choice_idx, q_idx in enumerate(samples):
+            choice = choices.get(choice_idx)
+            if choice is None or not choice.message.content:
+                reason = "missing" if choice is None else f"empty (finish_reason={choice.finish_reason})"
+                print(f"Replica {choice_idx} of (assistant={asst_name}, question={samples[0]}) is {reason}; "
+                      f"it will be asked with a run.")
+                continue
+            self._record_answer((asst_name, q_idx), choice.message.content)
+
+    def sample_replicas(self):
+        """
+        Answers the pending replicas of each (assistant, question) with one chat
+        completion request ("n" = replicas) instead of one Assistants run per replica.
+        Replicas whose request fails are left for the Assistants runs of collect_answers.
+        """
+        groups = self._replica_groups()
+        if not groups:
+            return
+
+        requests = self._replica_requests(groups, self.load_assistant_configs())
+        client = self.client_factory.sync()
+        print(f"\n=== Sampling the replicas of {len(requests)} (assistant, question) pairs "
+              f"with one chat completion each ===\n")
+        with tqdm(total=len(requests), desc="Sampling replicas") as pbar:
+            for asst_name, samples, body in requests:
+                try:
+                    self._record_choices(asst_name, samples, client.chat.completions.create(**body))
+                except Exception as e:
+                    # The replicas stay pending and are asked with Assistants runs
+                    print(f"Error sampling replicas for (assistant={asst_name}, question={samples[0]}): {e}")
+                pbar.update(1)
 
     def create_threads_and_send_questions(self):
         """
         Steps 3 & 4:
           - Create a Thread for each question
           - Send the question in a user message
+        With thread_mode="per_assistant" the threads are created by create_runs.
         """
-        client = OpenAI(api_key=self.openai_api_key)
+        if self.thread_mode == "per_assistant":
+            return
+
+        client = self.client_factory.sync()
+        pending = self._pending_question_indices()
 
         print("\n=== Creating a thread for each question and posting the user message ===\n")
-        with tqdm(total=len(self.qa_data), desc="Creating threads") as pbar:
-            for idx, qa_item in enumerate(self.qa_data):
-                question = qa_item[COLUMN_QUESTION]
+        with tqdm(total=len(pending), desc="Creating threads") as pbar:
+            for idx in pending:
+                question = self.qa_data[idx][COLUMN_QUESTION]
 
                 try:
                     # 1) Create a new thread
@@ -128,23 +430,33 @@ class StaticAssistantsRunner:
         For each thread (hence each question), create a run with each assistant.
         We do NOT wait in this function; we only store the run_id.
         """
-        client = OpenAI(api_key=self.openai_api_key)
+        if self.thread_mode == "per_assistant":
+            self._create_threads_and_runs()
+            return
 
-        total_runs = len(self.assistants_dict) * len(self.qa_data)
+        client = self.client_factory.sync()
+
+        # Pairs already answered (e.g. replayed from the journal) get no run
+        pending = [
+            (idx, [asst_name for asst_name in self.assistants_dict if not self._is_answered((asst_name, idx))])
+            for idx in self._pending_question_indices()
+        ]
+        total_runs = sum(len(asst_names) for _, asst_names in pending)
         print(f"\n=== Creating {total_runs} runs (1 per assistant per question) ===\n")
 
         with tqdm(total=total_runs, desc="Creating runs") as pbar:
-            for idx in range(len(self.qa_data)):
+            for idx, asst_names in pending:
                 thread_id = self.thread_map.get(idx)
                 if thread_id is None:
                     # Could not create a thread for that question, skip
-                    for asst_name in self.assistants_dict:
+                    for asst_name in asst_names:
                         self.run_map[(asst_name, idx)] = None
-                    pbar.update(len(self.assistants_dict))
+                    pbar.update(len(asst_names))
                     continue
 
                 # For each assistant
-                for asst_name, asst_id in self.assistants_dict.items():
+                for asst_name in asst_names:
+                    asst_id = self.assistants_dict[asst_name]
                     try:
                         # Create run
                         run = client.beta.threads.runs.create(
@@ -158,6 +470,38 @@ class StaticAssistantsRunner:
                         self.run_map[(asst_name, idx)] = None
                     pbar.update(1)
 
+    def _create_threads_and_runs(self):
+        """
+        Steps 3, 4 & 5 (part 1) with thread_mode="per_assistant": one threads.create_and_run
+        request per (assistant, question) pair creates its own thread, posts the question
+        and starts the run.
+        """
+        client = self.client_factory.sync()
+        pending = self._pending_pairs()
+        print(f"\n=== Creating {len(pending)} threads with their runs (1 per assistant per question) ===\n")
+
+        with tqdm(total=len(pending), desc="Creating runs") as pbar:
+            for key in pending:
+                asst_name, idx = key
+                try:
+                    run = client.beta.threads.create_and_run(
+                        assistant_id=self.assistants_dict[asst_name],
+                        thread=self._thread_params(idx)
+                    )
+                    self.thread_map[key] = run.thread_id
+                    self.run_map[key] = run.id
+                except Exception as e:
+                    print(f"Error creating thread and run for (assistant={asst_name}, question={idx}): {e}")
+                    self.thread_map[key] = None
+                    self.run_map[key] = None
+                pbar.update(1)
+
+    def _thread_params(self, q_idx: int) -> dict:
+        """
+        `thread` argument of threads.create_and_run: a thread holding the question.
+        """
+        return {"messages": [{"role": "user", "content": self.qa_data[q_idx][COLUMN_QUESTION]}]}
+
     def poll_runs_until_complete(self, poll_interval: float = 3.0):
         """
         Step 5 (part 2):
@@ -166,7 +510,7 @@ class StaticAssistantsRunner:
         (Step 6) and store it in `self.answers_map`.
         We exit once all runs are in a terminal state (completed, failed, cancelled, etc.).
         """
-        client = OpenAI(api_key=self.openai_api_key)
+        client = self.client_factory.sync()
 
         # Flatten out a list of all (assistant_name, question_idx) keys
         all_keys = list(self.run_map.keys())
@@ -199,7 +543,7 @@ class StaticAssistantsRunner:
 
                     # Otherwise, poll the run object
                     try:
-                        run_obj = client.beta.threads.runs.retrieve(thread_id=self.thread_map[q_idx], run_id=run_id)
+                        run_obj = client.beta.threads.runs.retrieve(thread_id=self._thread_id(key), run_id=run_id)
                         status = run_obj.status
 
                         if status in (
@@ -214,8 +558,8 @@ class StaticAssistantsRunner:
 
                             if status == "completed":
                                 # Step 6: get final assistant message
-                                answer_text = self._get_final_assistant_message(run_obj, q_idx)
-                                self.answers_map[key] = answer_text
+                                answer_text = self._get_final_assistant_message(run_obj)
+                                self._record_answer(key, answer_text)
                             else:
                                 # For other terminal statuses, store status as "answer"
                                 self.answers_map[key] = f"Run ended with status={status}"
@@ -231,30 +575,53 @@ class StaticAssistantsRunner:
             print("\nAll runs reached a terminal state.")
 
 
-    def _get_final_assistant_message(self, run_obj, q_idx: int) -> str:
+    def collect_answers(self):
         """
-        Retrieves the final assistant message from the thread after the run is completed.
-        We look for the last message with role='assistant' in the thread.
+        Steps 3 to 6 for the (assistant, question) pairs that are not answered yet.
         """
-        client = OpenAI(api_key=self.openai_api_key)
-        thread_id = self.thread_map.get(q_idx)
-        if thread_id is None:
-            return "Error: missing thread_id"
+        # Replicas of a question answered together, when replica_sampling="chat"
+        self.sample_replicas()
+        if not self._pending_question_indices():
+            return
+
+        # 3 & 4) Create a thread for each question and send user messages
+        self.create_threads_and_send_questions()
+
+        # 5) Create runs for each (assistant, question)
+        self.create_runs()
+
+        # 5 & 6) Poll runs until completed, retrieve final answers
+        self.poll_runs_until_complete(poll_interval=self.poll_interval)
+
+    def _get_final_assistant_message(self, run_obj) -> str:
+        """
+        Retrieves the final assistant message of the run once it is completed.
+        Only the newest message written by this run is requested (run_id filter,
+        order='desc', limit=1), instead of listing the whole thread.
+        """
+        client = self.client_factory.sync()
 
-        # Fetch the entire thread messages
+        # Fetch only the newest message of this run
         try:
-            messages = client.beta.threads.messages.list(thread_id=thread_id)
+            page = client.beta.threads.messages.list(
+                thread_id=run_obj.thread_id,
+                run_id=run_obj.id,
+                order="desc",
+                limit=1
+            )
         except Exception as e:
             return f"Error: {e}"
 
-        # Filter assistant messages
-        assistant_messages = [m for m in messages if m.role == "assistant"]
+        assistant_messages = [m for m in page.data if m.role == "assistant"]
         if not assistant_messages:
             return "No assistant messages found."
 
-        # Get the last assistant message
-        final_message = assistant_messages[-1]
+        return self._message_to_text(assistant_messages[0])
 
+    def _message_to_text(self, final_message) -> str:
+        """
+        Converts an assistant message object into plain text.
+        """
         # If content is a list of blocks, combine the text blocks
         if isinstance(final_message.content, list):
             text_fragments = []
@@ -282,7 +649,8 @@ class StaticAssistantsRunner:
         Step 7: Write everything (question, human_answer, and each assistant's final answer)
         to a new output CSV file.
         """
-        fieldnames = [COLUMN_QUESTION, COLUMN_HUMAN_ANSWER] + list(self.assistants_dict.keys())
+        fieldnames = [COLUMN_QUESTION_ID, COLUMN_REPLICA, COLUMN_QUESTION, COLUMN_HUMAN_ANSWER] + \
+            list(self.assistants_dict.keys())
 
         try:
             with open(self.output_csv_path, 'w', newline='', encoding='utf-8') as out_f:
@@ -291,6 +659,8 @@ class StaticAssistantsRunner:
 
                 for idx, qa_item in enumerate(self.qa_data):
                     row = {
+                        COLUMN_QUESTION_ID: qa_item[COLUMN_QUESTION_ID],
+                        COLUMN_REPLICA: qa_item[COLUMN_REPLICA],
                         COLUMN_QUESTION: qa_item[COLUMN_QUESTION],
                         COLUMN_HUMAN_ANSWER: qa_item[COLUMN_HUMAN_ANSWER],
                     }
@@ -303,6 +673,9 @@ class StaticAssistantsRunner:
             print(f"\nAll done! Results saved to {self.output_csv_path}\n")
         except Exception as e:
             print(f"Error creating output CSV {self.output_csv_path}: {e}")
+            return
+
+        self._close_journal()
 
     def run_all(self):
         """
@@ -327,14 +700,12 @@ class StaticAssistantsRunner:
             print("No assistants or QA data found. Exiting.")
             return
 
-        # 3 & 4) Create a thread for each question and send user messages
-        self.create_threads_and_send_questions()
+        # Answers saved by a previous, interrupted run
+        self.load_journal()
 
-        # 5) Create runs for each (assistant, question)
-        self.create_runs()
-
-        # 5 & 6) Poll runs until completed, retrieve final answers
-        self.poll_runs_until_complete()
+        if self._pending_question_indices():
+            # 3, 4, 5 & 6) Threads, runs and final answers
+            self.collect_answers()
 
         # 7) Write everything to CSV
         self.write_results_to_csv()
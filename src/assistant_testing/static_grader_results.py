@@ -3,13 +3,18 @@ sys.stdout.reconfigure(encoding='utf-8')  # Aseguramos salida UTF-8
 
 import os
 import csv
+import json
 import re
 from tqdm import tqdm
 from typing_extensions import override
 
 # Si usas la librería openai (u otra similar), ajústala según tu setup:
 from dotenv import load_dotenv
-from openai import OpenAI, AssistantEventHandler
+from openai import AssistantEventHandler
+
+from src.assistant_testing.row_journal import RowJournal
+from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.openai_clients.client_factory import OpenAIClientFactory
 
 class MyEventHandler(AssistantEventHandler):
     """
@@ -47,16 +52,18 @@ class RowProcessor:
       - respuesta de la máquina
     Luego, llama al asistente con dicho prompt y retorna la respuesta.
     """
-    def __init__(self, openai_api_key: str, assistant_id: str):
+    def __init__(self, openai_api_key: str, assistant_id: str, client_factory: OpenAIClientFactory = None):
         """
         :param openai_api_key: La API key de OpenAI (o la que corresponda).
         :param assistant_id: El ID del asistente al que se le enviará el prompt.
+        :param client_factory: fábrica de clientes compartida (por defecto, la del proceso).
         """
         self.openai_api_key = openai_api_key
         self.assistant_id = assistant_id
 
-        # Inicializamos el cliente (ajusta si tu setup es diferente)
-        self.client = OpenAI(api_key=self.openai_api_key)
+        # Cliente con el pool de conexiones compartido
+        self.client_factory = client_factory or OpenAIClientFactory.shared(openai_api_key)
+        self.client = self.client_factory.sync()
 
     def build_prompt(self, question: str, human_answer: str, machine_answer: str) -> str:
         """
@@ -69,6 +76,21 @@ class RowProcessor:
         )
         return prompt
 
+    def configuration(self):
+        """
+        Modelo, instrucciones, temperature y top_p del asistente evaluador (una tupla),
+        o None si no se pudo obtener. Un asistente actualizado en su lugar conserva su ID,
+        así que las claves del journal de notas incluyen esta configuración.
+        """
+        if self.assistant_id is None:
+            return ()
+        try:
+            assistant = self.client.beta.assistants.retrieve(self.assistant_id)
+        except Exception as e:
+            print(f"No se pudo obtener la configuración del asistente {self.assistant_id}: {e}")
+            return None
+        return (assistant.model, assistant.instructions or "", assistant.temperature, assistant.top_p)
+
     def get_assistant_response(self, question: str, human_answer: str, machine_answer: str) -> str:
         """
         Crea un prompt a partir de la fila y obtiene la respuesta del asistente.
@@ -77,40 +99,57 @@ class RowProcessor:
         prompt = self.build_prompt(question, human_answer, machine_answer)
 
         try:
-            # Creamos un 'thread' o conversación nueva
-            thread = self.client.beta.threads.create()
-
-            # Mensaje del usuario
-            self.client.beta.threads.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content=prompt
-            )
+            return self.ask_assistant(prompt)
+        except Exception as e:
+            return f"Error al procesar la fila: {e}"
 
-            # Iniciamos el streaming de la respuesta
-            with self.client.beta.threads.runs.stream(
-                thread_id=thread.id,
-                assistant_id=self.assistant_id,
-                event_handler=MyEventHandler()
-            ) as stream:
-                stream.until_done()
-
-            # Recuperamos todos los mensajes del hilo
-            response_message = self.client.beta.threads.messages.list(thread_id=thread.id)
-            if response_message and response_message.data:
-                # Filtramos los mensajes del asistente
-                assistant_responses = [
-                    msg.content for msg in response_message.data if msg.role == 'assistant'
-                ]
-                if assistant_responses:
-                    return assistant_responses[-1]  # Tomamos la última respuesta
-                else:
-                    return "No hubo respuesta del asistente."
+    def ask_assistant(self, prompt: str):
+        """
+        Envía el prompt al asistente y retorna su última respuesta.
+        A diferencia de get_assistant_response, los errores de la API se propagan
+        (por ejemplo openai.RateLimitError, una vez agotados los reintentos del cliente).
+        """
+        # Creamos un 'thread' o conversación nueva
+        thread = self.client.beta.threads.create()
+
+        # Mensaje del usuario
+        self.client.beta.threads.messages.create(
+            thread_id=thread.id,
+            role="user",
+            content=prompt
+        )
+
+        # Iniciamos el streaming de la respuesta
+        with self.client.beta.threads.runs.stream(
+            thread_id=thread.id,
+            assistant_id=self.assistant_id,
+            event_handler=MyEventHandler()
+        ) as stream:
+            stream.until_done()
+            final_run = stream.get_final_run()
+            run_id = final_run.id
+
+        # Los tokens de un run en streaming se registran aquí (las métricas no leen streams)
+        self.client_factory.metrics.record_usage("runs.stream", final_run.usage)
+
+        # Recuperamos solo el mensaje más reciente de este run
+        response_message = self.client.beta.threads.messages.list(
+            thread_id=thread.id,
+            run_id=run_id,
+            order="desc",
+            limit=1
+        )
+        if response_message and response_message.data:
+            # Filtramos los mensajes del asistente
+            assistant_responses = [
+                msg.content for msg in response_message.data if msg.role == 'assistant'
+            ]
+            if assistant_responses:
+                return assistant_responses[0]  # El más reciente viene primero
             else:
                 return "No hubo respuesta del asistente."
-
-        except Exception as e:
-            return f"Error al procesar la fila: {e}"
+        else:
+            return "No hubo respuesta del asistente."
         
 
 class ResponseCleaner:
@@ -149,18 +188,38 @@ class FileManagerGrader:
       2. Para cada fila, usar RowProcessor -> obtener la respuesta cruda.
       3. Pasar la respuesta por ResponseCleaner -> obtener la parte relevante.
       4. Guardar un CSV con UNA SOLA columna: "grade".
+    Si se entrega un GradeCache, las filas ya calificadas (o repetidas) no se
+    vuelven a enviar al evaluador.
+
+    Con `journal=True`, cada nota se agrega a <output_csv_path>.journal.jsonl apenas
+    se obtiene. Si el proceso se cae, la siguiente ejecución reutiliza esas notas y
+    solo califica las filas que faltan.
     """
-    def __init__(self, openai_api_key: str, assistant_id: str, csv_input_path: str):
+    ERROR_PREFIXES = ("Error al procesar la fila", "No hubo respuesta del asistente", "Sin respuesta que calificar")
+
+    def __init__(self, openai_api_key: str, assistant_id: str, csv_input_path: str, grade_cache=None,
+                 row_processor=None, journal: bool = True, client_factory: OpenAIClientFactory = None):
         """
         :param openai_api_key: API key de OpenAI
         :param assistant_id: ID del asistente
         :param csv_input_path: Ruta al archivo CSV de entrada
+        :param grade_cache: GradeCache opcional para reutilizar notas ya calculadas
+        :param row_processor: procesador de filas alternativo (p. ej. ChatRowProcessor);
+                              por defecto, un RowProcessor con el asistente evaluador
+        :param journal: guardar cada nota apenas se obtiene, para retomar tras una caída
+        :param client_factory: fábrica de clientes compartida (por defecto, la del proceso)
         """
         self.openai_api_key = openai_api_key
         self.assistant_id = assistant_id
         self.csv_input_path = csv_input_path
-
-        self.row_processor = RowProcessor(openai_api_key, assistant_id)
+        self.grade_cache = grade_cache
+        self.use_journal = journal
+        self.journal = None
+        self.evaluator_configuration = ()
+        self.total_rows = 0
+
+        self.client_factory = client_factory or OpenAIClientFactory.shared(openai_api_key)
+        self.row_processor = row_processor or RowProcessor(openai_api_key, assistant_id, self.client_factory)
         self.response_cleaner = ResponseCleaner()
 
     def run(
@@ -179,48 +238,198 @@ class FileManagerGrader:
         :param machine_answer_column: nombre de la columna con la respuesta de la máquina
         :param output_csv_path: ruta del archivo de salida
         """
-        if not os.path.exists(self.csv_input_path):
-            print(f"El archivo {self.csv_input_path} no existe.")
+        if not self._count_input_rows():
             return
+        # Las filas se leen del disco a medida que se califican (memoria constante)
+        rows = self._iter_rows()
 
-        # Leemos el CSV de entrada
-        rows = []
-        with open(self.csv_input_path, 'r', encoding='utf-8') as f_in:
-            reader = csv.DictReader(f_in)
-            for row in reader:
-                rows.append(row)
+        # El CSV de salida tiene una columna "grade" (y "confidence" si el evaluador la entrega)
+        reports_confidence = getattr(self.row_processor, "reports_confidence", False)
+        fieldnames = ["grade", "confidence"] if reports_confidence else ["grade"]
 
-        if not rows:
-            print("No se encontraron filas en el CSV de entrada.")
-            return
-
-        # Definimos que el CSV de salida solo tendrá una columna: "grade"
-        fieldnames = ["grade"]
+        # Notas ya obtenidas por una ejecución anterior que se interrumpió
+        self._open_journal(output_csv_path)
 
         # Procesamos filas, generamos la respuesta y la limpiamos
+        all_graded = True
         with open(output_csv_path, 'w', newline='', encoding='utf-8') as f_out:
             writer = csv.DictWriter(f_out, fieldnames=fieldnames)
             writer.writeheader()
 
-            for row in tqdm(rows, desc="Procesando filas"):
-                question = row.get(question_column, "").strip()
-                human_answer = row.get(human_answer_column, "").strip()
-                machine_answer = row.get(machine_answer_column, "").strip()
+            for clean_response in self._grade_rows(rows, question_column, human_answer_column, machine_answer_column):
+                grade, confidence = self.split_grade(clean_response)
+                row = {"grade": grade}
+                if reports_confidence:
+                    row["confidence"] = confidence
+                writer.writerow(row)
+                all_graded = all_graded and self._is_valid_grade(clean_response)
 
-                # Llamada al asistente
-                raw_response = self.row_processor.get_assistant_response(
-                    question=question,
-                    human_answer=human_answer,
-                    machine_answer=machine_answer
-                )
+        self._close_journal(all_graded)
+        print(f"\n¡Proceso finalizado! El archivo con resultados se guardó en: {output_csv_path}")
+        if self.grade_cache is not None:
+            stats = self.grade_cache.stats()
+            print(f"Caché de notas: {stats['hits']} aciertos, {stats['misses']} fallos "
+                  f"({stats['hit_rate']:.0%}), {stats['entries']} entradas.")
 
-                # Limpieza de la respuesta
-                clean_response = self.response_cleaner.clean(raw_response)
+    def _count_input_rows(self) -> int:
+        """
+        Cuenta las filas del CSV de entrada sin guardarlas (0 si no hay nada que procesar).
+        El total queda en self.total_rows, para las barras de progreso.
+        """
+        self.total_rows = 0
+        if not os.path.exists(self.csv_input_path):
+            print(f"El archivo {self.csv_input_path} no existe.")
+            return 0
 
-                # Escribimos SÓLO la columna "grade"
-                writer.writerow({"grade": clean_response})
+        self.total_rows = sum(1 for _ in self._iter_rows())
+        if not self.total_rows:
+            print("No se encontraron filas en el CSV de entrada.")
+        return self.total_rows
 
-        print(f"\n¡Proceso finalizado! El archivo con resultados se guardó en: {output_csv_path}")
+    def _iter_rows(self):
+        """
+        Genera las filas del CSV de entrada, una a la vez.
+        """
+        with open(self.csv_input_path, 'r', encoding='utf-8') as f_in:
+            yield from csv.DictReader(f_in)
+
+    def _open_journal(self, output_csv_path: str):
+        if not self.use_journal:
+            return
+        self.evaluator_configuration = self.row_processor.configuration()
+        if self.evaluator_configuration is None:
+            print("Sin la configuración del evaluador no se usa el journal de notas.")
+            return
+        self.journal = RowJournal(f"{output_csv_path}.journal.jsonl")
+        if len(self.journal):
+            print(f"Retomando: {len(self.journal)} notas guardadas en {self.journal.path}.")
+
+    def _close_journal(self, all_graded: bool):
+        """
+        Si todas las filas quedaron calificadas el journal ya no hace falta; si no, se conserva.
+        """
+        if self.journal is None:
+            return
+        if all_graded:
+            self.journal.discard()
+        else:
+            self.journal.close()
+        self.journal = None
+
+    def _journal_key(self, prompt: str) -> str:
+        """
+        La clave incluye al evaluador, para no reutilizar notas de otro evaluador.
+        """
+        parts = [
+            getattr(self.row_processor, "assistant_id", None),
+            getattr(self.row_processor, "model", None),
+            getattr(self.row_processor, "system_prompt", None),
+            prompt
+        ]
+        # Un evaluador actualizado en su lugar conserva su ID: su configuración también cuenta
+        if self.evaluator_configuration:
+            parts.append(RowJournal.key_for(*self.evaluator_configuration))
+        # Notas con otro método (p. ej. la nota esperada de LogprobRowProcessor) no se mezclan
+        scoring = getattr(self.row_processor, "scoring", None)
+        if scoring:
+            parts.append(scoring)
+        return RowJournal.key_for(*parts)
+
+    def _row_fields(self, row, question_column, human_answer_column, machine_answer_column):
+        """
+        Extrae (pregunta, respuesta humana, respuesta de la máquina) de una fila.
+        """
+        question = row.get(question_column, "").strip()
+        human_answer = row.get(human_answer_column, "").strip()
+        machine_answer = row.get(machine_answer_column, "").strip()
+        return question, human_answer, machine_answer
+
+    def _grade_rows(self, rows, question_column, human_answer_column, machine_answer_column):
+        """
+        Genera la nota limpia de cada fila, una fila a la vez y en el orden original.
+        """
+        for row in tqdm(rows, total=self.total_rows, desc="Procesando filas"):
+            question, human_answer, machine_answer = self._row_fields(
+                row, question_column, human_answer_column, machine_answer_column
+            )
+            yield self._grade_fields(question, human_answer, machine_answer)
+
+    @staticmethod
+    def _failed_answer_grade(machine_answer: str):
+        """
+        Nota de error de una fila cuya respuesta de la máquina es un fallo del runner
+        (vacía, "No data" o un mensaje de StaticAssistantsRunner.FAILED_ANSWER_PREFIXES),
+        que no se envía al evaluador; None si la respuesta es real.
+        """
+        if machine_answer and machine_answer != "No data" and \
+                not machine_answer.startswith(StaticAssistantsRunner.FAILED_ANSWER_PREFIXES):
+            return None
+        return f"Sin respuesta que calificar ({machine_answer or 'vacía'})"
+
+    def _grade_fields(self, question: str, human_answer: str, machine_answer: str) -> str:
+        """
+        Retorna la nota limpia de una fila, usando el journal y la caché si están disponibles.
+        """
+        failed = self._failed_answer_grade(machine_answer)
+        if failed is not None:
+            return failed
+
+        prompt = self.row_processor.build_prompt(question, human_answer, machine_answer)
+        if self.journal is not None:
+            journaled = self.journal.get(self._journal_key(prompt))
+            if journaled is not None:
+                return journaled
+
+        if self.grade_cache is None:
+            grade = self._request_grade(question, human_answer, machine_answer)
+        else:
+            grade = self.grade_cache.get_or_compute(
+                prompt,
+                lambda: self._request_grade(question, human_answer, machine_answer),
+                should_store=self._is_valid_grade
+            )
+
+        self._journal_grade(prompt, grade)
+        return grade
+
+    def _journal_grade(self, prompt: str, grade: str):
+        if self.journal is not None and self._is_valid_grade(grade):
+            self.journal.put(self._journal_key(prompt), grade)
+
+    def _request_grade(self, question: str, human_answer: str, machine_answer: str) -> str:
+        """
+        Pide la nota al evaluador y la limpia.
+        """
+        # Llamada al asistente
+        raw_response = self.row_processor.get_assistant_response(
+            question=question,
+            human_answer=human_answer,
+            machine_answer=machine_answer
+        )
+
+        # Limpieza de la respuesta
+        return self.response_cleaner.clean(raw_response)
+
+    @staticmethod
+    def split_grade(clean_response: str):
+        """
+        (nota, confianza) de una respuesta limpia. LogprobRowProcessor entrega un JSON
+        {"grade": ..., "confidence": ...}; las demás respuestas son solo la nota.
+        """
+        if clean_response.startswith("{"):
+            try:
+                parsed = json.loads(clean_response)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict) and "grade" in parsed:
+                return str(parsed["grade"]), str(parsed.get("confidence", ""))
+        return clean_response, ""
+
+    def _is_valid_grade(self, grade: str) -> bool:
+        """
+        Los mensajes de error no se guardan en la caché.
+        """
+        return not grade.startswith(self.ERROR_PREFIXES)
 
 
 
@@ -1,12 +1,13 @@
 import json
 import csv
-from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION
+from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION, COLUMN_QUESTION_ID, COLUMN_REPLICAS, TEST_REPLICAS
 import re
 
 class StaticExamplesTestCreator:
-    def __init__(self, input_test_file, output_test_file):
+    def __init__(self, input_test_file, output_test_file, replicas=TEST_REPLICAS):
         self.input_test_file = input_test_file
         self.output_test_file = output_test_file
+        self.replicas = replicas
 
     def create_test(self):
         # Read the file content
@@ -23,15 +24,17 @@ class StaticExamplesTestCreator:
             print(f"Failed to parse JSON: {e}")
             return
 
+        # Each distinct Q/A pair is written once, with its id and the number of answers
+        # to sample for it (the runners ask it `replicas` times)
+        pairs = list(dict.fromkeys((entry["Q"], entry["A"]) for entry in data))
+
         # Write to the CSV file
         with open(self.output_test_file, "w", newline='', encoding="utf-8") as csv_file:
             writer = csv.writer(csv_file)
             # Write the headers
-            writer.writerow([COLUMN_QUESTION, COLUMN_HUMAN_ANSWER])
-            
-            # Write each question-answer pair 4 times
-            for entry in data:
-                for _ in range(4):  # Repeat each pair 4 times
-                    writer.writerow([entry["Q"], entry["A"]])
+            writer.writerow([COLUMN_QUESTION_ID, COLUMN_QUESTION, COLUMN_HUMAN_ANSWER, COLUMN_REPLICAS])
+
+            for question_id, (question, answer) in enumerate(pairs):
+                writer.writerow([f"q{question_id:04d}", question, answer, self.replicas])
 
         print(f"Base Test file created: {self.output_test_file}")
@@ -0,0 +1,108 @@
+# benchmark_answers.py
+#
+# Offline benchmark of the answer collection step (StaticAssistantsRunner vs
+# AsyncStaticAssistantsRunner) against the local fake Assistants API.
+#
+# Run from the repository root:
+#     python -m src.benchmarking.benchmark_answers --questions 100 --latency 0.05
+#     python -m src.benchmarking.benchmark_answers --assistants 4 --thread-mode shared
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION
+from src.benchmarking.fake_openai_server import FakeOpenAIServer
+from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.assistant_testing.async_static_assistant_tester import AsyncStaticAssistantsRunner
+
+
+def write_dataset(folder: str, num_questions: int, num_assistants: int):
+    """
+    Writes a fake test CSV and assistants ids file, returns their paths.
+    """
+    csv_path = os.path.join(folder, "test_examples.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([COLUMN_QUESTION, COLUMN_HUMAN_ANSWER])
+        for i in range(num_questions):
+            writer.writerow([f"Pregunta {i}", f"Respuesta {i}"])
+
+    ids_path = os.path.join(folder, "assistants_ids.txt")
+    with open(ids_path, "w", encoding="utf-8") as f:
+        for i in range(num_assistants):
+            f.write(f"{('Benchmark_' + str(i), 'asst_benchmark_' + str(i))}\n")
+
+    return csv_path, ids_path
+
+
+def benchmark_runner(name: str, runner, server: FakeOpenAIServer) -> dict:
+    server.call_counts.clear()
+    connections_before = server.connections_opened
+    start = time.perf_counter()
+    runner.run_all()
+    elapsed = time.perf_counter() - start
+    return {"runner": name, "seconds": elapsed, "api_calls": sum(server.call_counts.values()),
+            "connections": server.connections_opened - connections_before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark answer collection against a fake Assistants API.")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--assistants", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request.")
+    parser.add_argument("--run-duration", type=float, default=0.5, help="Seconds until a run completes.")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--thread-mode", choices=("per_assistant", "shared"), default="per_assistant",
+                        help="The fake API rejects a run on a thread that already has an active run, "
+                             "so 'shared' fails with more than one assistant.")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder, \
+            FakeOpenAIServer(latency=args.latency, run_duration=args.run_duration) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        csv_path, ids_path = write_dataset(folder, args.questions, args.assistants)
+
+        sync_runner = StaticAssistantsRunner(
+            openai_api_key="fake-key",
+            txt_file_path=ids_path,
+            csv_file_path=csv_path,
+            output_csv_path=os.path.join(folder, "sync_answers.csv"),
+            poll_interval=args.poll_interval,
+            thread_mode=args.thread_mode
+        )
+        results.append(benchmark_runner("sync", sync_runner, server))
+
+        for completion_mode in ("poll", "stream"):
+            async_runner = AsyncStaticAssistantsRunner(
+                openai_api_key="fake-key",
+                txt_file_path=ids_path,
+                csv_file_path=csv_path,
+                output_csv_path=os.path.join(folder, f"async_{completion_mode}_answers.csv"),
+                poll_interval=args.poll_interval,
+                max_concurrency=args.concurrency,
+                completion_mode=completion_mode,
+                thread_mode=args.thread_mode
+            )
+            results.append(benchmark_runner(f"async-{completion_mode}", async_runner, server))
+
+        with open(os.path.join(folder, "sync_answers.csv"), encoding="utf-8") as f_sync:
+            expected = f_sync.read()
+        same_output = True
+        for completion_mode in ("poll", "stream"):
+            with open(os.path.join(folder, f"async_{completion_mode}_answers.csv"), encoding="utf-8") as f_async:
+                same_output = same_output and f_async.read() == expected
+
+    print(f"\n=== Benchmark results ({args.assistants} assistants, thread_mode={args.thread_mode}) ===")
+    for result in results:
+        print(f"{result['runner']:>12}: {result['seconds']:8.2f} s, {result['api_calls']} API calls, "
+              f"{result['connections']} connections opened")
+    print(f"Identical output CSV: {same_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmark_grading.py
+#
+# Offline throughput benchmark of the grading step (FileManagerGrader vs
+# ConcurrentFileManagerGrader, with the Assistants and the Chat Completions
+# backends, MultiRowFileManagerGrader and BatchFileManagerGrader) against the
+# local fake OpenAI API.
+#
+# Run from the repository root:
+#     python -m src.benchmarking.benchmark_grading --rows 100 --workers 16
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION
+from src.benchmarking.fake_openai_server import FakeOpenAIServer
+from src.assistant_testing.static_grader_results import FileManagerGrader
+from src.assistant_testing.concurrent_grader_results import ConcurrentFileManagerGrader
+from src.assistant_testing.chat_row_processor import ChatRowProcessor, MultiRowChatProcessor
+from src.assistant_testing.batch_grader_results import BatchFileManagerGrader
+from src.assistant_testing.multi_row_grader_results import MultiRowFileManagerGrader
+
+ANSWER_COLUMN = "Benchmark_base"
+
+
+def fake_grade(prompt: str) -> str:
+    """
+    Deterministic grade derived from the prompt, so that the row order of the
+    output can be checked.
+    """
+    return str(sum(prompt.encode("utf-8")) % 5 + 1)
+
+
+def write_answers_csv(folder: str, num_rows: int) -> str:
+    csv_path = os.path.join(folder, "answers.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([COLUMN_QUESTION, COLUMN_HUMAN_ANSWER, ANSWER_COLUMN])
+        for i in range(num_rows):
+            writer.writerow([f"Pregunta {i}", f"Respuesta humana {i}", f"Respuesta asistente {i * 7}"])
+    return csv_path
+
+
+def benchmark_grader(name: str, grader, output_path: str, server: FakeOpenAIServer) -> dict:
+    server.call_counts.clear()
+    connections_before = server.connections_opened
+    start = time.perf_counter()
+    grader.run(
+        question_column=COLUMN_QUESTION,
+        human_answer_column=COLUMN_HUMAN_ANSWER,
+        machine_answer_column=ANSWER_COLUMN,
+        output_csv_path=output_path
+    )
+    elapsed = time.perf_counter() - start
+    with open(output_path, encoding="utf-8") as f:
+        grades = [row["grade"] for row in csv.DictReader(f)]
+    return {
+        "grader": name,
+        "seconds": elapsed,
+        "rows_per_second": len(grades) / elapsed if elapsed else 0.0,
+        "api_calls": sum(server.call_counts.values()),
+        "connections": server.connections_opened - connections_before,
+        "grades": grades,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark grading against a fake Assistants API.")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request.")
+    parser.add_argument("--run-duration", type=float, default=0.3, help="Seconds until a run completes.")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rpm", type=float, default=None, help="Requests per minute for the concurrent grader.")
+    parser.add_argument("--rows-per-request", type=int, default=10, help="Rows per request of the multi_row grader.")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder, \
+            FakeOpenAIServer(latency=args.latency, run_duration=args.run_duration, answer_fn=fake_grade) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        csv_path = write_answers_csv(folder, args.rows)
+
+        serial = FileManagerGrader("fake-key", "asst_evaluator", csv_path)
+        results.append(benchmark_grader("serial", serial, os.path.join(folder, "serial.csv"), server))
+
+        concurrent = ConcurrentFileManagerGrader(
+            "fake-key", "asst_evaluator", csv_path,
+            max_workers=args.workers,
+            requests_per_minute=args.rpm
+        )
+        results.append(benchmark_grader("concurrent", concurrent, os.path.join(folder, "concurrent.csv"), server))
+
+        evaluator_prompt_path = os.path.join(folder, "evaluator_prompt.txt")
+        with open(evaluator_prompt_path, "w", encoding="utf-8") as f:
+            f.write("Evalúa la respuesta del asistente con un número del 1 al 5.")
+        chat = ConcurrentFileManagerGrader(
+            "fake-key", None, csv_path,
+            row_processor=ChatRowProcessor("fake-key", evaluator_prompt_path, model="gpt-4o-mini"),
+            max_workers=args.workers,
+            requests_per_minute=args.rpm
+        )
+        results.append(benchmark_grader("chat", chat, os.path.join(folder, "chat.csv"), server))
+
+        multi_row = MultiRowFileManagerGrader(
+            "fake-key", csv_path,
+            row_processor=MultiRowChatProcessor("fake-key", evaluator_prompt_path, model="gpt-4o-mini",
+                                                rows_per_request=args.rows_per_request),
+            max_workers=args.workers,
+            requests_per_minute=args.rpm
+        )
+        results.append(benchmark_grader("multi_row", multi_row, os.path.join(folder, "multi_row.csv"), server))
+
+        batch = BatchFileManagerGrader(
+            "fake-key", csv_path,
+            row_processor=ChatRowProcessor("fake-key", evaluator_prompt_path, model="gpt-4o-mini"),
+            batch_dir=os.path.join(folder, "batch"),
+            poll_interval=0.2
+        )
+        results.append(benchmark_grader("batch", batch, os.path.join(folder, "batch.csv"), server))
+
+    print("\n=== Benchmark results ===")
+    for result in results:
+        print(f"{result['grader']:>10}: {result['seconds']:8.2f} s, "
+              f"{result['rows_per_second']:6.1f} rows/s, {result['api_calls']} API calls, "
+              f"{result['connections']} connections opened")
+    same_grades = all(result["grades"] == results[0]["grades"] for result in results)
+    print(f"Same grades in the same order: {same_grades}")
+
+
+if __name__ == "__main__":
+    main()
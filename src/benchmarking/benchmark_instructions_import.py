@@ -0,0 +1,105 @@
+# benchmark_instructions_import.py
+#
+# Offline benchmark of step 1's lookups: one Airtable request and one Google Doc
+# download per assistant, one after the other (as before), vs one paginated Airtable
+# listing in a local cache and a concurrent GoogleDocsBulkImporter, against local
+# stand-ins of both services. The bulk import is run twice: in the second run no
+# document changed, so only their revision ids are requested.
+#
+# Run from the repository root:
+#     python -m src.benchmarking.benchmark_instructions_import --assistants 50 --workers 8
+
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+
+from src.benchmarking.fake_google_services import FakeAirtableServer, FakeDocsService
+from src.instructions_creation.file_importer import GoogleDocReader, GoogleDocsBulkImporter
+from src.instructions_creation.intructions_id_finder import AssistantDocFinder
+
+
+def import_one_by_one(names: list, folder: str, docs: FakeDocsService) -> dict:
+    """
+    The previous behaviour: a filtered Airtable request and a Doc download per assistant.
+    """
+    url = f"{os.environ['AIRTABLE_API_URL']}/{os.environ['AIRTABLE_BASE_ID']}/{os.environ['AIRTABLE_TABLE_NAME']}"
+    texts = {}
+    for name in names:
+        response = requests.get(url, headers={"Authorization": "Bearer fake-key"},
+                                params={"filterByFormula": f"{{Name}}='{name}'"})
+        document_id = response.json()["records"][0]["fields"]["GDocs Instruction Address"]
+        texts[name] = GoogleDocReader(None, document_id, service=docs).fetch_text()
+        with open(os.path.join(folder, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(texts[name])
+    return texts
+
+
+def import_bulk(names: list, folder: str, docs: FakeDocsService, workers: int, ttl: float) -> dict:
+    finder = AssistantDocFinder(cache_path=os.path.join(folder, "airtable_records.json"), cache_ttl=ttl)
+    doc_ids = finder.get_doc_ids(names)
+    importer = GoogleDocsBulkImporter(max_workers=workers, service=docs)
+    paths = {name: os.path.join(folder, f"{name}.txt") for name in names}
+    importer.import_all({paths[name]: doc_ids[name][1] for name in names})
+    texts = {}
+    for name in names:
+        with open(paths[name], encoding="utf-8") as f:
+            texts[name] = f.read()
+    return texts
+
+
+def measure(label: str, run, airtable: FakeAirtableServer, docs: FakeDocsService) -> dict:
+    airtable.call_counts.clear()
+    docs.call_counts.clear()
+    start = time.perf_counter()
+    texts = run()
+    return {
+        "label": label,
+        "seconds": time.perf_counter() - start,
+        "airtable_requests": sum(airtable.call_counts.values()),
+        "documents": docs.call_counts["documents.get"],
+        "revision_checks": docs.call_counts["documents.get(revisionId)"],
+        "texts": texts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Airtable lookup and Google Docs import.")
+    parser.add_argument("--assistants", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request.")
+    parser.add_argument("--workers", type=int, default=8, help="Documents imported at the same time.")
+    parser.add_argument("--ttl", type=float, default=900, help="Seconds the Airtable listing is cached.")
+    args = parser.parse_args()
+
+    names = [f"Asistente {i}" for i in range(args.assistants)]
+    assistants = {name: (f"asst_{i}", f"doc_{i}") for i, name in enumerate(names)}
+    docs = FakeDocsService({f"doc_{i}": f"Instrucciones del asistente {i}\nEjemplos: ..." for i in range(len(names))},
+                           latency=args.latency)
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder, FakeAirtableServer(assistants, latency=args.latency) as airtable:
+        os.environ.update({"AIRTABLE_API_URL": airtable.base_url, "AIRTABLE_API_KEY": "fake-key",
+                           "AIRTABLE_BASE_ID": "appBenchmark", "AIRTABLE_TABLE_NAME": "Assistants"})
+        serial_folder = os.path.join(folder, "serial")
+        bulk_folder = os.path.join(folder, "bulk")
+        os.makedirs(serial_folder)
+        os.makedirs(bulk_folder)
+
+        results.append(measure("one by one", lambda: import_one_by_one(names, serial_folder, docs), airtable, docs))
+        results.append(measure("bulk", lambda: import_bulk(names, bulk_folder, docs, args.workers, args.ttl),
+                               airtable, docs))
+        results.append(measure("bulk again", lambda: import_bulk(names, bulk_folder, docs, args.workers, args.ttl),
+                               airtable, docs))
+
+    print("\n=== Benchmark results ===")
+    for result in results:
+        print(f"{result['label']:>12}: {result['seconds']:7.2f} s, {result['airtable_requests']} Airtable requests, "
+              f"{result['documents']} documents downloaded, {result['revision_checks']} revision checks")
+    same_texts = all(result["texts"] == results[0]["texts"] for result in results)
+    print(f"Same instructions for every assistant: {same_texts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# benchmark_suite.py
+#
+# Offline benchmark suite of the pipeline against the local fake OpenAI API:
+# answer collection (StaticAssistantsRunner / AsyncStaticAssistantsRunner), grading
+# (FileManagerGrader / ConcurrentFileManagerGrader) and the full AssistantImprover.run,
+# at several dataset sizes. Results are compared with a saved baseline to detect
+# regressions (exit code 1 when there is one).
+#
+# Run from the repository root:
+#     python -m src.benchmarking.benchmark_suite --sizes 20,80 --save-baseline
+#     python -m src.benchmarking.benchmark_suite --sizes 20,80
+#     python -m src.benchmarking.benchmark_suite --scenarios pipeline --latency-distribution lognormal \
+#         --failure-rate 0.02 --rate-limit-rate 0.05
+#     python -m src.benchmarking.benchmark_suite --scenarios pipeline_failed_answer --sizes 20
+
+import argparse
+import csv
+import dataclasses
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from parameters import COLUMN_HUMAN_ANSWER, COLUMN_QUESTION, TEST_REPLICAS
+from src.assistant_improver.assistant_config import AssistantConfig
+from src.assistant_improver.assistant_improver import AssistantImprover
+from src.assistant_testing.async_static_assistant_tester import AsyncStaticAssistantsRunner
+from src.assistant_testing.concurrent_grader_results import ConcurrentFileManagerGrader
+from src.assistant_testing.static_assistant_tester import StaticAssistantsRunner
+from src.assistant_testing.static_grader_results import FileManagerGrader
+from src.benchmarking.benchmark_answers import write_dataset
+from src.benchmarking.benchmark_grading import ANSWER_COLUMN, fake_grade, write_answers_csv
+from src.benchmarking.fake_openai_server import FakeOpenAIServer, FaultInjector
+from src.openai_clients.api_metrics import ApiMetrics
+from src.openai_clients.client_factory import OpenAIClientFactory
+
+PATH_BASELINE = "data/benchmarks/baseline.json"
+SCENARIOS = ("answers", "answers_async", "grading", "grading_concurrent", "pipeline", "pipeline_failed_answer")
+
+# Test question whose first answers are empty in the "pipeline_failed_answer" scenario
+FAILED_QUESTION = "Pregunta de prueba 0"
+
+
+class OfflineAssistantImprover(AssistantImprover):
+    """
+    AssistantImprover whose step 1 writes synthetic instructions and examples (import_instructions,
+    separate_text) instead of reading Airtable and Google Docs, so every other step runs unchanged and only
+    talks to the (fake) OpenAI API.
+    """
+
+    def __init__(self, config: AssistantConfig, num_examples: int, fine_tune_poll_interval: float = 0.2):
+        super().__init__(config)
+        self.num_examples = num_examples
+        self.fine_tuner.poll_interval = fine_tune_poll_interval
+
+    INSTRUCTIONS = "Eres el asistente de prueba del benchmark. Responde con cortesia."
+
+    def examples(self) -> list:
+        return [{"Q": f"Pregunta de prueba {i}", "A": f"Respuesta humana {i}"} for i in range(self.num_examples)]
+
+    def import_instructions(self):
+        with open(self.path_instructions_txt, "w", encoding="utf-8") as f:
+            f.write(f"{self.INSTRUCTIONS}\n\nEjemplos:\n{json.dumps(self.examples(), ensure_ascii=False)}")
+
+    def separate_text(self):
+        with open(self.path_instructions_no_examples, "w", encoding="utf-8") as f:
+            f.write(self.INSTRUCTIONS)
+        with open(self.path_examples_txt, "w", encoding="utf-8") as f:
+            json.dump(self.examples(), f, ensure_ascii=False)
+
+
+class FailingAnswers:
+    """
+    answer_fn of the fake server that returns an empty answer to the first `failures`
+    requests whose last user message is `question`, and `answer_fn(prompt)` otherwise.
+    """
+
+    def __init__(self, answer_fn, question: str, failures: int):
+        self.answer_fn = answer_fn
+        self.question = question
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        if prompt == self.question:
+            with self.lock:
+                if self.failures > 0:
+                    self.failures -= 1
+                    return ""
+        return self.answer_fn(prompt)
+
+
+def offline_config(folder: str) -> AssistantConfig:
+    """
+    Default configuration for a "Benchmark" assistant, with every file inside `folder`.
+    """
+    config = AssistantConfig.for_assistant("Benchmark")
+    paths = {
+        field.name: os.path.join(folder, os.path.basename(getattr(config, field.name)))
+        for field in dataclasses.fields(config)
+        if field.name.startswith("path_") and isinstance(getattr(config, field.name), str)
+    }
+    return dataclasses.replace(config, batch_poll_interval=0.2, **paths)
+
+
+# -----------------------------------------------------------------------------
+# Scenarios: each one runs a size and returns (rows processed, rows without a result)
+# -----------------------------------------------------------------------------
+def count_failed_answers(output_csv_path: str) -> int:
+    with open(output_csv_path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    prefixes = StaticAssistantsRunner.FAILED_ANSWER_PREFIXES + ("No data",)
+    return sum(
+        value.startswith(prefixes)
+        for row in rows
+        for column, value in row.items()
+        if column not in (COLUMN_QUESTION, COLUMN_HUMAN_ANSWER)
+    )
+
+
+def count_failed_grades(grades: list) -> int:
+    return sum(not grade or grade.startswith(FileManagerGrader.ERROR_PREFIXES) for grade in grades)
+
+
+def run_answers(folder: str, size: int, args, asynchronous: bool):
+    csv_path, ids_path = write_dataset(folder, size, args.assistants)
+    output_path = os.path.join(folder, "answers.csv")
+    factory = OpenAIClientFactory("fake-key", metrics=ApiMetrics())
+    runner_class = AsyncStaticAssistantsRunner if asynchronous else StaticAssistantsRunner
+    options = {"max_concurrency": args.concurrency} if asynchronous else {}
+    runner = runner_class(
+        openai_api_key="fake-key",
+        client_factory=factory,
+        txt_file_path=ids_path,
+        csv_file_path=csv_path,
+        output_csv_path=output_path,
+        poll_interval=args.poll_interval,
+        **options
+    )
+    runner.run_all()
+    return size * args.assistants, count_failed_answers(output_path), factory.metrics
+
+
+def run_grading(folder: str, size: int, args, concurrent: bool):
+    csv_path = write_answers_csv(folder, size)
+    output_path = os.path.join(folder, "grades.csv")
+    factory = OpenAIClientFactory("fake-key", metrics=ApiMetrics())
+    if concurrent:
+        grader = ConcurrentFileManagerGrader(
+            "fake-key", "asst_evaluator", csv_path,
+            client_factory=factory,
+            max_workers=args.concurrency,
+            requests_per_minute=None
+        )
+    else:
+        grader = FileManagerGrader("fake-key", "asst_evaluator", csv_path, client_factory=factory)
+    grader.run(
+        question_column=COLUMN_QUESTION,
+        human_answer_column=COLUMN_HUMAN_ANSWER,
+        machine_answer_column=ANSWER_COLUMN,
+        output_csv_path=output_path
+    )
+    with open(output_path, encoding="utf-8") as f:
+        grades = [row["grade"] for row in csv.DictReader(f)]
+    return size, count_failed_grades(grades) + size - len(grades), factory.metrics
+
+
+def run_pipeline(folder: str, size: int, args):
+    """
+    The full AssistantImprover.run with `size` test rows (each example is asked 4 times).
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    config = offline_config(folder)
+    improver = OfflineAssistantImprover(config, num_examples=math.ceil(size / 4))
+    improver.run()
+
+    rows = 4 * improver.num_examples
+    if not os.path.exists(config.path_unified_results_csv):
+        return rows, rows, improver.client_factory.metrics
+    with open(config.path_unified_results_csv, encoding="utf-8") as f:
+        unified = list(csv.DictReader(f))
+    grades = [row[column] for row in unified for column in row if column.endswith("_grade")]
+    return rows, count_failed_grades(grades) + 2 * rows - len(grades), improver.client_factory.metrics
+
+
+def run_pipeline_failed_answer(folder: str, size: int, args):
+    """
+    Regression check of the failed-answer path: the first answers to FAILED_QUESTION are
+    empty (its chat sample and the runs it falls back to), so the first AssistantImprover.run
+    must stop at the base answers and the next one must ask them again and finish.
+    Every run that does not write the unified CSV counts as `rows` failed rows.
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    config = offline_config(folder)
+    rows = 4 * math.ceil(size / 4)
+    failed_runs = 0
+    for _ in range(3):
+        improver = OfflineAssistantImprover(config, num_examples=rows // 4)
+        improver.run()
+        if os.path.exists(config.path_unified_results_csv):
+            break
+        failed_runs += 1
+    else:
+        return rows, rows * failed_runs, improver.client_factory.metrics
+
+    with open(config.path_unified_results_csv, encoding="utf-8") as f:
+        unified = list(csv.DictReader(f))
+    grades = [row[column] for row in unified for column in row if column.endswith("_grade")]
+    # One stopped run is expected: the one that got the empty answers
+    failed_rows = count_failed_grades(grades) + 2 * rows - len(grades) + rows * abs(failed_runs - 1)
+    return rows, failed_rows, improver.client_factory.metrics
+
+
+SCENARIO_FUNCTIONS = {
+    "answers": lambda folder, size, args: run_answers(folder, size, args, asynchronous=False),
+    "answers_async": lambda folder, size, args: run_answers(folder, size, args, asynchronous=True),
+    "grading": lambda folder, size, args: run_grading(folder, size, args, concurrent=False),
+    "grading_concurrent": lambda folder, size, args: run_grading(folder, size, args, concurrent=True),
+    "pipeline": run_pipeline,
+    "pipeline_failed_answer": run_pipeline_failed_answer,
+}
+
+
+def run_scenario(scenario: str, size: int, args) -> dict:
+    """
+    Runs one scenario on a fresh fake server and returns its measurements.
+    """
+    with tempfile.TemporaryDirectory() as folder, FakeOpenAIServer(
+            latency=args.latency,
+            latency_distribution=args.latency_distribution,
+            run_duration=args.run_duration,
+            answer_fn=FailingAnswers(fake_grade, FAILED_QUESTION, failures=1 + TEST_REPLICAS)
+            if scenario == "pipeline_failed_answer" else fake_grade,
+            failure_rate=args.failure_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            requests_per_minute=args.rpm,
+            fine_tune_duration=args.fine_tune_duration,
+            seed=args.seed) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        start = time.perf_counter()
+        rows, failed_rows, metrics = SCENARIO_FUNCTIONS[scenario](folder, size, args)
+        elapsed = time.perf_counter() - start
+
+    counts = server.call_counts
+    faults = sum(counts[name] for name in ("injected_429", "injected_500", "rate_limited"))
+    summary = metrics.summary()
+    return {
+        "scenario": scenario,
+        "size": size,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 3) if elapsed else 0.0,
+        "api_calls": sum(counts.values()) - faults,
+        "faults": faults,
+        "retries": summary["retries"],
+        "failed_rows": failed_rows,
+        "prompt_tokens": summary["prompt_tokens"],
+        "cached_share": summary["cached_share"],
+        "p50": summary["p50"],
+        "p95": summary["p95"],
+        "p99": summary["p99"],
+    }
+
+
+# -----------------------------------------------------------------------------
+# Baseline
+# -----------------------------------------------------------------------------
+def server_settings(args) -> dict:
+    return {
+        "latency": args.latency,
+        "latency_distribution": args.latency_distribution,
+        "run_duration": args.run_duration,
+        "failure_rate": args.failure_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "rpm": args.rpm,
+        "assistants": args.assistants,
+        "concurrency": args.concurrency,
+        "poll_interval": args.poll_interval,
+    }
+
+
+def find_regressions(results: list, baseline: dict, tolerance: float) -> list:
+    """
+    Compares each result with the baseline entry of the same scenario and size.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(f"{result['scenario']}@{result['size']}")
+        if reference is None:
+            continue
+        name = f"{result['scenario']}@{result['size']}"
+        if result["rows_per_second"] < reference["rows_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['rows_per_second']:.2f} rows/s "
+                               f"(baseline {reference['rows_per_second']:.2f})")
+        if result["p95"] > reference["p95"] * (1 + tolerance) and result["p95"] - reference["p95"] > 0.01:
+            regressions.append(f"{name}: p95 latency {result['p95']:.3f} s (baseline {reference['p95']:.3f} s)")
+        if result["api_calls"] > reference["api_calls"] * (1 + tolerance):
+            regressions.append(f"{name}: {result['api_calls']} API calls (baseline {reference['api_calls']})")
+        if result["failed_rows"] > reference["failed_rows"]:
+            regressions.append(f"{name}: {result['failed_rows']} failed rows (baseline {reference['failed_rows']})")
+    return regressions
+
+
+def print_results(results: list):
+    print("\n=== Benchmark suite results ===")
+    print(f"{'scenario':<20} {'size':>5} {'seconds':>8} {'rows/s':>8} {'calls':>6} {'faults':>6} {'retry':>5} "
+          f"{'failed':>6} {'cached':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}")
+    for r in results:
+        print(f"{r['scenario']:<20} {r['size']:>5} {r['seconds']:>8.2f} {r['rows_per_second']:>8.2f} "
+              f"{r['api_calls']:>6} {r['faults']:>6} {r['retries']:>5} {r['failed_rows']:>6} "
+              f"{r.get('cached_share', 0.0):>6.0%} {r['p50']:>7.3f} {r['p95']:>7.3f} {r['p99']:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against a fake OpenAI API.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--sizes", default="20,80", help="Comma-separated dataset sizes (test rows).")
+    parser.add_argument("--assistants", type=int, default=1, help="Assistants in the answers scenarios.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean seconds added to every request.")
+    parser.add_argument("--latency-distribution", choices=FaultInjector.DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--run-duration", type=float, default=0.3, help="Seconds until a run completes.")
+    parser.add_argument("--fine-tune-duration", type=float, default=1.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with a 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429.")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests per minute of the fake account.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", default=PATH_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative change before a regression.")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIO_FUNCTIONS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results = []
+    for scenario in scenarios:
+        for size in sizes:
+            print(f"\n##### {scenario} @ {size} rows #####")
+            results.append(run_scenario(scenario, size, args))
+    print_results(results)
+
+    settings = server_settings(args)
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != settings:
+            print(f"\nBaseline {args.baseline} was measured with other settings; not compared.")
+        else:
+            regressions = find_regressions(results, baseline.get("results", {}), args.tolerance)
+            if regressions:
+                exit_code = 1
+                print(f"\n{len(regressions)} regressions against {args.baseline}:")
+                for regression in regressions:
+                    print(f"  - {regression}")
+            else:
+                print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+    if args.save_baseline:
+        folder = os.path.dirname(args.baseline)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "settings": settings,
+                "results": {f"{r['scenario']}@{r['size']}": r for r in results},
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# fake_google_services.py
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeDocsService:
+    """
+    In-process stand-in for the Google Docs API service built by googleapiclient:
+    service.documents().get(documentId=..., fields=...).execute() returns a document
+    resource after `latency` seconds. Only "revisionId" is returned when it is the
+    requested field. `edit` changes the text of a document and its revision id.
+    """
+
+    def __init__(self, documents: dict = None, latency: float = 0.05):
+        """
+        :param documents: {document_id: text}
+        """
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.texts = {}
+        self.revisions = {}
+        self.versions = Counter()
+        self.call_counts = Counter()
+        for document_id, text in (documents or {}).items():
+            self.edit(document_id, text)
+
+    def edit(self, document_id: str, text: str):
+        with self.lock:
+            self.texts[document_id] = text
+            self.versions[document_id] += 1
+            self.revisions[document_id] = f"{document_id}-v{self.versions[document_id]}"
+
+    def documents(self):
+        return _FakeDocumentsResource(self)
+
+    def get_document(self, document_id: str, fields: str = None) -> dict:
+        time.sleep(self.latency)
+        with self.lock:
+            if document_id not in self.texts:
+                raise KeyError(f"Document '{document_id}' not found")
+            if fields == "revisionId":
+                self.call_counts["documents.get(revisionId)"] += 1
+                return {"documentId": document_id, "revisionId": self.revisions[document_id]}
+            self.call_counts["documents.get"] += 1
+            paragraphs = [
+                {"paragraph": {"elements": [{"textRun": {"content": f"{line}\n"}}]}}
+                for line in self.texts[document_id].split("\n")
+            ]
+            return {
+                "documentId": document_id,
+                "revisionId": self.revisions[document_id],
+                "body": {"content": paragraphs},
+            }
+
+
+class _FakeDocumentsResource:
+    def __init__(self, service: FakeDocsService):
+        self.service = service
+
+    def get(self, documentId: str, fields: str = None):
+        return _FakeRequest(lambda: self.service.get_document(documentId, fields))
+
+
+class _FakeRequest:
+    def __init__(self, call):
+        self.call = call
+
+    def execute(self, http=None):
+        return self.call()
+
+
+class _FakeAirtableHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if len(parts) != 3 or parts[0] != "v0":
+            return self._send_json({"error": "NOT_FOUND"}, status=404)
+
+        query = parse_qs(url.query)
+        with server.lock:
+            server.call_counts["records.list"] += 1
+        records = server.records
+        formula = query.get("filterByFormula", [None])[0]
+        if formula:
+            # Only the {Name}='...' formula used by the pipeline
+            name = formula.split("=", 1)[1].strip("'")
+            records = [record for record in records if record["fields"].get("Name") == name]
+
+        page_size = min(100, int(query.get("pageSize", ["100"])[0]))
+        start = int(query.get("offset", ["0"])[0])
+        page = {"records": records[start:start + page_size]}
+        if start + page_size < len(records):
+            page["offset"] = str(start + page_size)
+        self._send_json(page)
+
+
+class FakeAirtableServer:
+    """
+    Local stand-in for the Airtable records API (list, with pagination and the
+    {Name}='...' filter), so the instructions lookup can be benchmarked offline.
+
+    Usage:
+        with FakeAirtableServer({"Asistente": ("asst_1", "doc_1")}) as server:
+            os.environ["AIRTABLE_API_URL"] = server.base_url
+            ...
+            print(server.call_counts)
+    """
+
+    def __init__(self, assistants: dict, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05):
+        """
+        :param assistants: {assistant name: (assistant id, Google Doc id)}
+        :param latency: seconds added to every request
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _FakeAirtableHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.lock = threading.Lock()
+        self.httpd.call_counts = Counter()
+        self.httpd.records = [
+            {"id": f"rec{index}", "fields": {"Name": name, "Assistant ID": assistant_id,
+                                             "GDocs Instruction Address": document_id}}
+            for index, (name, (assistant_id, document_id)) in enumerate(assistants.items())
+        ]
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v0"
+
+    @property
+    def call_counts(self) -> Counter:
+        return self.httpd.call_counts
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
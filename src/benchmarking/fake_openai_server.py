@@ -0,0 +1,879 @@
+# fake_openai_server.py
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import default as default_email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeAssistantsState:
+    """
+    In-memory store that mimics the pieces of the OpenAI API used by the pipeline:
+    assistants, threads, messages, runs, chat completions, files, batches and
+    fine-tuning jobs. Runs (and batches) complete `run_duration` seconds after
+    creation and answer with a canned text, or with `answer_fn(last_user_message)`
+    if given. Fine-tuning jobs succeed `fine_tune_duration` seconds after creation.
+    """
+
+    def __init__(self, run_duration: float = 0.5, answer_text: str = "Respuesta de prueba", answer_fn=None,
+                 fine_tune_duration: float = 1.0):
+        self.run_duration = run_duration
+        self.fine_tune_duration = fine_tune_duration
+        self.answer_text = answer_text
+        self.answer_fn = answer_fn
+
+        self.lock = threading.Lock()
+        self.threads = {}    # {thread_id: thread_obj}
+        self.messages = {}   # {thread_id: [message_obj, ...]} oldest first
+        self.runs = {}       # {run_id: run_obj}
+        self.assistants = {} # {assistant_id: assistant_obj}
+        self.files = {}      # {file_id: (file_obj, content_bytes)}
+        self.batches = {}    # {batch_id: batch_obj}
+        self.fine_tuning_jobs = {}  # {job_id: job_obj}
+        self.prompt_prefixes = set()  # (model, prompt_cache_key, system prefix) of the chat requests seen
+        self.call_counts = Counter()
+        self.connections_opened = 0  # TCP connections accepted (keep-alive reuse keeps it low)
+
+    @staticmethod
+    def new_id(prefix: str) -> str:
+        return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+    def create_thread(self, body: dict) -> dict:
+        thread_id = self.new_id("thread")
+        thread = {
+            "id": thread_id,
+            "object": "thread",
+            "created_at": int(time.time()),
+            "metadata": body.get("metadata") or {},
+            "tool_resources": None,
+        }
+        with self.lock:
+            self.threads[thread_id] = thread
+            self.messages[thread_id] = []
+        for message in body.get("messages") or []:
+            self.create_message(thread_id, message)
+        return thread
+
+    def create_message(self, thread_id: str, body: dict, run_id: str = None, assistant_id: str = None) -> dict:
+        content = body.get("content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        message = {
+            "id": self.new_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": body.get("role", "user"),
+            "content": [{"type": "text", "text": {"value": content, "annotations": []}}],
+            "assistant_id": assistant_id,
+            "run_id": run_id,
+            "attachments": [],
+            "metadata": {},
+            "status": "completed",
+        }
+        with self.lock:
+            if thread_id not in self.messages:
+                return None
+            self.messages[thread_id].append(message)
+        return message
+
+    def list_messages(self, thread_id: str, query: dict) -> dict:
+        with self.lock:
+            if thread_id not in self.messages:
+                return None
+            data = list(self.messages[thread_id])
+        run_id = query.get("run_id")
+        if run_id:
+            data = [m for m in data if m["run_id"] == run_id]
+        if query.get("order", "desc") == "desc":
+            data.reverse()
+        limit = int(query.get("limit", 20))
+        page = data[:limit]
+        return {
+            "object": "list",
+            "data": page,
+            "first_id": page[0]["id"] if page else None,
+            "last_id": page[-1]["id"] if page else None,
+            "has_more": len(data) > limit,
+        }
+
+    def create_run(self, thread_id: str, body: dict) -> dict:
+        with self.lock:
+            if thread_id not in self.threads:
+                return None
+        run = {
+            "id": self.new_id("run"),
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "assistant_id": body.get("assistant_id"),
+            "status": "queued",
+            "model": body.get("model") or "gpt-4o-mini",
+            "instructions": "",
+            "tools": [],
+            "metadata": {},
+            "parallel_tool_calls": True,
+            "usage": None,
+            "_ready_at": time.monotonic() + self.run_duration,
+        }
+        with self.lock:
+            self.runs[run["id"]] = run
+        return self._public_run(run)
+
+    def create_thread_and_run(self, body: dict) -> dict:
+        """
+        threads.create_and_run: a new thread with the given messages and a run on it.
+        """
+        thread = self.create_thread(body.get("thread") or {})
+        return self.create_run(thread["id"], body)
+
+    def has_active_run(self, thread_id: str) -> bool:
+        """
+        Like the real API, a thread accepts only one active run at a time.
+        """
+        with self.lock:
+            runs = [run for run in self.runs.values() if run["thread_id"] == thread_id]
+        for run in runs:
+            self._advance(run)
+        return any(run["status"] in ("queued", "in_progress") for run in runs)
+
+    def retrieve_run(self, thread_id: str, run_id: str) -> dict:
+        with self.lock:
+            run = self.runs.get(run_id)
+        if run is None or run["thread_id"] != thread_id:
+            return None
+        self._advance(run)
+        return self._public_run(run)
+
+    def _advance(self, run: dict):
+        """
+        Moves a run to "completed" once its duration has elapsed and writes the
+        assistant answer to the thread (only once).
+        """
+        with self.lock:
+            if run["status"] == "completed":
+                return
+            if time.monotonic() < run["_ready_at"]:
+                run["status"] = "in_progress"
+                return
+        self.complete_run(run)
+
+    def complete_run(self, run: dict) -> dict:
+        """
+        Marks the run as completed and returns the assistant message it produced.
+        """
+        with self.lock:
+            if run["status"] == "completed":
+                return run.get("_message")
+            run["status"] = "completed"
+            run["completed_at"] = int(time.time())
+            run["usage"] = {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110}
+        message = self.create_message(
+            run["thread_id"],
+            {"role": "assistant", "content": self.answer_for(run["thread_id"])},
+            run_id=run["id"],
+            assistant_id=run["assistant_id"],
+        )
+        run["_message"] = message
+        return message
+
+    def answer_for(self, thread_id: str) -> str:
+        if self.answer_fn is None:
+            return self.answer_text
+        with self.lock:
+            user_messages = [m for m in self.messages.get(thread_id, []) if m["role"] == "user"]
+        prompt = user_messages[-1]["content"][0]["text"]["value"] if user_messages else ""
+        return self.answer_fn(prompt)
+
+    def stream_run_events(self, thread_id: str, body: dict):
+        """
+        Yields the (event, data) pairs of a streamed run, waiting `run_duration`
+        between the run start and its completion. Without `thread_id`, a new thread
+        is created from body["thread"] (threads.create_and_run with stream=True).
+        """
+        if thread_id is None:
+            run = self.create_thread_and_run(body)
+        else:
+            run = self.create_run(thread_id, body)
+        if run is None:
+            return
+        yield "thread.run.created", run
+        yield "thread.run.in_progress", dict(run, status="in_progress")
+        time.sleep(self.run_duration)
+        message = self.complete_run(self.runs[run["id"]])
+        yield "thread.message.created", message
+        yield "thread.message.completed", message
+        yield "thread.run.completed", self._public_run(self.runs[run["id"]])
+
+    def create_assistant(self, body: dict) -> dict:
+        assistant = {
+            "id": self.new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": None,
+            "description": None,
+            "instructions": None,
+            "model": "gpt-4o-mini",
+            "tools": [],
+            "metadata": {},
+            "temperature": 1.0,
+            "top_p": 1.0,
+        }
+        assistant.update({k: v for k, v in body.items() if k in assistant and k not in ("id", "object")})
+        with self.lock:
+            self.assistants[assistant["id"]] = assistant
+        return assistant
+
+    def update_assistant(self, assistant_id: str, body: dict) -> dict:
+        assistant = self.retrieve_assistant(assistant_id)
+        with self.lock:
+            assistant.update({k: v for k, v in body.items() if k in assistant and k not in ("id", "object")})
+        return assistant
+
+    def retrieve_assistant(self, assistant_id: str) -> dict:
+        """
+        Returns the stored assistant, or a default one for ids that were never created.
+        """
+        with self.lock:
+            if assistant_id not in self.assistants:
+                self.assistants[assistant_id] = {
+                    "id": assistant_id,
+                    "object": "assistant",
+                    "created_at": int(time.time()),
+                    "name": assistant_id,
+                    "description": None,
+                    "instructions": "Eres un asistente de prueba.",
+                    "model": "gpt-4o-mini",
+                    "tools": [],
+                    "metadata": {},
+                    "temperature": 0.5,
+                    "top_p": 1.0,
+                }
+            return self.assistants[assistant_id]
+
+    def create_chat_completion(self, body: dict, simulate_duration: bool = True) -> dict:
+        """
+        Answers a chat completion after `run_duration` seconds, with the same answer
+        a run would give for the last user message (`n` times when "n" is given).
+        """
+        if simulate_duration:
+            time.sleep(self.run_duration)
+        user_messages = [m for m in body.get("messages", []) if m.get("role") == "user"]
+        prompt = user_messages[-1].get("content", "") if user_messages else ""
+        if (body.get("response_format") or {}).get("type") == "json_schema":
+            answer = self._grouped_grades(prompt)
+        else:
+            answer = self.answer_fn(prompt) if self.answer_fn else self.answer_text
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", []))
+        cached_tokens = self._cached_prefix_tokens(body)
+        choices = max(1, int(body.get("n") or 1))
+        return {
+            "id": self.new_id("chatcmpl"),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": index,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+                "logprobs": self._grade_logprobs(answer, body.get("top_logprobs")) if body.get("logprobs") else None,
+            } for index in range(choices)],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": choices,
+                "total_tokens": prompt_tokens + choices,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    def _cached_prefix_tokens(self, body: dict) -> int:
+        """
+        Mimics the provider's prompt cache: the leading system messages of a request are
+        served from the cache when an earlier request had the same model, prompt_cache_key
+        and prefix, byte for byte (from 1024 tokens, in steps of 128 tokens).
+        """
+        prefix = []
+        for message in body.get("messages", []):
+            if message.get("role") != "system":
+                break
+            prefix.append(str(message.get("content", "")))
+        prefix_tokens = len("".join(prefix)) // 4
+        if prefix_tokens < 1024:
+            return 0
+        key = (body.get("model"), body.get("prompt_cache_key"), "\0".join(prefix))
+        with self.lock:
+            hit = key in self.prompt_prefixes
+            self.prompt_prefixes.add(key)
+        return prefix_tokens // 128 * 128 if hit else 0
+
+    def _grouped_grades(self, prompt: str) -> str:
+        """
+        Answer of a structured grading request with numbered rows ("### Fila N"):
+        {"notas": [{"fila": N, "nota": K}, ...]}, with each row graded as if it had
+        been sent alone. Rows whose answer is not a grade are left out.
+        """
+        parts = re.split(r"### Fila (\d+)\n", prompt)
+        rows = list(zip(parts[1::2], parts[2::2]))
+        grades = []
+        for index, (position, row) in enumerate(rows):
+            if index < len(rows) - 1:
+                row = row[:-1]  # the newline that joins the rows
+            answer = self.answer_fn(row) if self.answer_fn else self.answer_text
+            if answer.strip() in ("1", "2", "3", "4", "5"):
+                grades.append({"fila": int(position), "nota": int(answer)})
+        return json.dumps({"notas": grades})
+
+    @staticmethod
+    def _grade_logprobs(answer: str, top_logprobs) -> dict:
+        """
+        Logprobs of a one-token answer, with the grade tokens "1".."5" as alternatives
+        when the answer is a grade: half of the probability on the answer, the rest
+        spread over the others, decreasing with the distance to it.
+        """
+        token = answer[:1]
+        if not token or token not in "12345":
+            candidates = [(token, 0.0)]
+        else:
+            weights = {str(k): 0.5 ** abs(k - int(token)) for k in range(1, 6)}
+            total = sum(weights.values())
+            candidates = sorted(((k, math.log(w / total)) for k, w in weights.items()), key=lambda c: -c[1])
+        candidates = candidates[:max(1, int(top_logprobs or 1))]
+        return {"content": [{
+            "token": token,
+            "logprob": candidates[0][1],
+            "bytes": list(token.encode("utf-8")),
+            "top_logprobs": [
+                {"token": k, "logprob": logprob, "bytes": list(k.encode("utf-8"))} for k, logprob in candidates
+            ],
+        }]}
+
+    def create_file(self, filename: str, purpose: str, content: bytes) -> dict:
+        file_obj = {
+            "id": self.new_id("file"),
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self.lock:
+            self.files[file_obj["id"]] = (file_obj, content)
+        return file_obj
+
+    def file_content(self, file_id: str) -> bytes:
+        with self.lock:
+            entry = self.files.get(file_id)
+        return entry[1] if entry else None
+
+    def create_fine_tuning_job(self, body: dict) -> dict:
+        if self.file_content(body.get("training_file")) is None:
+            return None
+        job = {
+            "id": self.new_id("ftjob"),
+            "object": "fine_tuning.job",
+            "created_at": int(time.time()),
+            "model": body.get("model"),
+            "training_file": body.get("training_file"),
+            "validation_file": None,
+            "status": "validating_files",
+            "fine_tuned_model": None,
+            "finished_at": None,
+            "hyperparameters": {"n_epochs": "auto"},
+            "organization_id": "org_fake",
+            "result_files": [],
+            "seed": 0,
+            "trained_tokens": None,
+            "error": None,
+            "_suffix": body.get("suffix"),
+            "_ready_at": time.monotonic() + self.fine_tune_duration,
+        }
+        with self.lock:
+            self.fine_tuning_jobs[job["id"]] = job
+        return self._public_run(job)
+
+    def retrieve_fine_tuning_job(self, job_id: str) -> dict:
+        with self.lock:
+            job = self.fine_tuning_jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] != "succeeded":
+                if time.monotonic() < job["_ready_at"]:
+                    job["status"] = "running"
+                else:
+                    job["status"] = "succeeded"
+                    job["finished_at"] = int(time.time())
+                    job["fine_tuned_model"] = f"ft:{job['model']}:{job['_suffix'] or 'fake'}:{job['id'][-8:]}"
+                    job["trained_tokens"] = len(self.files[job["training_file"]][1]) // 4
+            return self._public_run(job)
+
+    def create_batch(self, body: dict) -> dict:
+        if self.file_content(body.get("input_file_id")) is None:
+            return None
+        batch = {
+            "id": self.new_id("batch"),
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body.get("input_file_id"),
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "metadata": body.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        threading.Thread(target=self._process_batch, args=(batch,), daemon=True).start()
+        return dict(batch)
+
+    def retrieve_batch(self, batch_id: str) -> dict:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            return dict(batch) if batch else None
+
+    def _process_batch(self, batch: dict):
+        """
+        Answers every request of the input file as a chat completion and writes the output file.
+        """
+        lines = [json.loads(line) for line in self.file_content(batch["input_file_id"]).splitlines() if line.strip()]
+        with self.lock:
+            batch["status"] = "in_progress"
+            batch["request_counts"] = {"total": len(lines), "completed": 0, "failed": 0}
+
+        time.sleep(self.run_duration)
+        output = []
+        for line in lines:
+            completion = self.create_chat_completion(line.get("body", {}), simulate_duration=False)
+            output.append(json.dumps({
+                "id": self.new_id("batch_req"),
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "request_id": self.new_id("req"), "body": completion},
+                "error": None,
+            }, ensure_ascii=False))
+        output_file = self.create_file("batch_output.jsonl", "batch_output", ("\n".join(output) + "\n").encode("utf-8"))
+
+        with self.lock:
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+            batch["output_file_id"] = output_file["id"]
+            batch["request_counts"] = {"total": len(lines), "completed": len(lines), "failed": 0}
+
+    @staticmethod
+    def _public_run(run: dict) -> dict:
+        return {k: v for k, v in run.items() if not k.startswith("_")}
+
+
+class FaultInjector:
+    """
+    Random behaviour of the fake server, reproducible through `seed`:
+      - latency of every request, drawn from `latency_distribution` with mean `latency`:
+          "fixed", "uniform" (0 to 2x the mean), "exponential" or "lognormal" (sigma 1,
+          i.e. a long tail like the real API),
+      - `failure_rate`: fraction of requests answered with a 500,
+      - `rate_limit_rate`: fraction of requests answered with a 429 and retry-after.
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, latency: float = 0.05, latency_distribution: str = "fixed", failure_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 0.5, seed: int = None):
+        if latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency_distribution}' "
+                             f"(expected one of {', '.join(self.DISTRIBUTIONS)})")
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        with self.lock:
+            if self.latency_distribution == "uniform":
+                return self.random.uniform(0, 2 * self.latency)
+            if self.latency_distribution == "exponential":
+                return self.random.expovariate(1 / self.latency)
+            if self.latency_distribution == "lognormal":
+                sigma = 1.0
+                return self.random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+        return self.latency
+
+    def sample_fault(self):
+        """
+        429, 500 or None for a new request.
+        """
+        if not self.failure_rate and not self.rate_limit_rate:
+            return None
+        with self.lock:
+            draw = self.random.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.failure_rate:
+            return 500
+        return None
+
+
+class FakeRateLimit:
+    """
+    Requests-per-minute limit of the fake account: a token bucket that answers every
+    request with the x-ratelimit-* headers of the real API, and rejects the requests
+    over the limit with a 429 and a retry-after header.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.limit = requests_per_minute
+        self.rate = requests_per_minute / 60.0
+        self.level = float(requests_per_minute)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def check(self):
+        """
+        Returns (allowed, headers) for a new request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.limit, self.level + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            allowed = self.level >= 1
+            if allowed:
+                self.level -= 1
+            else:
+                self.rejected += 1
+            headers = {
+                "x-ratelimit-limit-requests": str(int(self.limit)),
+                "x-ratelimit-remaining-requests": str(int(self.level)),
+                "x-ratelimit-reset-requests": f"{(self.limit - self.level) / self.rate:.3f}s",
+            }
+            if not allowed:
+                headers["retry-after"] = f"{(1 - self.level) / self.rate:.3f}"
+        return allowed, headers
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Routes HTTP requests to the FakeAssistantsState attached to the server.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections_opened += 1
+
+    @property
+    def state(self) -> FakeAssistantsState:
+        return self.server.state
+
+    def _read_body(self) -> dict:
+        """
+        Parses a JSON body, or a multipart/form-data body into {field: value}
+        (file fields become {"filename": ..., "content": bytes}).
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=default_email_policy).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + raw
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                payload = part.get_payload(decode=True)
+                if part.get_filename():
+                    fields[name] = {"filename": part.get_filename(), "content": payload}
+                else:
+                    fields[name] = payload.decode("utf-8")
+            return fields
+
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return {}
+
+    def _rate_limited(self) -> bool:
+        """
+        Applies the server rate limit (if any); sends the 429 and returns True when
+        the request is over the limit.
+        """
+        self.rate_limit_headers = {}
+        if self.server.rate_limit is None:
+            return False
+        allowed, self.rate_limit_headers = self.server.rate_limit.check()
+        if allowed:
+            return False
+        self.state.call_counts["rate_limited"] += 1
+        self._send_json({"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                   "code": "rate_limit_exceeded"}}, status=429)
+        return True
+
+    def end_headers(self):
+        for name, value in getattr(self, "rate_limit_headers", {}).items():
+            self.send_header(name, value)
+        super().end_headers()
+
+    def _send_bytes(self, data: bytes, content_type: str = "application/octet-stream"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event_stream(self, events):
+        """
+        Writes server-sent events and closes the connection once the stream is done.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for event, data in events:
+            self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _not_found(self):
+        self._send_json({"error": {"message": "Not found", "type": "invalid_request_error"}}, status=404)
+
+    def _active_run_error(self, thread_id: str):
+        self._send_json({"error": {"message": f"Thread {thread_id} already has an active run.",
+                                   "type": "invalid_request_error"}}, status=400)
+
+    def _simulate_latency(self):
+        latency = self.server.faults.sample_latency()
+        if latency > 0:
+            time.sleep(latency)
+
+    def _inject_fault(self) -> bool:
+        """
+        Randomly answers with an injected 429 or 500 (see FaultInjector); returns True if it did.
+        """
+        fault = self.server.faults.sample_fault()
+        if fault is None:
+            return False
+        self.state.call_counts[f"injected_{fault}"] += 1
+        self.rate_limit_headers = {"retry-after": f"{self.server.faults.retry_after:.3f}"} if fault == 429 else {}
+        message = "Rate limit reached for requests" if fault == 429 else "The server had an error processing your request."
+        self._send_json({"error": {"message": message, "type": "requests" if fault == 429 else "server_error"}},
+                        status=fault)
+        return True
+
+    def do_POST(self):
+        self._simulate_latency()
+        parts = urlparse(self.path).path.strip("/").split("/")
+        body = self._read_body()
+        if self._rate_limited() or self._inject_fault():
+            return
+
+        # /v1/chat/completions
+        if parts == ["v1", "chat", "completions"]:
+            self.state.call_counts["chat.completions.create"] += 1
+            return self._send_json(self.state.create_chat_completion(body))
+
+        # /v1/assistants
+        if parts == ["v1", "assistants"]:
+            self.state.call_counts["assistants.create"] += 1
+            return self._send_json(self.state.create_assistant(body))
+
+        # /v1/assistants/{assistant_id}
+        if len(parts) == 3 and parts[:2] == ["v1", "assistants"]:
+            self.state.call_counts["assistants.update"] += 1
+            return self._send_json(self.state.update_assistant(parts[2], body))
+
+        # /v1/files
+        if parts == ["v1", "files"]:
+            self.state.call_counts["files.create"] += 1
+            upload = body.get("file") or {}
+            file_obj = self.state.create_file(upload.get("filename", "upload"), body.get("purpose", ""),
+                                              upload.get("content", b""))
+            return self._send_json(file_obj)
+
+        # /v1/fine_tuning/jobs
+        if parts == ["v1", "fine_tuning", "jobs"]:
+            self.state.call_counts["fine_tuning.jobs.create"] += 1
+            job = self.state.create_fine_tuning_job(body)
+            return self._send_json(job) if job else self._not_found()
+
+        # /v1/batches
+        if parts == ["v1", "batches"]:
+            self.state.call_counts["batches.create"] += 1
+            batch = self.state.create_batch(body)
+            return self._send_json(batch) if batch else self._not_found()
+
+        # /v1/threads
+        if parts == ["v1", "threads"]:
+            self.state.call_counts["threads.create"] += 1
+            return self._send_json(self.state.create_thread(body))
+
+        # /v1/threads/runs
+        if parts == ["v1", "threads", "runs"]:
+            if body.get("stream"):
+                self.state.call_counts["threads.create_and_run_stream"] += 1
+                return self._send_event_stream(self.state.stream_run_events(None, body))
+            self.state.call_counts["threads.create_and_run"] += 1
+            return self._send_json(self.state.create_thread_and_run(body))
+
+        # /v1/threads/{thread_id}/messages
+        if len(parts) == 4 and parts[:2] == ["v1", "threads"] and parts[3] == "messages":
+            self.state.call_counts["messages.create"] += 1
+            message = self.state.create_message(parts[2], body)
+            return self._send_json(message) if message else self._not_found()
+
+        # /v1/threads/{thread_id}/runs
+        if len(parts) == 4 and parts[:2] == ["v1", "threads"] and parts[3] == "runs":
+            if self.state.has_active_run(parts[2]):
+                self.state.call_counts["runs.rejected"] += 1
+                return self._active_run_error(parts[2])
+            if body.get("stream"):
+                self.state.call_counts["runs.stream"] += 1
+                return self._send_event_stream(self.state.stream_run_events(parts[2], body))
+            self.state.call_counts["runs.create"] += 1
+            run = self.state.create_run(parts[2], body)
+            return self._send_json(run) if run else self._not_found()
+
+        self._not_found()
+
+    def do_GET(self):
+        self._simulate_latency()
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        if self._rate_limited() or self._inject_fault():
+            return
+
+        # /v1/assistants/{assistant_id}
+        if len(parts) == 3 and parts[:2] == ["v1", "assistants"]:
+            self.state.call_counts["assistants.retrieve"] += 1
+            return self._send_json(self.state.retrieve_assistant(parts[2]))
+
+        # /v1/files/{file_id}/content
+        if len(parts) == 4 and parts[:2] == ["v1", "files"] and parts[3] == "content":
+            self.state.call_counts["files.content"] += 1
+            content = self.state.file_content(parts[2])
+            return self._send_bytes(content) if content is not None else self._not_found()
+
+        # /v1/fine_tuning/jobs/{job_id}
+        if len(parts) == 4 and parts[:3] == ["v1", "fine_tuning", "jobs"]:
+            self.state.call_counts["fine_tuning.jobs.retrieve"] += 1
+            job = self.state.retrieve_fine_tuning_job(parts[3])
+            return self._send_json(job) if job else self._not_found()
+
+        # /v1/batches/{batch_id}
+        if len(parts) == 3 and parts[:2] == ["v1", "batches"]:
+            self.state.call_counts["batches.retrieve"] += 1
+            batch = self.state.retrieve_batch(parts[2])
+            return self._send_json(batch) if batch else self._not_found()
+
+        # /v1/threads/{thread_id}/messages
+        if len(parts) == 4 and parts[:2] == ["v1", "threads"] and parts[3] == "messages":
+            self.state.call_counts["messages.list"] += 1
+            page = self.state.list_messages(parts[2], query)
+            return self._send_json(page) if page else self._not_found()
+
+        # /v1/threads/{thread_id}/runs/{run_id}
+        if len(parts) == 5 and parts[:2] == ["v1", "threads"] and parts[3] == "runs":
+            self.state.call_counts["runs.retrieve"] += 1
+            run = self.state.retrieve_run(parts[2], parts[4])
+            return self._send_json(run) if run else self._not_found()
+
+        self._not_found()
+
+
+class FakeOpenAIServer:
+    """
+    Local stand-in for the OpenAI API so the pipeline can be benchmarked offline.
+
+    Usage:
+        with FakeOpenAIServer(latency=0.05, run_duration=0.5) as server:
+            os.environ["OPENAI_BASE_URL"] = server.base_url
+            ...
+            print(server.call_counts)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05, run_duration: float = 0.5,
+                 answer_text: str = "Respuesta de prueba", answer_fn=None, requests_per_minute: float = None,
+                 latency_distribution: str = "fixed", failure_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 fine_tune_duration: float = 1.0, seed: int = None):
+        """
+        :param latency: mean seconds added to every request
+        :param requests_per_minute: rate limit of the fake account (None = no limit)
+        :param latency_distribution, failure_rate, rate_limit_rate, seed: see FaultInjector
+        :param fine_tune_duration: seconds until a fine-tuning job succeeds
+        """
+        self.state = FakeAssistantsState(run_duration=run_duration, answer_text=answer_text, answer_fn=answer_fn,
+                                         fine_tune_duration=fine_tune_duration)
+        self.httpd = ThreadingHTTPServer((host, port), _FakeOpenAIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.faults = FaultInjector(latency, latency_distribution, failure_rate, rate_limit_rate, seed=seed)
+        self.httpd.rate_limit = FakeRateLimit(requests_per_minute) if requests_per_minute else None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def call_counts(self) -> Counter:
+        return self.state.call_counts
+
+    @property
+    def connections_opened(self) -> int:
+        return self.state.connections_opened
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = FakeOpenAIServer(port=8765).start()
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -2,33 +2,61 @@
 from googleapiclient.discovery import build
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import google_auth_httplib2
+import httplib2
 import os
 import sys
+import threading
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+SCOPES = ['https://www.googleapis.com/auth/documents.readonly']
+
+
+def build_docs_service(service_account_file):
+    """
+    Google Docs API service and its credentials, built from a service account file.
+    """
+    credentials = Credentials.from_service_account_file(
+        service_account_file, scopes=SCOPES
+    )
+    return build('docs', 'v1', credentials=credentials), credentials
+
+
+def document_text(document: dict) -> str:
+    """
+    Text of a Google Docs document resource (the text runs of its paragraphs).
+    """
+    return ''.join(
+        element['textRun']['content']
+        for content in document.get('body', {}).get('content', [])
+        if 'paragraph' in content
+        for element in content['paragraph']['elements']
+        if 'textRun' in element
+    )
+
+
 class GoogleDocReader:
-    def __init__(self, service_account_file, document_id):
+    def __init__(self, service_account_file, document_id, service=None):
         """
         Initialize the GoogleDocReader with a service account file and document ID.
         :param service_account_file: Path to the service account JSON file.
         :param document_id: ID of the Google Document to fetch.
+        :param service: optional Docs API service to reuse (default: built from the service account).
         """
         self.service_account_file = service_account_file
         self.document_id = document_id
         self.credentials = None
-        self.service = None
-        self._initialize_service()
+        self.service = service
+        if self.service is None:
+            self._initialize_service()
 
     def _initialize_service(self):
         """
         Initialize the Google Docs API service using the service account credentials.
         """
-        SCOPES = ['https://www.googleapis.com/auth/documents.readonly']
-        self.credentials = Credentials.from_service_account_file(
-            self.service_account_file, scopes=SCOPES
-        )
-        self.service = build('docs', 'v1', credentials=self.credentials)
+        self.service, self.credentials = build_docs_service(self.service_account_file)
 
     def fetch_text(self):
         """
@@ -36,24 +64,107 @@ class GoogleDocReader:
         :return: A string containing the document's text.
         """
         document = self.service.documents().get(documentId=self.document_id).execute()
-        text = ''.join(
-            element['textRun']['content']
-            for content in document.get('body', {}).get('content', [])
-            if 'paragraph' in content
-            for element in content['paragraph']['elements']
-            if 'textRun' in element
-        )
-        return text
+        return document_text(document)
+
+
+class GoogleDocsBulkImporter:
+    """
+    Imports several Google Docs into local text files, concurrently.
+
+    The Docs service and the credentials are built once and shared by every document;
+    each worker thread gets its own authorized HTTP connection, since httplib2 is not
+    thread-safe. Next to every imported file the document's revision id is saved
+    ("<file>.revision"): a document whose revision did not change since its last import
+    is not downloaded again (only its revision id is requested).
+    """
+
+    def __init__(self, service_account_path: str = None, max_workers: int = 8, service=None):
+        """
+        :param service_account_path: service account JSON file (not needed if `service` is given)
+        :param max_workers: documents fetched at the same time
+        :param service: optional Docs API service (e.g. a local stand-in); requests on it are
+                        executed as they are, without per-thread connections
+        """
+        self.max_workers = max(1, max_workers)
+        self.credentials = None
+        self.service = service
+        if self.service is None:
+            self.service, self.credentials = build_docs_service(service_account_path)
+        self.local = threading.local()
+
+    def _execute(self, request):
+        if self.credentials is None:
+            return request.execute()
+        if not hasattr(self.local, "http"):
+            self.local.http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return request.execute(http=self.local.http)
+
+    @staticmethod
+    def revision_path(output_path: str) -> str:
+        return f"{output_path}.revision"
+
+    def import_all(self, documents: dict) -> dict:
+        """
+        Imports {output_path: document_id}. Returns {output_path: "imported", "unchanged"
+        or "error: ..."}; a document that fails does not stop the others.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                output_path: executor.submit(self.import_document, document_id, output_path)
+                for output_path, document_id in documents.items()
+            }
+            for output_path, future in futures.items():
+                try:
+                    results[output_path] = future.result()
+                except Exception as e:
+                    results[output_path] = f"error: {type(e).__name__}: {e}"
+                    print(f"Could not import document {documents[output_path]}: {e}")
+
+        imported = sum(status == "imported" for status in results.values())
+        unchanged = sum(status == "unchanged" for status in results.values())
+        print(f"Google Docs: {imported} imported, {unchanged} unchanged, "
+              f"{len(results) - imported - unchanged} failed.")
+        return results
+
+    def import_document(self, document_id: str, output_path: str) -> str:
+        documents = self.service.documents()
+        revision_path = self.revision_path(output_path)
+        if os.path.exists(output_path) and os.path.exists(revision_path):
+            with open(revision_path, "r", encoding="utf-8") as f:
+                known_revision = f.read().strip()
+            current = self._execute(documents.get(documentId=document_id, fields="revisionId"))
+            if known_revision and current.get("revisionId") == known_revision:
+                return "unchanged"
+
+        document = self._execute(documents.get(documentId=document_id))
+        folder = os.path.dirname(output_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(document_text(document))
+        with open(revision_path, "w", encoding="utf-8") as f:
+            f.write(document.get("revisionId", ""))
+        return "imported"
+
 
 class DocumentImporter:
-    def __init__(self, service_account_path: str, document_id: str, instructions_path: str):
+    def __init__(self, service_account_path: str, document_id: str, instructions_path: str, service=None):
         self.service_account_path = service_account_path
         self.document_id = document_id
         self.instructions_path = instructions_path
+        self.service = service
 
     def import_text(self):
-        reader = GoogleDocReader(self.service_account_path, self.document_id)
-        doc_text = reader.fetch_text()
-        with open(self.instructions_path, "w", encoding="utf-8") as f:
-            f.write(doc_text)
-        print(f"Document text saved to {self.instructions_path}")
\ No newline at end of file
+        """
+        Saves the document's text in instructions_path, unless the document did not
+        change since the last import (same revision id).
+        """
+        importer = GoogleDocsBulkImporter(self.service_account_path, max_workers=1, service=self.service)
+        status = importer.import_all({self.instructions_path: self.document_id})[self.instructions_path]
+        if status.startswith("error"):
+            raise RuntimeError(f"Could not import document {self.document_id} ({status})")
+        if status == "unchanged":
+            print(f"Document unchanged since the last import: {self.instructions_path}")
+        else:
+            print(f"Document text saved to {self.instructions_path}")
@@ -1,38 +1,145 @@
 import json
 import os
+import time
 from dotenv import load_dotenv
 import requests
 
 
 class AssistantDocFinder:
-    def __init__(self):
+    """
+    Looks up the assistant id and the Google Doc of an assistant in the Airtable table.
+
+    The whole table is listed once (following Airtable's pagination) and saved in a
+    local JSON cache for `cache_ttl` seconds, so looking up many assistants (or many
+    processes looking up one each) costs one listing instead of one request per name.
+    """
+    PAGE_SIZE = 100  # Airtable's maximum
+
+    def __init__(self, cache_path: str = None, cache_ttl: float = 0, session=None, api_url: str = None):
+        """
+        :param cache_path: JSON file with the listed records (None = no cache)
+        :param cache_ttl: seconds a cached listing is used before listing the table again
+        :param session: optional requests.Session (default: a new one)
+        :param api_url: Airtable API root (default: AIRTABLE_API_URL or https://api.airtable.com/v0)
+        """
         load_dotenv()  # Load environment variables from .env file
         self.api_key = os.getenv("AIRTABLE_API_KEY")
         self.base_id = os.getenv("AIRTABLE_BASE_ID")
         self.table_name = os.getenv("AIRTABLE_TABLE_NAME")
+        self.api_url = (api_url or os.getenv("AIRTABLE_API_URL") or "https://api.airtable.com/v0").rstrip("/")
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.session = session or requests.Session()
+        self.records = None  # {assistant name: (assistant id, Google Doc address)}
+        self.records_from_cache = False
 
         if not all([self.api_key, self.base_id, self.table_name]):
             raise ValueError("Missing Airtable credentials in .env file.")
 
     def get_doc_id_by_assistant_name(self, assistant_name):
-        url = f"https://api.airtable.com/v0/{self.base_id}/{self.table_name}"
+        records = self.load_records()
+        if assistant_name not in records and self.records_from_cache:
+            # The assistant may have been added after the cached listing
+            records = self.load_records(refresh=True)
+        if assistant_name not in records:
+            raise ValueError(f"No record found for assistant name '{assistant_name}'.")
+        return records[assistant_name]
+
+    def get_doc_ids(self, assistant_names) -> dict:
+        """
+        {assistant name: (assistant id, Google Doc address)} for the given names, with
+        one listing of the table at most. Missing names are left out.
+        """
+        records = self.load_records()
+        if self.records_from_cache and any(name not in records for name in assistant_names):
+            records = self.load_records(refresh=True)
+        return {name: records[name] for name in assistant_names if name in records}
+
+    def load_records(self, refresh: bool = False) -> dict:
+        """
+        Every record of the table, from the local cache while it is fresh, otherwise
+        listed from Airtable (and saved in the cache).
+        """
+        if self.records is not None and not refresh:
+            return self.records
+
+        self.records_from_cache = False
+        if not refresh:
+            cached = self._read_cache()
+            if cached is not None:
+                self.records = cached
+                self.records_from_cache = True
+                return self.records
+
+        self.records = self.list_records()
+        self._write_cache(self.records)
+        print(f"Listed {len(self.records)} Airtable records.")
+        return self.records
+
+    def list_records(self) -> dict:
+        """
+        Lists the whole table, one page of PAGE_SIZE records per request.
+        """
+        url = f"{self.api_url}/{self.base_id}/{self.table_name}"
         headers = {
             "Authorization": f"Bearer {self.api_key}"
         }
-        params = {
-            "filterByFormula": f"{{Name}}='{assistant_name}'"
-        }
+        params = {"pageSize": self.PAGE_SIZE}
+
+        records = {}
+        while True:
+            data = self._get_page(url, headers, params)
+            for record in data.get("records", []):
+                fields = record.get("fields", {})
+                name = fields.get("Name")
+                if name and name not in records:  # Assuming one record per assistant name
+                    records[name] = (
+                        fields.get("Assistant ID", "Not found"),
+                        fields.get("GDocs Instruction Address", "Not found"),
+                    )
+            if not data.get("offset"):
+                return records
+            params["offset"] = data["offset"]
+
+    def _get_page(self, url, headers, params, max_retries: int = 3) -> dict:
+        for attempt in range(max_retries + 1):
+            response = self.session.get(url, headers=headers, params=params)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 429 and attempt < max_retries:
+                # Airtable asks to wait 30 seconds after going over 5 requests per second
+                pause = float(response.headers.get("Retry-After", 30))
+                print(f"Airtable rate limit reached, waiting {pause:.0f} s.")
+                time.sleep(pause)
+                continue
+            raise ConnectionError(f"Error: {response.status_code}, {response.text}")
+
+    def _read_cache(self):
+        if not self.cache_path or self.cache_ttl <= 0 or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("table") != f"{self.base_id}/{self.table_name}":
+            return None
+        if time.time() - cache.get("fetched_at", 0) > self.cache_ttl:
+            return None
+        return {name: tuple(values) for name, values in cache.get("records", {}).items()}
 
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            if "records" in data and data["records"]:
-                record = data["records"][0]  # Assuming one record per assistant name
-                assistant_id = record["fields"].get("Assistant ID", "Not found")
-                gdocs_address = record["fields"].get("GDocs Instruction Address", "Not found")
-                return assistant_id, gdocs_address
-            else:
-                raise ValueError(f"No record found for assistant name '{assistant_name}'.")
-        else:
-            raise ConnectionError(f"Error: {response.status_code}, {response.text}")
\ No newline at end of file
+    def _write_cache(self, records: dict):
+        if not self.cache_path:
+            return
+        folder = os.path.dirname(self.cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Written atomically: several processes may read it at the same time
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "table": f"{self.base_id}/{self.table_name}",
+                "fetched_at": time.time(),
+                "records": records,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.cache_path)
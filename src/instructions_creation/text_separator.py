@@ -5,9 +5,11 @@ sys.stdout.reconfigure(encoding='utf-8')  # Ensure UTF-8 output
 
 import re
 import json
-from openai import OpenAI, AssistantEventHandler
+from openai import AssistantEventHandler
 from typing_extensions import override
 
+from src.openai_clients.client_factory import OpenAIClientFactory
+
 ################################################################################
 # EventHandler: Handles streaming events from OpenAI (already OOP).
 ################################################################################
@@ -32,19 +34,24 @@ class EventHandler(AssistantEventHandler):
 # calling OpenAI, extracting JSON, and saving results.
 ################################################################################
 class TextSeparator:
-    def __init__(self, api_key: str, assistant_id: str):
+    def __init__(self, api_key: str, assistant_id: str, path_instructions_txt: str = None,
+                 path_instructions_no_examples: str = None, path_examples_txt: str = None,
+                 client_factory: OpenAIClientFactory = None):
         """
         :param api_key: Your OpenAI API key
         :param assistant_id: The ID of your target assistant on OpenAI
+        :param path_instructions_txt, path_instructions_no_examples, path_examples_txt:
+            input/output files (default: the ones in parameters.py)
+        :param client_factory: shared client factory (default: the process-wide one)
         """
         import parameters
 
-        self.path_intructions_no_examples = parameters.PATH_INSTRUCTIONS_NO_EXAMPLES
-        self.path_intructions_txt = parameters.PATH_INSTRUCTIONS_TXT
-        self.path_examples_txt = parameters.PATH_EXAMPLES_TXT
+        self.path_intructions_no_examples = path_instructions_no_examples or parameters.PATH_INSTRUCTIONS_NO_EXAMPLES
+        self.path_intructions_txt = path_instructions_txt or parameters.PATH_INSTRUCTIONS_TXT
+        self.path_examples_txt = path_examples_txt or parameters.PATH_EXAMPLES_TXT
         self.api_key = api_key
         self.assistant_id = assistant_id
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = (client_factory or OpenAIClientFactory.shared(api_key)).sync()
 
     def run(self):
         """
@@ -203,13 +210,23 @@ class TextSeparator:
 
 
 class TextSeparatorRunner:
-    def __init__(self, api_key: str, assistant_id: str):
+    def __init__(self, api_key: str, assistant_id: str, path_instructions_txt: str = None,
+                 path_instructions_no_examples: str = None, path_examples_txt: str = None,
+                 client_factory: OpenAIClientFactory = None):
         self.api_key = api_key
         self.assistant_id = assistant_id
+        self.path_instructions_txt = path_instructions_txt
+        self.path_instructions_no_examples = path_instructions_no_examples
+        self.path_examples_txt = path_examples_txt
+        self.client_factory = client_factory
 
     def run(self):
         separator = TextSeparator(
             api_key=self.api_key, 
-            assistant_id=self.assistant_id
+            assistant_id=self.assistant_id,
+            path_instructions_txt=self.path_instructions_txt,
+            path_instructions_no_examples=self.path_instructions_no_examples,
+            path_examples_txt=self.path_examples_txt,
+            client_factory=self.client_factory
         )
         separator.run()
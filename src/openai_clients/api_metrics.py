@@ -0,0 +1,352 @@
+# api_metrics.py
+
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+
+class _CallStats:
+    """
+    Aggregated calls of one (step, operation) pair.
+    """
+
+    def __init__(self):
+        self.wall_times = []     # seconds, from the request hook to the response headers
+        self.queue_seconds = 0.0 # seconds spent waiting for the rate limiter
+        self.statuses = {}       # {status_code: count}
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+
+    @property
+    def calls(self) -> int:
+        return len(self.wall_times)
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status >= 400)
+
+    def quantile(self, q: float) -> float:
+        if not self.wall_times:
+            return 0.0
+        ordered = sorted(self.wall_times)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ApiMetrics:
+    """
+    Latency, queue time, status, retries and token usage of every OpenAI API call,
+    grouped by pipeline step and operation (threads.create, runs.retrieve, ...).
+
+    OpenAIClientFactory installs it as httpx event hooks on all its clients, around
+    the rate limiter, so:
+      - wall time  = from the moment the call is issued until its response headers arrive,
+      - queue time = the part of it spent waiting for the rate limiter,
+      - retries    = calls the openai client repeated (x-stainless-retry-count header),
+      - tokens     = `usage` of the JSON responses (runs, chat completions); streamed
+                     runs and batch results report theirs through record_usage.
+                     "cached" tokens are the part of the prompt served from the
+                     provider's prompt cache (prompt_tokens_details.cached_tokens).
+
+    `with metrics.step("grade_base_answers"):` labels the calls made inside the block.
+    Results are available as a text report (report()) and as a Prometheus textfile
+    (write_prometheus()).
+    """
+
+    HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    # URL segments that are part of the route; any other segment is an object id
+    ROUTE_SEGMENTS = {
+        "assistants", "batches", "cancel", "chat", "completions", "content", "files", "fine_tuning",
+        "jobs", "messages", "runs", "steps", "submit_tool_outputs", "threads", "events", "checkpoints",
+    }
+
+    OPERATION_NAMES = {
+        ("POST", "/assistants"): "assistants.create",
+        ("GET", "/assistants/{id}"): "assistants.retrieve",
+        ("POST", "/assistants/{id}"): "assistants.update",
+        ("POST", "/threads"): "threads.create",
+        ("POST", "/threads/runs"): "threads.create_and_run",
+        ("POST", "/threads/{id}/messages"): "messages.create",
+        ("GET", "/threads/{id}/messages"): "messages.list",
+        ("POST", "/threads/{id}/runs"): "runs.create",
+        ("GET", "/threads/{id}/runs/{id}"): "runs.retrieve",
+        ("POST", "/chat/completions"): "chat.completions.create",
+        ("POST", "/files"): "files.create",
+        ("GET", "/files/{id}/content"): "files.content",
+        ("POST", "/fine_tuning/jobs"): "fine_tuning.jobs.create",
+        ("GET", "/fine_tuning/jobs/{id}"): "fine_tuning.jobs.retrieve",
+        ("POST", "/batches"): "batches.create",
+        ("GET", "/batches/{id}"): "batches.retrieve",
+    }
+
+    def __init__(self, labels: dict = None):
+        """
+        :param labels: constant labels of the exported series, e.g. {"assistant": "MyU"}
+        """
+        self.labels = dict(labels or {})
+        self.lock = threading.Lock()
+        self.stats = {}  # {(step, operation): _CallStats}
+        self.current_step = "-"
+        self._pending = weakref.WeakKeyDictionary()  # {httpx request: [operation, step, started, sent]}
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Labels with `name` every call made inside the block.
+        """
+        previous, self.current_step = self.current_step, name
+        try:
+            yield
+        finally:
+            self.current_step = previous
+
+    # -------------------------------------------------------------------------
+    # Operation names
+    # -------------------------------------------------------------------------
+    def operation_name(self, request) -> str:
+        path = request.url.path
+        if path.startswith("/v1/"):
+            path = path[3:]
+        route = "/" + "/".join(
+            segment if segment in self.ROUTE_SEGMENTS else "{id}"
+            for segment in path.strip("/").split("/")
+        )
+        name = self.OPERATION_NAMES.get((request.method, route), f"{request.method} {route}")
+        if name in ("runs.create", "threads.create_and_run") and self._is_stream(request):
+            name = "runs.stream" if name == "runs.create" else "threads.create_and_run_stream"
+        return name
+
+    @staticmethod
+    def _is_stream(request) -> bool:
+        try:
+            return bool(json.loads(request.content).get("stream"))
+        except Exception:
+            return False
+
+    # -------------------------------------------------------------------------
+    # httpx event hooks
+    # -------------------------------------------------------------------------
+    def on_request_start(self, request):
+        """
+        First request hook: the call is issued (before the rate limiter).
+        """
+        operation = self.operation_name(request)
+        now = time.perf_counter()
+        with self.lock:
+            self._pending[request] = [operation, self.current_step, now, now]
+
+    def on_request_sent(self, request):
+        """
+        Last request hook: the rate limiter let the call through.
+        """
+        with self.lock:
+            pending = self._pending.get(request)
+        if pending is not None:
+            pending[3] = time.perf_counter()
+
+    def on_response(self, response):
+        if self._is_json(response):
+            response.read()
+        self._record_response(response)
+
+    async def aon_request_start(self, request):
+        self.on_request_start(request)
+
+    async def aon_request_sent(self, request):
+        self.on_request_sent(request)
+
+    async def aon_response(self, response):
+        if self._is_json(response):
+            await response.aread()
+        self._record_response(response)
+
+    @staticmethod
+    def _is_json(response) -> bool:
+        return response.headers.get("content-type", "").startswith("application/json")
+
+    def _record_response(self, response):
+        with self.lock:
+            pending = self._pending.pop(response.request, None)
+        if pending is None:
+            return
+        operation, step, started, sent = pending
+        now = time.perf_counter()
+        try:
+            retries = int(response.request.headers.get("x-stainless-retry-count", 0))
+        except ValueError:
+            retries = 0
+
+        usage = None
+        if self._is_json(response):
+            try:
+                usage = response.json().get("usage")
+            except Exception:
+                usage = None
+
+        with self.lock:
+            stats = self.stats.setdefault((step, operation), _CallStats())
+            stats.wall_times.append(now - started)
+            stats.queue_seconds += sent - started
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+            stats.retries += 1 if retries else 0
+            self._add_usage(stats, usage)
+
+    def record_usage(self, operation: str, usage):
+        """
+        Adds the token usage of a call whose response was streamed (e.g. the final
+        run of runs.stream) or came inside a batch output file, which the response
+        hook cannot read.
+        """
+        with self.lock:
+            stats = self.stats.setdefault((self.current_step, operation), _CallStats())
+            self._add_usage(stats, usage)
+
+    @staticmethod
+    def _add_usage(stats: _CallStats, usage):
+        if not usage:
+            return
+        if not isinstance(usage, dict):
+            usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+        stats.prompt_tokens += usage.get("prompt_tokens") or 0
+        stats.completion_tokens += usage.get("completion_tokens") or 0
+        stats.cached_tokens += (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+    # -------------------------------------------------------------------------
+    # Exports
+    # -------------------------------------------------------------------------
+    def summary(self) -> dict:
+        """
+        Totals over every step and operation: calls, errors, retries, tokens (with the
+        share of prompt tokens served from the prompt cache) and the p50/p95/p99 wall
+        time of a call.
+        """
+        with self.lock:
+            all_stats = list(self.stats.values())
+        merged = _CallStats()
+        for stats in all_stats:
+            merged.wall_times.extend(stats.wall_times)
+            merged.queue_seconds += stats.queue_seconds
+            for status, count in stats.statuses.items():
+                merged.statuses[status] = merged.statuses.get(status, 0) + count
+            merged.retries += stats.retries
+            merged.prompt_tokens += stats.prompt_tokens
+            merged.completion_tokens += stats.completion_tokens
+            merged.cached_tokens += stats.cached_tokens
+        return {
+            "calls": merged.calls,
+            "errors": merged.errors,
+            "retries": merged.retries,
+            "queue_seconds": round(merged.queue_seconds, 3),
+            "prompt_tokens": merged.prompt_tokens,
+            "completion_tokens": merged.completion_tokens,
+            "cached_tokens": merged.cached_tokens,
+            "cached_share": round(merged.cached_tokens / merged.prompt_tokens, 4) if merged.prompt_tokens else 0.0,
+            "p50": round(merged.quantile(0.5), 4),
+            "p95": round(merged.quantile(0.95), 4),
+            "p99": round(merged.quantile(0.99), 4),
+        }
+
+    def report(self) -> str:
+        """
+        Per-step table: calls, errors, retries, latency percentiles, queue time and tokens.
+        """
+        with self.lock:
+            items = sorted(self.stats.items())
+        if not items:
+            return "No API calls recorded."
+
+        lines = [
+            f"{'step':<30} {'operation':<30} {'calls':>6} {'err':>4} {'retry':>5} "
+            f"{'p50 s':>7} {'p95 s':>7} {'max s':>7} {'total s':>8} {'queue s':>8} {'prompt tk':>10} {'cached tk':>10} {'compl. tk':>10}"
+        ]
+        current_step = None
+        for (step, operation), stats in items:
+            if step != current_step and current_step is not None:
+                lines.append("")
+            current_step = step
+            lines.append(
+                f"{step:<30} {operation:<30} {stats.calls:>6} {stats.errors:>4} {stats.retries:>5} "
+                f"{stats.quantile(0.5):>7.2f} {stats.quantile(0.95):>7.2f} {max(stats.wall_times, default=0):>7.2f} "
+                f"{sum(stats.wall_times):>8.1f} {stats.queue_seconds:>8.1f} "
+                f"{stats.prompt_tokens:>10} {stats.cached_tokens:>10} {stats.completion_tokens:>10}"
+            )
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format.
+        """
+        with self.lock:
+            items = sorted(self.stats.items())
+
+        def labels(step, operation, **extra):
+            values = dict(self.labels, step=step, operation=operation, **extra)
+            return "{" + ",".join(f'{key}="{self._escape(value)}"' for key, value in values.items()) + "}"
+
+        lines = [
+            "# HELP openai_api_request_duration_seconds Wall time of OpenAI API calls, including rate-limiter waits.",
+            "# TYPE openai_api_request_duration_seconds histogram",
+        ]
+        for (step, operation), stats in items:
+            ordered = sorted(stats.wall_times)
+            for bound in self.HISTOGRAM_BUCKETS:
+                count = bisect.bisect_right(ordered, bound)
+                lines.append(f"openai_api_request_duration_seconds_bucket{labels(step, operation, le=bound)} {count}")
+            lines.append(f"openai_api_request_duration_seconds_bucket{labels(step, operation, le='+Inf')} {len(ordered)}")
+            lines.append(f"openai_api_request_duration_seconds_sum{labels(step, operation)} {sum(ordered):.6f}")
+            lines.append(f"openai_api_request_duration_seconds_count{labels(step, operation)} {len(ordered)}")
+
+        lines += [
+            "# HELP openai_api_queue_seconds_total Time OpenAI API calls waited for the rate limiter.",
+            "# TYPE openai_api_queue_seconds_total counter",
+        ]
+        lines += [f"openai_api_queue_seconds_total{labels(step, operation)} {stats.queue_seconds:.6f}"
+                  for (step, operation), stats in items]
+
+        lines += [
+            "# HELP openai_api_requests_total OpenAI API responses by HTTP status.",
+            "# TYPE openai_api_requests_total counter",
+        ]
+        for (step, operation), stats in items:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f"openai_api_requests_total{labels(step, operation, status=status)} {count}")
+
+        lines += [
+            "# HELP openai_api_retries_total OpenAI API calls that were retries of a failed call.",
+            "# TYPE openai_api_retries_total counter",
+        ]
+        lines += [f"openai_api_retries_total{labels(step, operation)} {stats.retries}"
+                  for (step, operation), stats in items]
+
+        lines += [
+            "# HELP openai_api_tokens_total Tokens reported in the usage of OpenAI API responses.",
+            "# TYPE openai_api_tokens_total counter",
+        ]
+        for (step, operation), stats in items:
+            for token_type, value in (("prompt", stats.prompt_tokens), ("completion", stats.completion_tokens),
+                                      ("cached", stats.cached_tokens)):
+                lines.append(f"openai_api_tokens_total{labels(step, operation, type=token_type)} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def write_prometheus(self, path: str):
+        """
+        Writes the Prometheus textfile atomically (node_exporter's textfile collector
+        may read it at any time).
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
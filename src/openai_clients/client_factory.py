@@ -0,0 +1,152 @@
+# client_factory.py
+
+import asyncio
+import threading
+import weakref
+
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    Timeout,
+)
+from parameters import (
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_MAX_RETRIES,
+)
+
+from src.openai_clients.api_metrics import ApiMetrics
+from src.openai_clients.rate_limiter import AdaptiveRateLimiter
+
+
+# httpx.Limits, taken from the openai package itself (no direct httpx import needed)
+Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+class OpenAIClientFactory:
+    """
+    Hands out OpenAI clients that share one HTTP connection pool, so every
+    component of the pipeline reuses the same keep-alive connections instead of
+    opening a new pool (and TLS handshake) per client.
+
+      - sync():         one OpenAI client per factory (its HTTP client is thread-safe).
+      - async_client(): one AsyncOpenAI client per running event loop (an async
+                        connection pool cannot be shared between loops).
+
+    OpenAIClientFactory.shared(api_key) returns a process-wide factory, used by the
+    classes that are built without an explicit factory.
+
+    All the clients of a factory also share one AdaptiveRateLimiter (httpx event
+    hooks), so every request of the pipeline waits for the same rate-limit budget,
+    and a 429 seen by one component slows down all of them. Every call is also
+    recorded in the factory's ApiMetrics (latency, queue time, retries, tokens).
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api_key: str, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY, timeout: float = HTTP_TIMEOUT,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES, rate_limiter: AdaptiveRateLimiter = None,
+                 rate_limit: bool = RATE_LIMIT_ENABLED, metrics: ApiMetrics = None):
+        """
+        :param max_connections: maximum open connections in the pool
+        :param max_keepalive_connections: idle connections kept open for reuse
+        :param keepalive_expiry: seconds an idle connection is kept open
+        :param timeout: request timeout in seconds
+        :param max_retries: retries of the openai client on connection errors / 429 / 5xx
+        :param rate_limiter: limiter to use (by default, a new one for this factory)
+        :param rate_limit: False to send the requests without any rate limiter
+        :param metrics: where the API calls are recorded (by default, a new ApiMetrics)
+        """
+        self.api_key = api_key
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = Timeout(timeout, connect=min(10.0, timeout))
+        self.max_retries = max_retries
+        self.rate_limiter = (rate_limiter or AdaptiveRateLimiter()) if rate_limit else None
+        self.metrics = metrics or ApiMetrics()
+
+        self._lock = threading.Lock()
+        self._sync_client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # {event_loop: AsyncOpenAI}
+
+    @classmethod
+    def shared(cls, api_key: str) -> "OpenAIClientFactory":
+        with cls._shared_lock:
+            if api_key not in cls._shared:
+                cls._shared[api_key] = cls(api_key)
+            return cls._shared[api_key]
+
+    def sync(self) -> OpenAI:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = OpenAI(
+                    api_key=self.api_key,
+                    max_retries=self.max_retries,
+                    http_client=DefaultHttpxClient(limits=self.limits, timeout=self.timeout,
+                                                   event_hooks=self._event_hooks(asynchronous=False))
+                )
+            return self._sync_client
+
+    def async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI client of the running event loop (must be called inside a coroutine).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    max_retries=self.max_retries,
+                    http_client=DefaultAsyncHttpxClient(limits=self.limits, timeout=self.timeout,
+                                                        event_hooks=self._event_hooks(asynchronous=True))
+                )
+                self._async_clients[loop] = client
+            return client
+
+    def _event_hooks(self, asynchronous: bool) -> dict:
+        """
+        Request hooks: metrics start -> rate limiter wait -> metrics sent (the difference
+        is the queue time). Response hooks: rate limiter headers -> metrics.
+        """
+        metrics, limiter = self.metrics, self.rate_limiter
+        if asynchronous:
+            request_hooks = [metrics.aon_request_start, metrics.aon_request_sent]
+            response_hooks = [metrics.aon_response]
+            if limiter is not None:
+                request_hooks.insert(1, limiter.aon_request)
+                response_hooks.insert(0, limiter.aon_response)
+        else:
+            request_hooks = [metrics.on_request_start, metrics.on_request_sent]
+            response_hooks = [metrics.on_response]
+            if limiter is not None:
+                request_hooks.insert(1, limiter.on_request)
+                response_hooks.insert(0, limiter.on_response)
+        return {"request": request_hooks, "response": response_hooks}
+
+    async def aclose(self):
+        """
+        Closes the async client of the running event loop (call it before the loop ends).
+        """
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def close(self):
+        with self._lock:
+            client, self._sync_client = self._sync_client, None
+        if client is not None:
+            client.close()
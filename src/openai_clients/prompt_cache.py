@@ -0,0 +1,21 @@
+# prompt_cache.py
+
+import hashlib
+
+from parameters import PROMPT_CACHE_KEY_ENABLED
+
+
+def prompt_cache_key(model: str, static_prefix: str, enabled: bool = PROMPT_CACHE_KEY_ENABLED):
+    """
+    prompt_cache_key of the chat requests that start with `static_prefix` (the system
+    message) on `model`, or None when disabled.
+
+    OpenAI caches prompt prefixes automatically (from 1024 tokens, in 128-token steps),
+    but only if the prefix is byte-identical and the request lands where it is cached;
+    requests with the same key are routed together. The key is a hash, so it changes
+    whenever the prefix does and never carries prompt text.
+    """
+    if not enabled:
+        return None
+    digest = hashlib.sha256(f"{model}\0{static_prefix}".encode("utf-8")).hexdigest()
+    return f"prefix-{digest[:32]}"
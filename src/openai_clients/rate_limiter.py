@@ -0,0 +1,250 @@
+# rate_limiter.py
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+from parameters import RATE_LIMIT_DEFAULT_PAUSE, RATE_LIMIT_SAFETY_MARGIN
+
+
+def parse_reset_duration(value):
+    """
+    Seconds in an x-ratelimit-reset-* header ("1s", "6m0s", "20ms", "1h2m3.5s"), or None.
+    """
+    if not value:
+        return None
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers):
+    """
+    Seconds to wait according to the retry-after-ms / retry-after headers, or None.
+    """
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers.get("retry-after-ms")) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class _Budget:
+    """
+    Token bucket for one quantity (requests or tokens) of one model.
+    `available` may go below zero: it is the debt of the requests already let through.
+    """
+
+    def __init__(self):
+        self.limit = None       # per minute, from x-ratelimit-limit-*
+        self.available = None   # None while the limit is unknown
+        self.updated_at = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.limit / 60.0 if self.limit else 0.0
+
+    def refill(self, now: float):
+        if self.available is not None and self.limit:
+            self.available = min(self.limit, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` from the bucket; returns the seconds until it is paid back.
+        """
+        if self.available is None or not self.limit:
+            return 0.0
+        self.available -= amount
+        return max(0.0, -self.available / self.rate)
+
+    def observe(self, limit, remaining, reset_seconds, safety_margin: float, now: float) -> float:
+        """
+        Applies the headers of a response; returns how long to pause if the budget is exhausted.
+        """
+        if limit:
+            self.limit = limit * safety_margin
+        if remaining is None or not self.limit:
+            return 0.0
+        # The account-wide remaining budget also counts other processes and clients
+        usable = remaining - limit * (1 - safety_margin) if limit else remaining
+        if self.available is None or usable < self.available:
+            self.available = usable
+        if remaining <= 0 and reset_seconds:
+            return reset_seconds
+        return 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Rate limiter shared by every OpenAI client of a OpenAIClientFactory.
+
+    Before each HTTP request it waits for a request (and the estimated tokens) from
+    a per-model token bucket. The buckets are not configured by hand: every response
+    carries the x-ratelimit-limit/remaining/reset headers of the account, and the
+    limiter adopts those limits (times `safety_margin`) and lowers its budget to the
+    remaining values, so it follows the real limit even when other processes share it.
+
+    A 429 pauses every request of the limiter for retry-after seconds (or for a
+    jittered exponential backoff when the API gives none); the openai client then
+    retries the request, which waits here again until the pause is over.
+    """
+
+    REQUEST_HEADERS = ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests")
+    TOKEN_HEADERS = ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens")
+
+    def __init__(self, safety_margin: float = RATE_LIMIT_SAFETY_MARGIN, default_pause: float = RATE_LIMIT_DEFAULT_PAUSE,
+                 max_pause: float = 60.0):
+        """
+        :param safety_margin: fraction of the account limits the pipeline may use
+        :param default_pause: first backoff after a 429 without retry-after (seconds)
+        :param max_pause: upper bound of the backoff (seconds)
+        """
+        self.safety_margin = safety_margin
+        self.default_pause = default_pause
+        self.max_pause = max_pause
+
+        self.lock = threading.Lock()
+        self.budgets = {}  # {model: (requests _Budget, tokens _Budget)}
+        self.paused_until = 0.0
+        self.consecutive_429 = 0
+
+        # Counters for logs and benchmarks
+        self.requests = 0
+        self.rate_limited = 0
+        self.waited_seconds = 0.0
+
+    # -------------------------------------------------------------------------
+    # Request side
+    # -------------------------------------------------------------------------
+    def reserve(self, model: str = None, tokens: int = 0) -> float:
+        """
+        Takes one request and `tokens` tokens from the model's budget; returns the
+        seconds the caller must wait before sending it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            requests_budget, tokens_budget = self._budgets(model)
+            requests_budget.refill(now)
+            tokens_budget.refill(now)
+            wait = max(
+                requests_budget.reserve(1),
+                tokens_budget.reserve(tokens),
+                self.paused_until - now
+            )
+            self.requests += 1
+            self.waited_seconds += wait
+        return wait
+
+    def acquire(self, model: str = None, tokens: int = 0):
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, model: str = None, tokens: int = 0):
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _budgets(self, model: str):
+        if model not in self.budgets:
+            self.budgets[model] = (_Budget(), _Budget())
+        return self.budgets[model]
+
+    # -------------------------------------------------------------------------
+    # Response side
+    # -------------------------------------------------------------------------
+    def observe(self, headers, status_code: int, model: str = None):
+        """
+        Updates the budgets from the rate-limit headers of a response, and pauses
+        every request after a 429.
+        """
+        with self.lock:
+            now = time.monotonic()
+            requests_budget, tokens_budget = self._budgets(model)
+            requests_budget.refill(now)
+            tokens_budget.refill(now)
+            pause = max(
+                requests_budget.observe(*self._read(headers, self.REQUEST_HEADERS), self.safety_margin, now),
+                tokens_budget.observe(*self._read(headers, self.TOKEN_HEADERS), self.safety_margin, now)
+            )
+
+            if status_code == 429:
+                self.rate_limited += 1
+                self.consecutive_429 += 1
+                retry_after = parse_retry_after(headers)
+                if retry_after is None:
+                    # Full jitter, so the workers that were paused together do not retry together
+                    backoff = min(self.max_pause, self.default_pause * 2 ** (self.consecutive_429 - 1))
+                    retry_after = random.uniform(backoff / 2, backoff)
+                pause = max(pause, retry_after)
+            elif status_code < 400:
+                self.consecutive_429 = 0
+
+            if pause > 0:
+                self.paused_until = max(self.paused_until, now + pause)
+
+    @staticmethod
+    def _read(headers, names):
+        limit_header, remaining_header, reset_header = names
+        try:
+            limit = float(headers.get(limit_header)) if headers.get(limit_header) is not None else None
+            remaining = float(headers.get(remaining_header)) if headers.get(remaining_header) is not None else None
+        except (TypeError, ValueError):
+            limit, remaining = None, None
+        return limit, remaining, parse_reset_duration(headers.get(reset_header))
+
+    # -------------------------------------------------------------------------
+    # httpx event hooks (installed by OpenAIClientFactory)
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def request_cost(request):
+        """
+        (model, estimated tokens) of an HTTP request: ~4 characters per prompt token
+        plus the completion tokens it may produce. Uploads count as zero tokens.
+        """
+        try:
+            content = request.content
+        except Exception:
+            return None, 0
+        if not content or not request.headers.get("content-type", "").startswith("application/json"):
+            return None, 0
+        try:
+            body = json.loads(content)
+        except ValueError:
+            return None, 0
+        if not isinstance(body, dict):
+            return None, 0
+        completion_tokens = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+        return body.get("model"), len(content) // 4 + completion_tokens
+
+    def on_request(self, request):
+        self.acquire(*self.request_cost(request))
+
+    def on_response(self, response):
+        self.observe(response.headers, response.status_code, self.request_cost(response.request)[0])
+
+    async def aon_request(self, request):
+        await self.aacquire(*self.request_cost(request))
+
+    async def aon_response(self, response):
+        self.on_response(response)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "waited_seconds": round(self.waited_seconds, 2),
+            }